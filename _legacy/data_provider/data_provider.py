@@ -4,9 +4,11 @@
 # ============================================================
 
 import os
-import requests
 import logging
 
+from services.airtable_client import registry
+from services.reference_data import reference_store
+
 logger = logging.getLogger("smartcoach.data_provider")
 
 AIRTABLE_API_KEY = os.getenv("AIRTABLE_API_KEY")
@@ -19,28 +21,22 @@ TABLE_TYPES = os.getenv("AIRTABLE_SEANCES_TYPES_DEV")  # 📘 Séances Types
 
 # ============================================================
 # Helper : airtable query
+# (client partagé du registre → connexions keep-alive)
 # ============================================================
 
 def airtable_get(table_id, record_id=None, formula=None):
-    url = f"https://api.airtable.com/v0/{BASE_ID}/{table_id}"
-
-    headers = {
-        "Authorization": f"Bearer {AIRTABLE_API_KEY}"
-    }
+    table = registry.table(table_id, base_id=BASE_ID, api_key=AIRTABLE_API_KEY)
 
     if record_id:
         # Lecture d’un seul record
-        r = requests.get(f"{url}/{record_id}", headers=headers)
-        r.raise_for_status()
-        return r.json()
+        return table.get(record_id)
 
     params = {}
     if formula:
         params["filterByFormula"] = formula
 
-    r = requests.get(url, headers=headers, params=params)
-    r.raise_for_status()
-    return r.json()
+    # Une seule page, comme l'appel REST historique
+    return table.api.get(table.urls.records, params=params)
 
 
 # ============================================================
@@ -130,16 +126,8 @@ def load_seances_types(filters):
     }
     """
 
-    # Construction dynamique du filterByFormula
-    clauses = []
-    for k, v in filters.items():
-        if v is not None:
-            clauses.append(f"{{{k}}} = '{v}'")
-
-    formula = "AND(" + ",".join(clauses) + ")"
-
-    res = airtable_get(TABLE_TYPES, formula=formula)
-    return res.get("records", [])
+    # Filtrage dans le référentiel mémoire (équivalent AND({k}='v', …))
+    return list(reference_store.filter("seances_types", filters))
 
 
 # ============================================================
@@ -2,6 +2,7 @@ import logging
 from smartcoach_api.services.airtable_service import AirtableService
 import smartcoach_api.services.airtable_tables as ATABLES
 import smartcoach_api.services.airtable_fields as AFIELDS
+from smartcoach_api.services.reference_data import reference_store
 
 logger = logging.getLogger("ROOT")
 
@@ -29,7 +30,8 @@ class CandidatesRepository:
 
         logger.info("[CandidatesRepository] Chargement des séances types")
 
-        records = self.airtable.list_all(ATABLES.SEANCES_TYPES_ID)
+        # Snapshot mémoire du référentiel (aucun appel Airtable)
+        records = reference_store.records("seances_types")
 
         candidates = []
 
@@ -1,11 +1,14 @@
 # api.py
 
+import json
 import logging
 from typing import Optional, Dict, Any, List
-from fastapi import FastAPI, HTTPException, APIRouter
+from fastapi import FastAPI, Header, HTTPException, APIRouter
+from fastapi.responses import StreamingResponse
 from datetime import date
 
 from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
 
 from core.config import config               # ← nouvelle config centralisée
 from core.context import SmartCoachContext
@@ -21,16 +24,24 @@ from render_message import router as render_message_router
 
 from routes.selftest import router as selftest_router
 from routes.resolve_slot import router as resolve_slot_router
+from routes.metrics import router as metrics_router
 
 from qa.registry_scn_6 import QA_SCN_6
-from scenarios.dispatcher import dispatch_scenario
+from scenarios.dispatcher import dispatch_scenario_async
 from scenarios.core_simple import run_core_simple
 from scenarios.agregateur.scn_1 import run_scn_1_slots
-from scenarios.agregateur.scn_6 import run_scn_6
+from scenarios.agregateur.scn_2_catalogue import session_catalogue
+from scenarios.agregateur.scn_6 import iter_scn_6_batch, run_scn_6
 from scenarios.socle.scn_0g import run_scn_0g
 from scenarios.socle.scn_0h import run_scn_0h
 from scenarios.agregateur.scn_slot_generator import run_scn_slot_generator as run_first
 from scenarios.agregateur.scn_slot_resolver import run_scn_slot_resolver as run_next
+from engine.vdot import vdot_engine
+from services.airtable_async import aclose_clients
+from services.airtable_mirror import airtable_mirror
+from services.airtable_outbox import airtable_outbox
+from services.idempotency import idempotent, idempotent_async
+from services.reference_data import reference_store
 
 from tests.utils.snapshot import assert_snapshot
 from tests.utils.helpers  import load_json
@@ -45,6 +56,47 @@ async def log_api_version():
         f"🔥 API VERSION LOADED = {APP_VERSION}"
     )
 
+@app.on_event("startup")
+def preload_reference_data():
+    # Tables de référence chargées une fois, puis rafraîchies en tâche de fond
+    reference_store.start()
+
+@app.on_event("startup")
+def seed_vdot_tables():
+    # Allures VDOT semées depuis la table Airtable VDOT (sinon formule de Daniels)
+    vdot_engine.seed_from_reference()
+
+@app.on_event("startup")
+def start_airtable_mirror():
+    # Réplique SQLite locale (sans effet si AIRTABLE_MIRROR=0)
+    airtable_mirror.start()
+
+@app.on_event("startup")
+def start_airtable_outbox():
+    # Vidage en fond des écritures différées (reprend les lignes en attente)
+    airtable_outbox.start()
+
+@app.on_event("startup")
+def load_session_catalogue():
+    # Séances SCN_2 précalculées (sans effet si SCN2_CATALOGUE=0)
+    session_catalogue.load()
+
+@app.on_event("shutdown")
+def stop_reference_data():
+    reference_store.stop()
+
+@app.on_event("shutdown")
+def stop_airtable_mirror():
+    airtable_mirror.stop()
+
+@app.on_event("shutdown")
+def stop_airtable_outbox():
+    airtable_outbox.stop()
+
+@app.on_event("shutdown")
+async def close_airtable_clients():
+    await aclose_clients()
+
 router = APIRouter(prefix="/core", tags=["CORE"])
 
 app.include_router(router)
@@ -54,6 +106,7 @@ app.include_router(core_1_router)
 app.include_router(core_3_router)
 app.include_router(resolve_slot_router)
 app.include_router(render_message_router)
+app.include_router(metrics_router)
 
 logger = logging.getLogger("API")
 
@@ -108,10 +161,17 @@ def resolve_slot(payload: SlotPayload):
     }
 
 @router.post("/run")
-def core_run(body: CoreRunRequest):
+def core_run(
+    body: CoreRunRequest,
+    idempotency_key: Optional[str] = Header(default=None, alias="Idempotency-Key"),
+):
     """
     Point d’entrée runtime unique pour Make (CORE_2 V2).
     """
+    return idempotent("core_run", idempotency_key, body, lambda: _core_run(body))
+
+
+def _core_run(body: CoreRunRequest):
     try:
         # 1) Résolution du slot
         resolved = resolve_slot(
@@ -153,15 +213,18 @@ class Scn1V2Payload(BaseModel):
 
 
 @router.post("/scn_1/init_slots")
-def init_slots(payload: Scn1V2Payload):
-    return run_scn_1_slots(
+def init_slots(
+    payload: Scn1V2Payload,
+    idempotency_key: Optional[str] = Header(default=None, alias="Idempotency-Key"),
+):
+    return idempotent("scn_1_init_slots", idempotency_key, payload, lambda: run_scn_1_slots(
         plan_record_id=payload.plan_record_id,
         user_id=payload.user_id,
         date_debut=payload.date_debut,
         nb_semaines=payload.nb_semaines,
         sessions_per_week=payload.sessions_per_week,
         dispos=payload.dispos,
-    )    
+    ))    
 # =====================================================
 #      HEALTH CHECK
 # =====================================================
@@ -180,14 +243,46 @@ def health():
 # =====================================================
 
 @app.post("/generate_by_id")
-async def generate(body: GenerateRequest):
+async def generate(
+    body: GenerateRequest,
+    idempotency_key: Optional[str] = Header(default=None, alias="Idempotency-Key"),
+):
     logger.info(f"API → /generate_by_id called scenario={body.scenario}")
 
     scenario = body.scenario
     record_id = body.record_id
     internal_payload = body.payload or {}   # contient mode + run_context
 
-    return dispatch_scenario(scenario, record_id, internal_payload)
+    # Relance Make (timeout) avec la même clé : réponse rejouée, pas de ré-exécution
+    return await idempotent_async(
+        "generate_by_id",
+        idempotency_key,
+        body,
+        lambda: dispatch_scenario_async(scenario, record_id, internal_payload),
+    )
+
+# =====================================================
+#      ROUTE LOT : /generate_batch (SCN_6 × N, NDJSON)
+# =====================================================
+
+class GenerateBatchRequest(BaseModel):
+    items: List[Dict[str, Any]]        # [{run_context, feedback_slots}, …]
+    workers: Optional[int] = None      # plafonné par SCN6_BATCH_WORKERS
+
+
+@app.post("/generate_batch")
+def generate_batch(body: GenerateBatchRequest):
+    """
+    Pré-génération : SCN_6 sur chaque item (pool borné), 1 ligne
+    JSON par item dès qu'il est prêt, puis une ligne de synthèse.
+    """
+    logger.info(f"API → /generate_batch called items={len(body.items)}")
+
+    lines = (
+        json.dumps(line, ensure_ascii=False, default=str) + "\n"
+        for line in iter_scn_6_batch(body.items, workers=body.workers)
+    )
+    return StreamingResponse(lines, media_type="application/x-ndjson")
 
 # =====================================================
 #      ROUTE SPÉCIALE : /generate_sessions
@@ -271,7 +366,9 @@ async def socle_scn_0h_exec(body: PersistSlotRequest):
             payload={}
         )
 
-        result = run_scn_0h(
+        # Écriture Airtable sync : hors de la boucle d'événements
+        result = await run_in_threadpool(
+            run_scn_0h,
             context=context,
             slot=body.slot
         )
@@ -27,9 +27,98 @@ class Config:
         if not self.base_id:
             self.base_id = os.getenv("AIRTABLE_BASE_ID")
 
+        # Endpoint REST Airtable (faux serveur local : qa/fake_airtable.py)
+        self.airtable_endpoint_url = os.getenv("AIRTABLE_ENDPOINT_URL", "https://api.airtable.com").rstrip("/")
+
         # Debug mode
         self.debug = os.getenv("DEBUG_MODE", "0") in ("1", "true", "True")
 
+        # Pool de connexions keep-alive Airtable (par base)
+        self.airtable_pool_size = int(os.getenv("AIRTABLE_POOL_SIZE", "10"))
+
+        # Ordonnanceur Airtable : 5 req/s par base, pénalité de 30 s après un 429
+        self.airtable_rate_limit_rps = float(os.getenv("AIRTABLE_RATE_LIMIT_RPS", "5"))
+        self.airtable_rate_burst = float(os.getenv("AIRTABLE_RATE_BURST", "5"))
+        self.airtable_max_retries = int(os.getenv("AIRTABLE_MAX_RETRIES", "5"))
+        self.airtable_429_penalty_s = float(os.getenv("AIRTABLE_429_PENALTY_S", "30"))
+
+        # Timeout d'un appel Airtable (s) et disjoncteur (N échecs consécutifs → ouvert)
+        self.airtable_timeout_s = float(os.getenv("AIRTABLE_TIMEOUT_S", "10"))
+        self.airtable_breaker_failures = int(os.getenv("AIRTABLE_BREAKER_FAILURES", "5"))
+        self.airtable_breaker_reset_s = float(os.getenv("AIRTABLE_BREAKER_RESET_S", "30"))
+
+        # Longueur max d'une formule envoyée (lots OR, encodage URL < 16k)
+        self.airtable_max_formula_len = int(os.getenv("AIRTABLE_MAX_FORMULA_LEN", "5000"))
+
+        # Budget Airtable par requête (0 = illimité) ; mode "fallback" (cache) ou "fail"
+        self.airtable_io_budget_calls = int(os.getenv("AIRTABLE_IO_BUDGET_CALLS", "0"))
+        self.airtable_io_budget_ms = float(os.getenv("AIRTABLE_IO_BUDGET_MS", "0"))
+        self.airtable_io_budget_mode = os.getenv("AIRTABLE_IO_BUDGET_MODE", "fallback").lower()
+
+        # Lots d'écriture envoyés en parallèle (upsert_many)
+        self.airtable_batch_concurrency = int(os.getenv("AIRTABLE_BATCH_CONCURRENCY", "4"))
+
+        # Cache mémoire des records Airtable (TTL par défaut en secondes)
+        self.airtable_cache_ttl = float(os.getenv("AIRTABLE_CACHE_TTL", "60"))
+        self.airtable_cache_max_entries = int(os.getenv("AIRTABLE_CACHE_MAX_ENTRIES", "2000"))
+        self.airtable_cache_max_bytes = int(os.getenv("AIRTABLE_CACHE_MAX_BYTES", "20000000"))
+        # Après expiration : servi tout de suite + rafraîchi en fond (SWR),
+        # puis conservé comme dernière donnée connue si Airtable tombe
+        self.airtable_cache_swr_s = float(os.getenv("AIRTABLE_CACHE_SWR_S", "30"))
+        self.airtable_cache_stale_s = float(os.getenv("AIRTABLE_CACHE_STALE_S", "3600"))
+        self.airtable_lkg_max_entries = int(os.getenv("AIRTABLE_LKG_MAX_ENTRIES", "500"))
+
+        # Réplique SQLite locale (lectures servies si table synchronisée < staleness)
+        self.airtable_mirror_enabled = os.getenv("AIRTABLE_MIRROR", "0") in ("1", "true", "True")
+        self.airtable_mirror_path = os.getenv("AIRTABLE_MIRROR_PATH")
+        self.airtable_mirror_sync_s = float(os.getenv("AIRTABLE_MIRROR_SYNC_S", "30"))
+        self.airtable_mirror_max_staleness_s = float(os.getenv("AIRTABLE_MIRROR_MAX_STALENESS_S", "120"))
+        self.airtable_mirror_full_sync_s = float(os.getenv("AIRTABLE_MIRROR_FULL_SYNC_S", "3600"))
+
+        # Outbox locale des écritures Airtable non critiques (write-behind)
+        self.airtable_outbox_enabled = os.getenv("AIRTABLE_OUTBOX", "1") in ("1", "true", "True")
+        self.airtable_outbox_path = os.getenv("AIRTABLE_OUTBOX_PATH")
+        self.airtable_outbox_flush_s = float(os.getenv("AIRTABLE_OUTBOX_FLUSH_S", "2"))
+        self.airtable_outbox_max_attempts = int(os.getenv("AIRTABLE_OUTBOX_MAX_ATTEMPTS", "8"))
+
+        # SCN_6 par lot (/generate_batch) : pool borné, Type_cible envoyés par paquets
+        self.scn6_batch_workers = int(os.getenv("SCN6_BATCH_WORKERS", "8"))
+        self.scn6_batch_write_rows = int(os.getenv("SCN6_BATCH_WRITE_ROWS", "100"))
+
+        # Cache des séances générées (SCN_6 → SCN_2 / SCN_0g), clé = empreinte des entrées
+        self.session_cache_enabled = os.getenv("SESSION_CACHE", "1") in ("1", "true", "True")
+        self.session_cache_ttl = float(os.getenv("SESSION_CACHE_TTL", "600"))
+        self.session_cache_max_entries = int(os.getenv("SESSION_CACHE_MAX_ENTRIES", "5000"))
+        self.session_cache_max_bytes = int(os.getenv("SESSION_CACHE_MAX_BYTES", "50000000"))
+
+        # Bibliothèque de blocs SCN_2 (block_id → steps / blocs), défaut engine/blocks/running.json
+        self.block_library_path = os.getenv("BLOCK_LIBRARY_PATH")
+
+        # Tables VDOT : allures semées depuis la table Airtable VDOT au démarrage
+        self.vdot_reference_seed = os.getenv("VDOT_REFERENCE_SEED", "1") in ("1", "true", "True")
+
+        # Catalogue SCN_2 précalculé au démarrage (séance = lookup + estampillage)
+        self.scn2_catalogue_enabled = os.getenv("SCN2_CATALOGUE", "1") in ("1", "true", "True")
+
+        # Charge d'entraînement par coureur (ATL/CTL/TSB) → recent_load de SCN_2
+        self.training_load_enabled = os.getenv("TRAINING_LOAD", "1") in ("1", "true", "True")
+        self.training_load_path = os.getenv("TRAINING_LOAD_PATH")
+
+        # Idempotency-Key : réponses conservées (TTL), attente max d'un doublon en cours
+        self.idempotency_path = os.getenv("IDEMPOTENCY_PATH")
+        self.idempotency_ttl_s = float(os.getenv("IDEMPOTENCY_TTL_S", "86400"))
+        self.idempotency_wait_s = float(os.getenv("IDEMPOTENCY_WAIT_S", "60"))
+        # Original "pending" au-delà de ce délai : worker tombé, la clé est reprise
+        self.idempotency_stale_s = float(os.getenv("IDEMPOTENCY_STALE_S", "900"))
+
+        # Mesure des étapes (core/utils/timings.py) : war_room["timings"]
+        # pour toutes les requêtes, et allocations via tracemalloc (coûteux)
+        self.scn_timings = os.getenv("SCN_TIMINGS", "0") in ("1", "true", "True")
+        self.span_trace_alloc = os.getenv("SPAN_TRACE_ALLOC", "0") in ("1", "true", "True")
+
+        # Référentiel mémoire (Séances Types, Mapping Phase…) : période de rafraîchissement
+        self.reference_data_refresh_s = float(os.getenv("REFERENCE_DATA_REFRESH_S", "900"))
+
     def is_valid(self):
         return bool(self.api_key and self.base_id)
 
@@ -0,0 +1,200 @@
+# core/utils/timings.py
+# =====================================================
+# Mesure des étapes des scénarios (spans)
+#
+#   with span("scn_6.rg00"):
+#       scenario_and_family(context)
+#
+# - temps mur par étape (perf_counter)
+# - allocations nettes (tracemalloc, seulement si SPAN_TRACE_ALLOC=1 :
+#   coûteux, valeur approximative car commune à tout le process)
+# - histogramme par étape pour tout le process (/metrics/timings)
+# - détail de la requête (war_room["timings"]) si un relevé est
+#   ouvert par track_timings() ; suit la requête via un ContextVar
+# =====================================================
+
+import contextvars
+import threading
+import time
+import tracemalloc
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+from core.config import config
+
+# Bornes des buckets (ms)
+BUCKETS_MS = (0.1, 0.5, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class StageHistogram:
+    """
+    Histogramme à buckets fixes d'une étape (thread-safe via le registre).
+    """
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.min_ms: Optional[float] = None
+        self.max_ms = 0.0
+        self.alloc_kb = 0.0
+
+    def add(self, ms: float, alloc_kb: Optional[float]) -> None:
+        self.counts[bisect_left(BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.min_ms = ms if self.min_ms is None else min(self.min_ms, ms)
+        self.max_ms = max(self.max_ms, ms)
+        if alloc_kb is not None:
+            self.alloc_kb += alloc_kb
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Borne haute du bucket contenant le quantile q (max observé au-delà).
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                return min(BUCKETS_MS[i], self.max_ms) if i < len(BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else None,
+            "min_ms": round(self.min_ms, 3) if self.min_ms is not None else None,
+            "max_ms": round(self.max_ms, 3),
+            "p50_ms": self.quantile(0.50),
+            "p95_ms": self.quantile(0.95),
+            "p99_ms": self.quantile(0.99),
+            "alloc_kb_total": round(self.alloc_kb, 1),
+            "buckets": {
+                (f"le_{b}" if i < len(BUCKETS_MS) else "inf"): n
+                for i, (b, n) in enumerate(zip(BUCKETS_MS + (None,), self.counts))
+                if n
+            },
+        }
+
+
+class StageHistograms:
+    """
+    Histogrammes par étape pour tout le process.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages: Dict[str, StageHistogram] = {}
+
+    def add(self, stage: str, ms: float, alloc_kb: Optional[float] = None) -> None:
+        with self._lock:
+            hist = self._stages.get(stage)
+            if hist is None:
+                hist = self._stages[stage] = StageHistogram()
+            hist.add(ms, alloc_kb)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stages.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "trace_alloc": tracemalloc.is_tracing(),
+                "stages": {name: h.summary() for name, h in sorted(self._stages.items())},
+            }
+
+
+class Timings:
+    """
+    Relevé des spans d'une requête, dans l'ordre d'ouverture.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.perf_counter()
+        self.spans: List[dict] = []
+
+    def open(self, stage: str, depth: int) -> dict:
+        entry = {"stage": stage, "depth": depth, "ms": None}
+        with self._lock:
+            self.spans.append(entry)
+        return entry
+
+    def summary(self) -> dict:
+        with self._lock:
+            return {
+                "total_ms": round((time.perf_counter() - self.started) * 1000, 3),
+                "spans": [dict(s) for s in self.spans],
+            }
+
+
+# Instance unique pour tout le process
+stage_histograms = StageHistograms()
+
+_CURRENT: contextvars.ContextVar[Optional[Timings]] = contextvars.ContextVar(
+    "scenario_timings", default=None
+)
+_DEPTH: contextvars.ContextVar[int] = contextvars.ContextVar("scenario_span_depth", default=0)
+
+if config.span_trace_alloc and not tracemalloc.is_tracing():
+    tracemalloc.start()
+
+
+@contextmanager
+def track_timings() -> Iterator[Timings]:
+    """
+    Ouvre un relevé pour la durée du bloc (imbriqué : le relevé parent
+    est réutilisé, les spans s'y ajoutent).
+    """
+    current = _CURRENT.get()
+    if current is not None:
+        yield current
+        return
+
+    timings = Timings()
+    token = _CURRENT.set(timings)
+    try:
+        yield timings
+    finally:
+        _CURRENT.reset(token)
+
+
+@contextmanager
+def span(stage: str) -> Iterator[None]:
+    timings = _CURRENT.get()
+    depth = _DEPTH.get()
+    entry = timings.open(stage, depth) if timings is not None else None
+    depth_token = _DEPTH.set(depth + 1)
+
+    tracing = tracemalloc.is_tracing()
+    mem_before = tracemalloc.get_traced_memory()[0] if tracing else 0
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        ms = (time.perf_counter() - started) * 1000
+        alloc_kb = (tracemalloc.get_traced_memory()[0] - mem_before) / 1024 if tracing else None
+        _DEPTH.reset(depth_token)
+
+        stage_histograms.add(stage, ms, alloc_kb)
+        if entry is not None:
+            entry["ms"] = round(ms, 3)
+            if alloc_kb is not None:
+                entry["alloc_kb"] = round(alloc_kb, 1)
+
+
+def timings_requested(payload) -> bool:
+    """
+    war_room["timings"] : demandé par la requête ("timings": true)
+    ou activé pour tout le process (SCN_TIMINGS=1).
+    """
+    if config.scn_timings:
+        return True
+    if not isinstance(payload, dict):
+        payload = getattr(payload, "payload", None)
+    return isinstance(payload, dict) and bool(payload.get("timings"))
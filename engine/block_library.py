@@ -0,0 +1,367 @@
+# engine/block_library.py
+# =====================================================
+# Bibliothèque de blocs : block_id → steps / blocs structurés
+# - fichier JSON (engine/blocks/running.json) chargé et validé
+#   une fois au démarrage
+# - gabarits compilés en structures immuables ; à la requête,
+#   seuls les nombres sont calculés (durées, répétitions)
+# - règles évaluées dans l'ordre du fichier (la première qui
+#   s'applique gagne) ; candidats mémorisés par block_id
+# - ajouter un type de séance = ajouter un gabarit + une règle,
+#   sans coût supplémentaire par requête
+# - type sans règle (SL, Fartlek…) : gabarit de repli du fichier
+#   ("fallback"), où "{type}" désigne le type de séance demandé
+# - échauffement / retour au calme réduits si la séance est trop
+#   courte : la somme des blocs ne dépasse jamais la durée
+# =====================================================
+
+import json
+import string
+from dataclasses import dataclass
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, NamedTuple, Optional, Tuple, Union
+
+from core.config import config
+
+DEFAULT_PATH = Path(__file__).resolve().parent / "blocks" / "running.json"
+
+# Références de durée utilisables dans les gabarits
+DURATION_REFS = ("total", "warmup", "cooldown", "main", "main_rest")
+TEXT_FIELDS = ("reps", "work", "recovery", "main", "type")
+# Type de séance demandé (step.type, block.intensity, intensity_tags)
+TYPE_REF = "{type}"
+RULE_KEYS = ("types", "levels", "exclude_levels", "phases", "min_duration", "max_duration", "template")
+
+# Au-delà, les block_id inédits (niveaux non canoniques…) ne sont plus mémorisés
+MAX_INDEXED_IDS = 4096
+
+
+class BlockLibraryError(ValueError):
+    """
+    Fichier de blocs invalide.
+    """
+
+
+class StepTemplate(NamedTuple):
+    label: str
+    type: str
+    duration: Union[str, float]
+    comment: str
+    formatted: bool
+
+
+class BlockTemplate(NamedTuple):
+    block_type: str
+    description: str
+    duration: Union[str, float]
+    intensity: str
+    formatted: bool
+
+
+@dataclass(frozen=True)
+class SessionTemplate:
+    name: str
+    intensity_tags: Tuple[str, ...]
+    params: Mapping[str, float]
+    steps: Tuple[StepTemplate, ...]
+    blocks: Tuple[BlockTemplate, ...]
+    shares: Tuple[float, ...]
+    # params résolus à la compilation
+    warmup: int
+    cooldown: int
+    main_min: int
+    rep_work: Union[int, float]
+    rep_recovery: Union[int, float]
+
+    def durations(self, total: int) -> Dict[str, Any]:
+        """
+        Paramètres numériques de la séance pour un volume donné.
+        """
+        warmup, cooldown = self.warmup, self.cooldown
+        main = total - warmup - cooldown
+        if main < self.main_min:
+            # Séance courte : corps de séance préservé, le reste réparti au prorata
+            room = max(total - self.main_min, 0)
+            warmup = warmup * room // (warmup + cooldown) if warmup + cooldown else 0
+            cooldown = min(cooldown, room - warmup)
+            main = total - warmup - cooldown
+        values = {
+            "total": total,
+            "warmup": warmup,
+            "cooldown": cooldown,
+            "main": main,
+            "main_rest": main - sum(int(main * share) for share in self.shares),
+        }
+        if self.rep_work:
+            values["work"] = self.rep_work
+            values["recovery"] = self.rep_recovery
+            values["reps"] = max(1, int(main // (self.rep_work + self.rep_recovery)))
+        return values
+
+    def fill(self, total: int, seance_type: str = "") -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], List[str]]:
+        """
+        (steps, blocks, intensity_tags) : dicts neufs à chaque appel.
+        """
+        values = self.durations(total)
+        values["type"] = seance_type
+        main = values["main"]
+
+        steps = [
+            {
+                "label": label.format(**values) if formatted else label,
+                "type": seance_type if step_type == TYPE_REF else step_type,
+                "duration_min": values[ref] if ref.__class__ is str else int(main * ref),
+                "comment": comment.format(**values) if formatted else comment,
+            }
+            for label, step_type, ref, comment, formatted in self.steps
+        ]
+        blocks = [
+            {
+                "block_type": block_type,
+                "description": description.format(**values) if formatted else description,
+                "duration_min": values[ref] if ref.__class__ is str else int(main * ref),
+                "distance_km": None,
+                "intensity": {"type": "tag", "value": seance_type if intensity == TYPE_REF else intensity},
+            }
+            for block_type, description, ref, intensity, formatted in self.blocks
+        ]
+        return steps, blocks, [seance_type if tag == TYPE_REF else tag for tag in self.intensity_tags]
+
+
+@dataclass(frozen=True)
+class Rule:
+    types: frozenset
+    levels: Optional[frozenset]
+    exclude_levels: frozenset
+    phases: Optional[frozenset]
+    min_duration: Optional[float]
+    max_duration: Optional[float]
+    template: SessionTemplate
+
+    def matches(self, seance_type: str, phase_name: str, level: str) -> bool:
+        return (
+            seance_type in self.types
+            and (self.levels is None or level in self.levels)
+            and level not in self.exclude_levels
+            and (self.phases is None or phase_name in self.phases)
+        )
+
+    def accepts(self, duration: int) -> bool:
+        return (
+            (self.min_duration is None or duration >= self.min_duration)
+            and (self.max_duration is None or duration <= self.max_duration)
+        )
+
+
+def _num(value: float) -> Union[int, float]:
+    return int(value) if float(value).is_integer() else value
+
+
+# ---------------------------------------------------------
+# Validation + compilation
+# ---------------------------------------------------------
+def _fail(source: str, where: str, message: str) -> BlockLibraryError:
+    return BlockLibraryError(f"{source} : {where} : {message}")
+
+
+def _text(source: str, where: str, text: Any, params: Mapping[str, float]) -> bool:
+    """
+    Vérifie les champs {…} d'un texte ; True s'il doit être formaté.
+    """
+    if not isinstance(text, str):
+        raise _fail(source, where, "texte attendu")
+    fields = {name for _, name, _, _ in string.Formatter().parse(text) if name is not None}
+    unknown = fields - set(TEXT_FIELDS)
+    if unknown:
+        raise _fail(source, where, f"champs inconnus {sorted(unknown)}")
+    if fields & {"reps", "work", "recovery"} and not params.get("rep_work"):
+        raise _fail(source, where, "répétitions sans params.rep_work")
+    return bool(fields)
+
+
+def _duration(source: str, where: str, ref: Any) -> Union[str, float]:
+    if isinstance(ref, str) and ref in DURATION_REFS:
+        return ref
+    if isinstance(ref, dict) and set(ref) == {"share"} and isinstance(ref["share"], (int, float)) and 0 < ref["share"] < 1:
+        return float(ref["share"])
+    raise _fail(source, where, f"durée invalide {ref!r} (attendu {DURATION_REFS} ou {{'share': 0..1}})")
+
+
+def _compile_template(source: str, name: str, raw: Any) -> SessionTemplate:
+    where = f"templates.{name}"
+    if not isinstance(raw, dict):
+        raise _fail(source, where, "objet attendu")
+
+    tags = raw.get("intensity_tags")
+    if not tags or not all(isinstance(t, str) for t in tags):
+        raise _fail(source, where, "intensity_tags : liste non vide attendue")
+
+    params = raw.get("params") or {}
+    if not isinstance(params, dict) or not all(isinstance(v, (int, float)) and v >= 0 for v in params.values()):
+        raise _fail(source, where, "params : nombres positifs attendus")
+    params = MappingProxyType(dict(params))
+
+    steps, blocks = [], []
+    for i, s in enumerate(raw.get("steps") or []):
+        at = f"{where}.steps[{i}]"
+        if not isinstance(s, dict) or not all(k in s for k in ("label", "type", "duration")):
+            raise _fail(source, at, "label / type / duration requis")
+        comment = s.get("comment") or ""
+        # label et comment formatés ensemble (même indicateur)
+        formatted = _text(source, at, comment, params) | _text(source, at, s["label"], params)
+        steps.append(StepTemplate(
+            label=s["label"],
+            type=s["type"],
+            duration=_duration(source, at, s["duration"]),
+            comment=comment,
+            formatted=formatted,
+        ))
+    for i, b in enumerate(raw.get("blocks") or []):
+        at = f"{where}.blocks[{i}]"
+        if not isinstance(b, dict) or not all(k in b for k in ("block_type", "description", "duration", "intensity")):
+            raise _fail(source, at, "block_type / description / duration / intensity requis")
+        blocks.append(BlockTemplate(
+            block_type=b["block_type"],
+            description=b["description"],
+            duration=_duration(source, at, b["duration"]),
+            intensity=b["intensity"],
+            formatted=_text(source, at, b["description"], params),
+        ))
+    if not steps or not blocks:
+        raise _fail(source, where, "steps et blocks non vides requis")
+
+    shares = tuple(b.duration for b in blocks if not isinstance(b.duration, str))
+    if sum(shares) > 1:
+        raise _fail(source, where, "somme des parts (share) > 1")
+
+    return SessionTemplate(
+        name=name,
+        intensity_tags=tuple(tags),
+        params=params,
+        steps=tuple(steps),
+        blocks=tuple(blocks),
+        shares=shares,
+        warmup=int(params.get("warmup", 0)),
+        cooldown=int(params.get("cooldown", 0)),
+        main_min=int(params.get("main_min", 0)),
+        rep_work=_num(params.get("rep_work", 0)),
+        rep_recovery=_num(params.get("rep_recovery", 0)),
+    )
+
+
+def _compile_rule(source: str, i: int, raw: Any, templates: Mapping[str, SessionTemplate]) -> Rule:
+    where = f"rules[{i}]"
+    if not isinstance(raw, dict):
+        raise _fail(source, where, "objet attendu")
+    unknown = set(raw) - set(RULE_KEYS)
+    if unknown:
+        raise _fail(source, where, f"clés inconnues {sorted(unknown)}")
+    if raw.get("template") not in templates:
+        raise _fail(source, where, f"gabarit inconnu {raw.get('template')!r}")
+    if not raw.get("types"):
+        raise _fail(source, where, "types requis")
+
+    def optional_set(key: str) -> Optional[frozenset]:
+        return frozenset(raw[key]) if raw.get(key) else None
+
+    return Rule(
+        types=frozenset(t.upper() for t in raw["types"]),
+        levels=optional_set("levels"),
+        exclude_levels=frozenset(raw.get("exclude_levels") or ()),
+        phases=optional_set("phases"),
+        min_duration=raw.get("min_duration"),
+        max_duration=raw.get("max_duration"),
+        template=templates[raw["template"]],
+    )
+
+
+class BlockLibrary:
+    """
+    Gabarits compilés + règles de sélection, index par block_id.
+    """
+
+    def __init__(self, data: Dict[str, Any], source: str = "<dict>"):
+        if not isinstance(data, dict) or not isinstance(data.get("templates"), dict) or not data["templates"]:
+            raise _fail(source, "racine", "objet avec templates non vide attendu")
+        if not isinstance(data.get("rules"), list) or not data["rules"]:
+            raise _fail(source, "racine", "rules : liste non vide attendue")
+
+        self.source = source
+        self.version = data.get("version")
+        self.templates: Mapping[str, SessionTemplate] = MappingProxyType({
+            name: _compile_template(source, name, raw) for name, raw in data["templates"].items()
+        })
+        self.rules: Tuple[Rule, ...] = tuple(
+            _compile_rule(source, i, raw, self.templates) for i, raw in enumerate(data["rules"])
+        )
+        fallback = data.get("fallback")
+        if fallback is not None and fallback not in self.templates:
+            raise _fail(source, "fallback", f"gabarit inconnu {fallback!r}")
+        self.fallback: Optional[SessionTemplate] = self.templates[fallback] if fallback else None
+        self._index: Dict[Tuple[str, str], Tuple[Rule, ...]] = {}
+
+    @classmethod
+    def from_file(cls, path: Path) -> "BlockLibrary":
+        path = Path(path)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            raise BlockLibraryError(f"{path} : {e}")
+        return cls(data, source=str(path))
+
+    def template(
+        self,
+        block_id: str,
+        seance_type: str,
+        phase_name: str,
+        level: str,
+        volume_target_min: int,
+    ) -> Optional[SessionTemplate]:
+        """
+        Gabarit du block_id (None : type sans gabarit).
+        """
+        key = (block_id, level)
+        candidates = self._index.get(key)
+        if candidates is None:
+            seance_type = seance_type.upper()
+            candidates = tuple(r for r in self.rules if r.matches(seance_type, phase_name, level))
+            if len(self._index) < MAX_INDEXED_IDS:
+                self._index[key] = candidates
+
+        for rule in candidates:
+            if rule.accepts(volume_target_min):
+                return rule.template
+        return None
+
+    def build(
+        self,
+        block_id: str,
+        seance_type: str,
+        phase_name: str,
+        level: str,
+        volume_target_min: int,
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], List[str]]:
+        """
+        (steps, blocks, intensity_tags) de la séance ; gabarit de repli
+        pour les types sans règle.
+        """
+        template = self.template(block_id, seance_type, phase_name, level, volume_target_min) or self.fallback
+        if template is None:
+            raise ValueError(f"Blocs non définis pour le type de séance {seance_type} ({block_id})")
+        return template.fill(volume_target_min, seance_type.upper())
+
+    def stats(self) -> dict:
+        return {
+            "source": self.source,
+            "version": self.version,
+            "templates": len(self.templates),
+            "rules": len(self.rules),
+            "fallback": self.fallback.name if self.fallback else None,
+            "indexed_ids": len(self._index),
+        }
+
+
+# Instance unique pour tout le process
+block_library = BlockLibrary.from_file(config.block_library_path or DEFAULT_PATH)
@@ -0,0 +1,306 @@
+# engine/vdot.py
+# =====================================================
+# VDOT : chrono de course → VDOT, VDOT → allures E/M/T/I/R
+# - formules de Daniels & Gilbert (coût en O2 de la vitesse,
+#   fraction de VO2max tenable selon la durée d'effort)
+# - tables denses précalculées à l'import (NumPy) :
+#     * VDOT 20 → 85 par pas de 0,1 → allure de chaque zone (min/km)
+#     * par distance (5K / 10K / HM / M), chrono à la seconde → VDOT
+# - lookup = interpolation linéaire sur grille régulière : l'indice
+#   est calculé directement (pas de recherche), O(1) par valeur,
+#   vectorisé pour les lots (plan entier)
+# - allures optionnellement remplacées par la table Airtable VDOT
+#   (référentiel) sur la plage de VDOT qu'elle couvre
+#
+# Hors plage (chrono ou VDOT), les valeurs sont bornées à la grille.
+# =====================================================
+
+import math
+from typing import Any, Dict, Iterable, Mapping, Optional, Tuple, Union
+
+import numpy as np
+
+from core.config import config
+from core.utils.logger import log_info, log_error
+from services.airtable_fields import ATFIELDS
+
+VDOT_MIN = 20.0
+VDOT_MAX = 85.0
+VDOT_STEP = 0.1
+
+ZONES = ("E", "M", "T", "I", "R")
+
+# Fraction de VDOT (VO2) soutenue par zone ; M = allure du marathon
+# prédit (calée sur les tables de Daniels, ex. VDOT 50 : E 5:15, T 4:15,
+# I 3:55, R 3:40 /km)
+ZONE_FRACTION = {"E": 0.68, "T": 0.88, "I": 0.975, "R": 1.055}
+
+# Distance (m) et plage de chronos (s) couverte par la table
+RACES = {
+    "5K": (5000.0, 600, 3600),
+    "10K": (10000.0, 1200, 7800),
+    "HM": (21097.5, 2700, 17100),
+    "M": (42195.0, 5700, 36000),
+}
+RACE_ALIASES = {
+    "5K": "5K", "5KM": "5K",
+    "10K": "10K", "10KM": "10K",
+    "HM": "HM", "SEMI": "HM", "SEMI-MARATHON": "HM", "SEMI MARATHON": "HM", "21K": "HM",
+    "M": "M", "MARATHON": "M", "42K": "M",
+}
+
+# Champs de la table Airtable VDOT (allures en min/km)
+SEED_FIELDS = {
+    "E": ATFIELDS.VDOT_ALLURE_E,
+    "M": ATFIELDS.VDOT_ALLURE_M,
+    "T": ATFIELDS.VDOT_ALLURE_T,
+    "I": ATFIELDS.VDOT_ALLURE_I,
+    "R": ATFIELDS.VDOT_ALLURE_R,
+}
+
+ArrayLike = Union[float, Iterable[float], np.ndarray]
+
+
+# ---------------------------------------------------------
+# Formules de Daniels & Gilbert
+# ---------------------------------------------------------
+def _vo2(velocity_m_min: np.ndarray) -> np.ndarray:
+    return -4.60 + 0.182258 * velocity_m_min + 0.000104 * velocity_m_min ** 2
+
+
+def _vo2_fraction(minutes: np.ndarray) -> np.ndarray:
+    return 0.8 + 0.1894393 * np.exp(-0.012778 * minutes) + 0.2989558 * np.exp(-0.1932605 * minutes)
+
+
+def _velocity(vo2: np.ndarray) -> np.ndarray:
+    """
+    Vitesse (m/min) dont le coût est vo2 (racine positive de _vo2).
+    """
+    a, b, c = 0.000104, 0.182258, -4.60
+    return (-b + np.sqrt(b * b - 4 * a * (c - vo2))) / (2 * a)
+
+
+def race_vdot_formula(distance_m: float, seconds: np.ndarray) -> np.ndarray:
+    minutes = np.asarray(seconds, dtype=float) / 60.0
+    return _vo2(distance_m / minutes) / _vo2_fraction(minutes)
+
+
+def normalize_race(distance: Any) -> Optional[str]:
+    """
+    "10K", "Semi", "Marathon"… → clé de RACES, sinon None.
+    """
+    if not isinstance(distance, str):
+        return None
+    return RACE_ALIASES.get(distance.strip().upper())
+
+
+def parse_pace(value: Any) -> Optional[float]:
+    """
+    Allure Airtable → min/km : nombre (5.25) ou texte "5:15".
+    """
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value) if value > 0 else None
+    if isinstance(value, str) and value.strip():
+        text = value.strip().split("/")[0].strip()
+        try:
+            if ":" in text:
+                minutes, seconds = text.split(":")
+                return int(minutes) + int(seconds) / 60.0
+            return float(text.replace(",", "."))
+        except ValueError:
+            return None
+    return None
+
+
+# ---------------------------------------------------------
+# Interpolation sur grille régulière
+# ---------------------------------------------------------
+class _Grid:
+    """
+    Valeurs `values` échantillonnées sur start, start + step, …
+    """
+
+    def __init__(self, start: float, step: float, values: np.ndarray):
+        self.start = start
+        self.step = step
+        self.values = values
+        self.last = len(values) - 1
+        self._list = values.tolist()
+
+    def at(self, x: float) -> float:
+        pos = (x - self.start) / self.step
+        if pos <= 0:
+            return self._list[0]
+        if pos >= self.last:
+            return self._list[self.last]
+        i = int(pos)
+        low = self._list[i]
+        return low + (pos - i) * (self._list[i + 1] - low)
+
+    def batch(self, xs: ArrayLike) -> np.ndarray:
+        pos = np.clip((np.asarray(xs, dtype=float) - self.start) / self.step, 0, self.last)
+        i = np.minimum(pos.astype(np.int64), self.last - 1)
+        low = self.values[i]
+        return low + (pos - i) * (self.values[i + 1] - low)
+
+
+class VdotTables:
+    """
+    Tables précalculées (immuables une fois construites).
+    """
+
+    def __init__(self, zone_paces: Mapping[str, np.ndarray], source: str = "daniels", seeded_rows: int = 0):
+        self.grid = np.round(np.arange(VDOT_MIN, VDOT_MAX + VDOT_STEP / 2, VDOT_STEP), 1)
+        self.source = source
+        self.seeded_rows = seeded_rows
+        self._paces = {zone: _Grid(VDOT_MIN, VDOT_STEP, zone_paces[zone]) for zone in ZONES}
+
+        self._race_vdot: Dict[str, _Grid] = {}
+        self._race_time: Dict[str, _Grid] = {}
+        for race, (distance_m, t_min, t_max) in RACES.items():
+            seconds = np.arange(t_min, t_max + 1, dtype=float)
+            vdots = race_vdot_formula(distance_m, seconds)
+            self._race_vdot[race] = _Grid(float(t_min), 1.0, np.clip(vdots, VDOT_MIN, VDOT_MAX))
+            # VDOT décroissant avec le chrono : inversion par interpolation
+            self._race_time[race] = _Grid(VDOT_MIN, VDOT_STEP, np.interp(self.grid, vdots[::-1], seconds[::-1]))
+
+    # ---------------------------------------------------------
+    # Construction
+    # ---------------------------------------------------------
+    @classmethod
+    def build(cls) -> "VdotTables":
+        """
+        Allures par formule ; M = allure du marathon prédit.
+        """
+        grid = np.round(np.arange(VDOT_MIN, VDOT_MAX + VDOT_STEP / 2, VDOT_STEP), 1)
+        paces = {zone: 1000.0 / _velocity(grid * fraction) for zone, fraction in ZONE_FRACTION.items()}
+
+        distance_m, t_min, t_max = RACES["M"]
+        seconds = np.arange(t_min, t_max + 1, dtype=float)
+        vdots = race_vdot_formula(distance_m, seconds)
+        marathon_s = np.interp(grid, vdots[::-1], seconds[::-1])
+        paces["M"] = marathon_s / 60.0 / (distance_m / 1000.0)
+        return cls(paces)
+
+    def seeded(self, records: Iterable[Mapping[str, Any]]) -> "VdotTables":
+        """
+        Copie dont les allures suivent la table Airtable VDOT sur la plage
+        qu'elle couvre (interpolation entre ses lignes), la formule ailleurs.
+        """
+        rows = []
+        for rec in records:
+            fields = rec.get("fields") or {}
+            vdot = fields.get(ATFIELDS.VDOT_VDOT)
+            if isinstance(vdot, (int, float)) and VDOT_MIN <= vdot <= VDOT_MAX:
+                rows.append((float(vdot), {z: parse_pace(fields.get(f)) for z, f in SEED_FIELDS.items()}))
+        rows.sort(key=lambda row: row[0])
+
+        paces = {zone: self._paces[zone].values.copy() for zone in ZONES}
+        for zone in ZONES:
+            points = [(vdot, p[zone]) for vdot, p in rows if p[zone] is not None]
+            xs = np.array([v for v, _ in points])
+            if len(points) < 2 or np.any(np.diff(xs) <= 0):
+                continue
+            ys = np.array([p for _, p in points])
+            mask = (self.grid >= xs[0]) & (self.grid <= xs[-1])
+            paces[zone][mask] = np.interp(self.grid[mask], xs, ys)
+        return VdotTables(paces, source="airtable" if rows else self.source, seeded_rows=len(rows))
+
+    # ---------------------------------------------------------
+    # Lookups unitaires (floats Python)
+    # ---------------------------------------------------------
+    def vdot_from_race(self, distance: str, seconds: float) -> Optional[float]:
+        race = normalize_race(distance)
+        if race is None or not seconds or seconds <= 0:
+            return None
+        return round(self._race_vdot[race].at(seconds), 1)
+
+    def race_time(self, distance: str, vdot: float) -> Optional[int]:
+        race = normalize_race(distance)
+        if race is None:
+            return None
+        return int(round(self._race_time[race].at(vdot)))
+
+    def pace(self, vdot: float, zone: str = "E") -> float:
+        """
+        Allure (min/km) de la zone pour ce VDOT.
+        """
+        return self._paces[zone].at(vdot)
+
+    def pace_table(self, vdot: float) -> Dict[str, float]:
+        return {zone: round(self._paces[zone].at(vdot), 2) for zone in ZONES}
+
+    # ---------------------------------------------------------
+    # Lookups par lot (np.ndarray)
+    # ---------------------------------------------------------
+    def vdots_from_race(self, distance: str, seconds: ArrayLike) -> np.ndarray:
+        race = normalize_race(distance)
+        if race is None:
+            raise ValueError(f"Distance VDOT inconnue : {distance!r}")
+        return np.round(self._race_vdot[race].batch(seconds), 1)
+
+    def paces(self, vdots: ArrayLike, zone: str = "E") -> np.ndarray:
+        return self._paces[zone].batch(vdots)
+
+    def distances_km(self, durations_min: ArrayLike, vdots: ArrayLike, zone: str = "E") -> np.ndarray:
+        """
+        Distance estimée (km, 0,1 près) de chaque durée à l'allure de la zone.
+        """
+        return np.round(np.asarray(durations_min, dtype=float) / self.paces(vdots, zone), 1)
+
+
+class VdotEngine:
+    """
+    Tables courantes (formule, ou semées par le référentiel), remplacées d'un bloc.
+    """
+
+    def __init__(self, tables: VdotTables):
+        self.tables = tables
+
+    def seed_from_reference(self) -> int:
+        """
+        Semis depuis la table VDOT déjà chargée par le référentiel.
+        Retourne le nombre de lignes retenues (0 : tables par formule).
+        """
+        if not config.vdot_reference_seed:
+            return 0
+        from services.airtable_tables import ATABLES
+        from services.reference_data import reference_store
+
+        table = reference_store.loaded_table(ATABLES.VDOT_TABLE_ID)
+        if table is None or not len(table):
+            return 0
+        try:
+            tables = self.tables.seeded(table.records)
+        except Exception as e:
+            log_error(f"Table VDOT ignorée : {e}", module="VDOT")
+            return 0
+
+        self.tables = tables
+        log_info(f"Allures VDOT semées depuis Airtable ({tables.seeded_rows} lignes)", module="VDOT")
+        return tables.seeded_rows
+
+    def stats(self) -> dict:
+        tables = self.tables
+        return {
+            "source": tables.source,
+            "seeded_rows": tables.seeded_rows,
+            "vdot_range": [VDOT_MIN, VDOT_MAX],
+            "grid_points": len(tables.grid),
+            "races": list(RACES),
+            "paces_vdot_50": tables.pace_table(50.0),
+        }
+
+
+def valid_vdot(value: Any) -> Optional[float]:
+    """
+    VDOT exploitable (nombre dans la plage des tables), sinon None.
+    """
+    if isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value):
+        if VDOT_MIN <= value <= VDOT_MAX:
+            return float(value)
+    return None
+
+
+# Instance unique pour tout le process
+vdot_engine = VdotEngine(VdotTables.build())
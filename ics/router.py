@@ -4,7 +4,7 @@ from pydantic import BaseModel
 
 from ics.ics_builder import build_ics
 
-from services.airtable_service import AirtableService
+from services.airtable_async import AsyncAirtableService
 from services.airtable_tables import ATABLES
 
 router = APIRouter(prefix="/ics", tags=["ICS"])
@@ -28,7 +28,7 @@ def generate_ics_from_session(payload: ICSRequest):
         return {"status": "error", "error": f"Unexpected ICS error: {e}"}
 
 @router.post("/from-scn6")
-def generate_ics_from_scn6(payload: ICSFromSCN6Request):
+async def generate_ics_from_scn6(payload: ICSFromSCN6Request):
     session = payload.session
     coureur_id = payload.coureur_id
     start_hour = payload.start_hour
@@ -37,8 +37,8 @@ def generate_ics_from_scn6(payload: ICSFromSCN6Request):
 
     # 🔍 Lookup Airtable du lieu coureur (optionnel)
     if coureur_id:
-        airtable = AirtableService()
-        record = airtable.get_record(ATABLES.COU_TABLE, coureur_id)
+        airtable = AsyncAirtableService()
+        record = await airtable.get_record(ATABLES.COU_TABLE, coureur_id)
         if record:
             fields = record.get("fields", {})
             location = (
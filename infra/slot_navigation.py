@@ -3,8 +3,11 @@ from datetime import date, timedelta
 from pydantic import BaseModel, Field
 from typing import Optional, Literal, Any, Dict
 from core.utils.logger import get_logger
+from services.airtable_query import and_, eq
 from services.airtable_tables import ATABLES
 from services.airtable_service import AirtableService
+from services.idempotency import idempotent
+from services.training_load import training_load_store
 from utils.next_slot import compute_next_slot
 
 # On réutilise le calcul de date du CORE_1 (utilitaire pur)
@@ -110,13 +113,26 @@ def ensure_previous_slot_is_consumed(previous_slot_fields: Dict[str, Any]) -> No
             }
         )
 
+def record_training_feedback(
+    runner_id: str,
+    previous_slot_fields: Dict[str, Any],
+    previous_slot_id: str,
+    fb_status: str,
+) -> bool:
+    """
+    Feedback → charge d'entraînement. SCN_6 enregistre la séance sous le
+    Slot_ID composite (clé d'upsert des Slots), pas sous l'ID de record.
+    """
+    session_key = previous_slot_fields.get("Slot_ID") or previous_slot_id
+    return training_load_store.record_feedback(runner_id, session_key, fb_status)
+
 def find_existing_next_slot(runner_id: str, previous_slot_id: str) -> Optional[Dict[str, Any]]:
     """
     Idempotence logique : si on a déjà créé un next slot pour ce previous_slot, on le renvoie.
     TODO: à adapter selon ton modèle (champ 'Previous_Slot_ID', lien, ou trace).
     """
     # Exemple : si tu stockes le previous_slot_id dans un champ texte 'Previous_Slot_ID'
-    formula = f"AND({{Coureur_ID}}='{runner_id}', {{Previous_Slot_ID}}='{previous_slot_id}')"
+    formula = and_(eq("Coureur_ID", runner_id), eq("Previous_Slot_ID", previous_slot_id)).compile()
     matches = airtable.find_records(SLOTS_TABLE, formula=formula)
     return matches[0] if matches else None
 
@@ -137,11 +153,16 @@ def core_3_next_slot(
     - Calcule planned_date via CORE_1 (compute_next_slot_date)
     - Crée 1 slot suivant, trace la décision
     - Idempotent (logique) : renvoie le slot existant si déjà créé
+    - Idempotency-Key : relance rejouée sans nouvelle écriture
     """
     logger.info(
         f"[CORE_3] runner_id={payload.runner_id} previous_slot_id={payload.previous_slot_id} "
         f"dry_run={payload.dry_run} idem_key={idempotency_key}"
     )
+    return idempotent("core_3_next_slot", idempotency_key, payload, lambda: _core_3_next_slot(payload))
+
+
+def _core_3_next_slot(payload: Core3Input):
 
     # 1) Idempotence logique (optionnelle mais recommandée)
     try:
@@ -185,6 +206,10 @@ def core_3_next_slot(
     fb_status = normalize_feedback_status(prev_fields.get("feedback_status"))
     adaptation_mode, rule, decision_comment = decide_adaptation(fb_status)
 
+    # Charge réellement faite → état ATL/CTL du coureur (O(1))
+    if not payload.dry_run:
+        record_training_feedback(payload.runner_id, prev_fields, payload.previous_slot_id, fb_status)
+
     reasoning = {
         "feedback_used": bool(fb_status),
         "feedback_status": fb_status or None,
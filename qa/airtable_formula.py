@@ -0,0 +1,259 @@
+# qa/airtable_formula.py
+# =====================================================
+# Évaluateur minimal de formules Airtable (filterByFormula)
+# pour le faux serveur Airtable (qa/fake_airtable.py).
+#
+# Couvre les formules utilisées par SmartCoach :
+#   {Champ} = 'v', !=, <, >, <=, >=, &
+#   AND / OR / NOT / IF / TRUE / FALSE / BLANK
+#   RECORD_ID() / CREATED_TIME() / LAST_MODIFIED_TIME()
+#   IS_AFTER / IS_BEFORE / IS_SAME / DATETIME_PARSE
+#   LOWER / UPPER / TRIM / LEN / FIND / SEARCH / ARRAYJOIN
+# Ce n'est PAS une implémentation complète du langage Airtable.
+# =====================================================
+
+import re
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Tuple
+
+TOKEN_RE = re.compile(r"""
+    \s*(?:
+        (?P<field>\{[^}]*\})
+      | (?P<string>'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*")
+      | (?P<number>\d+(?:\.\d+)?)
+      | (?P<op>!=|<>|<=|>=|=|<|>|&|,|\(|\)|\+|-|\*|/)
+      | (?P<name>[A-Za-z_][A-Za-z_0-9]*)
+    )""", re.VERBOSE)
+
+
+class FormulaError(ValueError):
+    pass
+
+
+def _tokenize(formula: str) -> List[Tuple[str, str]]:
+    tokens = []
+    pos = 0
+    formula = formula.strip()
+    while pos < len(formula):
+        match = TOKEN_RE.match(formula, pos)
+        if not match or match.end() == pos:
+            raise FormulaError(f"Formule invalide près de : {formula[pos:pos + 20]!r}")
+        kind = match.lastgroup
+        tokens.append((kind, match.group(kind)))
+        pos = match.end()
+        while pos < len(formula) and formula[pos].isspace():
+            pos += 1
+    return tokens
+
+
+def _unquote(literal: str) -> str:
+    body = literal[1:-1]
+    return re.sub(r"\\(.)", r"\1", body)
+
+
+# ---------------------------------------------------------
+# Valeurs Airtable
+# ---------------------------------------------------------
+def _to_text(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, (list, tuple)):
+        return ", ".join(_to_text(v) for v in value)
+    return str(value)
+
+
+def _truthy(value: Any) -> bool:
+    if isinstance(value, (list, tuple)):
+        return len(value) > 0
+    return bool(value) and value != "0"
+
+
+def _to_datetime(value: Any) -> datetime:
+    text = _to_text(value).strip()
+    if not text:
+        raise FormulaError("Date vide")
+    dt = datetime.fromisoformat(text.replace("Z", "+00:00"))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt
+
+
+def _compare(op: str, left: Any, right: Any) -> bool:
+    if isinstance(left, (int, float)) and isinstance(right, (int, float)):
+        a, b = left, right
+    else:
+        a, b = _to_text(left), _to_text(right)
+        try:
+            a, b = float(a), float(b)
+        except ValueError:
+            pass
+
+    if op == "=":
+        return a == b
+    if op in ("!=", "<>"):
+        return a != b
+    if op == "<":
+        return a < b
+    if op == ">":
+        return a > b
+    if op == "<=":
+        return a <= b
+    if op == ">=":
+        return a >= b
+    raise FormulaError(f"Opérateur inconnu : {op}")
+
+
+# ---------------------------------------------------------
+# Parseur (descente récursive → fonction record → valeur)
+# ---------------------------------------------------------
+Node = Callable[[Dict[str, Any]], Any]
+
+
+class _Parser:
+    def __init__(self, tokens: List[Tuple[str, str]]):
+        self.tokens = tokens
+        self.pos = 0
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def take(self, value: str = None):
+        kind, tok = self.peek()
+        if kind is None or (value is not None and tok != value):
+            raise FormulaError(f"Attendu {value!r}, trouvé {tok!r}")
+        self.pos += 1
+        return kind, tok
+
+    def parse(self) -> Node:
+        node = self.comparison()
+        if self.pos != len(self.tokens):
+            raise FormulaError(f"Jeton inattendu : {self.peek()[1]!r}")
+        return node
+
+    def comparison(self) -> Node:
+        left = self.concat()
+        kind, tok = self.peek()
+        if kind == "op" and tok in ("=", "!=", "<>", "<", ">", "<=", ">="):
+            self.take()
+            right = self.concat()
+            return lambda rec, l=left, r=right, op=tok: _compare(op, l(rec), r(rec))
+        return left
+
+    def concat(self) -> Node:
+        node = self.additive()
+        while self.peek() == ("op", "&"):
+            self.take()
+            right = self.additive()
+            node = (lambda rec, l=node, r=right: _to_text(l(rec)) + _to_text(r(rec)))
+        return node
+
+    def additive(self) -> Node:
+        node = self.term()
+        while self.peek()[0] == "op" and self.peek()[1] in ("+", "-", "*", "/"):
+            _, op = self.take()
+            right = self.term()
+            node = (lambda rec, l=node, r=right, op=op: _arith(op, l(rec), r(rec)))
+        return node
+
+    def term(self) -> Node:
+        kind, tok = self.take()
+
+        if kind == "field":
+            name = tok[1:-1]
+            return lambda rec: rec["fields"].get(name)
+        if kind == "string":
+            value = _unquote(tok)
+            return lambda rec: value
+        if kind == "number":
+            value = float(tok) if "." in tok else int(tok)
+            return lambda rec: value
+        if kind == "op" and tok == "(":
+            node = self.comparison()
+            self.take(")")
+            return node
+        if kind == "op" and tok == "-":
+            inner = self.term()
+            return lambda rec: -float(_to_text(inner(rec)) or 0)
+        if kind == "name":
+            return self.call(tok.upper())
+
+        raise FormulaError(f"Jeton inattendu : {tok!r}")
+
+    def call(self, name: str) -> Node:
+        self.take("(")
+        args: List[Node] = []
+        if self.peek() != ("op", ")"):
+            args.append(self.comparison())
+            while self.peek() == ("op", ","):
+                self.take()
+                args.append(self.comparison())
+        self.take(")")
+
+        func = FUNCTIONS.get(name)
+        if func is None:
+            raise FormulaError(f"Fonction non supportée par le faux serveur : {name}()")
+        return lambda rec: func(rec, args)
+
+
+def _arith(op: str, a: Any, b: Any) -> float:
+    a, b = float(_to_text(a) or 0), float(_to_text(b) or 0)
+    if op == "+":
+        return a + b
+    if op == "-":
+        return a - b
+    if op == "*":
+        return a * b
+    return a / b if b else 0
+
+
+def _if(rec, args):
+    if _truthy(args[0](rec)):
+        return args[1](rec)
+    return args[2](rec) if len(args) > 2 else ""
+
+
+def _find(rec, args, ci=False):
+    needle, haystack = _to_text(args[0](rec)), _to_text(args[1](rec))
+    if ci:
+        needle, haystack = needle.lower(), haystack.lower()
+    return haystack.find(needle) + 1
+
+
+FUNCTIONS: Dict[str, Callable[[Dict[str, Any], List[Node]], Any]] = {
+    "AND": lambda rec, args: all(_truthy(a(rec)) for a in args),
+    "OR": lambda rec, args: any(_truthy(a(rec)) for a in args),
+    "NOT": lambda rec, args: not _truthy(args[0](rec)),
+    "IF": _if,
+    "TRUE": lambda rec, args: True,
+    "FALSE": lambda rec, args: False,
+    "BLANK": lambda rec, args: "",
+    "RECORD_ID": lambda rec, args: rec["id"],
+    "CREATED_TIME": lambda rec, args: rec.get("createdTime"),
+    "LAST_MODIFIED_TIME": lambda rec, args: rec.get("lastModifiedTime") or rec.get("createdTime"),
+    "DATETIME_PARSE": lambda rec, args: _to_text(args[0](rec)),
+    "IS_AFTER": lambda rec, args: _to_datetime(args[0](rec)) > _to_datetime(args[1](rec)),
+    "IS_BEFORE": lambda rec, args: _to_datetime(args[0](rec)) < _to_datetime(args[1](rec)),
+    "IS_SAME": lambda rec, args: _to_datetime(args[0](rec)) == _to_datetime(args[1](rec)),
+    "LOWER": lambda rec, args: _to_text(args[0](rec)).lower(),
+    "UPPER": lambda rec, args: _to_text(args[0](rec)).upper(),
+    "TRIM": lambda rec, args: _to_text(args[0](rec)).strip(),
+    "LEN": lambda rec, args: len(_to_text(args[0](rec))),
+    "FIND": lambda rec, args: _find(rec, args),
+    "SEARCH": lambda rec, args: _find(rec, args, ci=True),
+    "ARRAYJOIN": lambda rec, args: (
+        (_to_text(args[1](rec)) if len(args) > 1 else ", ").join(
+            _to_text(v) for v in (args[0](rec) or [])
+        )
+        if isinstance(args[0](rec), (list, tuple)) else _to_text(args[0](rec))
+    ),
+}
+
+
+def compile_formula(formula: str) -> Callable[[Dict[str, Any]], bool]:
+    """
+    Compile une formule en prédicat record → bool.
+    """
+    node = _Parser(_tokenize(formula)).parse()
+    return lambda record: _truthy(node(record))
@@ -0,0 +1,88 @@
+# qa/bench_scn_2_catalogue.py
+# =====================================================
+# Benchmark SCN_2 : coût par séance, composition à la volée
+# vs catalogue précalculé (lookup + estampillage)
+#
+#   python -m qa.bench_scn_2_catalogue --sessions 20000
+#
+# Sortie des logs coupée : « à la volée » inclut seulement le
+# formatage de la DecisionTrace (comme en production), « sans logs »
+# le calcul seul.
+# =====================================================
+
+import argparse
+import copy
+import itertools
+import logging
+import random
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+from scenarios.agregateur import scn_2_catalogue
+from scenarios.agregateur.scn_2 import compose_running_session, generate_running_session
+from scenarios.agregateur.scn_2_catalogue import LEVELS, PHASES, SessionCatalogue
+
+Contexts = List[Tuple[Dict[str, Any], Dict[str, Any]]]
+
+
+def _contexts(count: int, seed: int) -> Contexts:
+    rng = random.Random(seed)
+    space = list(itertools.product(
+        LEVELS,
+        PHASES,
+        ["EF", "E"],
+        [None, 0.5, 1.0, 1.4],
+        [None, "fatigued", "neutral", "good"],
+    ))
+    contexts = []
+    for n in range(count):
+        level, phase, seance_type, recent_load, state = rng.choice(space)
+        run_context = {
+            "profile": {"level": level},
+            "slot": {"slot_id": f"rec{n}", "date": "2025-05-12", "phase": phase},
+            "recent_load": recent_load,
+            "user_id": f"user_{n % 500}",
+            "engine_version": "C",
+        }
+        if state:
+            run_context["adaptation"] = {"perceived_state": state}
+        contexts.append((run_context, {"seance_type": seance_type}))
+    return contexts
+
+
+def _per_session_us(fn: Callable[[Dict[str, Any], Dict[str, Any]], Any], contexts: Contexts) -> float:
+    # Copies préparées hors mesure (SCN_2 marque adaptation_applied)
+    contexts = copy.deepcopy(contexts)
+    started = time.perf_counter()
+    for run_context, phase_context in contexts:
+        fn(run_context, phase_context)
+    return (time.perf_counter() - started) * 1e6 / len(contexts)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark catalogue SCN_2")
+    parser.add_argument("--sessions", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    logging.getLogger("ROOT").setLevel(logging.WARNING)
+    contexts = _contexts(args.sessions, args.seed)
+
+    catalogue = SessionCatalogue()
+    catalogue.load()
+    scn_2_catalogue.session_catalogue = catalogue
+
+    live = _per_session_us(compose_running_session, contexts)
+    live_quiet = _per_session_us(lambda rc, pc: compose_running_session(rc, pc, verbose=False), contexts)
+    served = _per_session_us(generate_running_session, contexts)
+
+    stats = catalogue.stats()
+    print(f"catalogue   : {stats['sessions']} séances, construit en {stats['build_ms']} ms")
+    print(f"à la volée  : {live:8.1f} µs / séance")
+    print(f"  sans logs : {live_quiet:8.1f} µs / séance")
+    print(f"catalogue   : {served:8.1f} µs / séance  (hits={stats['hits']}, misses={stats['misses']})")
+    print(f"gain        : x{live / served:.1f} (x{live_quiet / served:.1f} sans logs)")
+
+
+if __name__ == "__main__":
+    main()
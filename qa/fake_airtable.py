@@ -0,0 +1,499 @@
+# qa/fake_airtable.py
+# =====================================================
+# Faux serveur REST Airtable (tests de charge, benchmarks hors réseau)
+#
+# - list (filterByFormula, fields[], sort, maxRecords, pageSize/offset)
+# - get / create / update / replace / delete, batch upsert (performUpsert)
+# - latence configurable, simulation de 429 (rate limit par base)
+# - amorçage depuis des fixtures (tests/data/scn_6, JSON par table)
+#
+# Brancher l'API dessus :
+#   python -m qa.fake_airtable --port 8787 --seed tests/data/scn_6
+#   AIRTABLE_ENDPOINT_URL=http://127.0.0.1:8787 uvicorn api:app
+# =====================================================
+
+import argparse
+import asyncio
+import json
+import secrets
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from qa.airtable_formula import FormulaError, compile_formula
+
+# Limites Airtable reproduites
+MAX_PAGE_SIZE = 100
+MAX_RECORDS_PER_WRITE = 10
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
+
+
+def _new_record_id() -> str:
+    return "rec" + secrets.token_hex(7)[:14]
+
+
+def _error(status: int, error_type: str, message: str = "") -> JSONResponse:
+    return JSONResponse(status_code=status, content={"error": {"type": error_type, "message": message}})
+
+
+class FakeAirtable:
+    """
+    Stockage mémoire thread-safe : base → table → record_id → record.
+    Les tables sont adressées par ID ou par nom (segment d'URL tel quel).
+    """
+
+    def __init__(
+        self,
+        latency_s: float = 0.0,
+        rate_limit_rps: Optional[float] = None,
+        penalty_s: float = 0.0,
+    ):
+        self.latency_s = latency_s
+        self.rate_limit_rps = rate_limit_rps
+        self.penalty_s = penalty_s
+
+        self._lock = threading.Lock()
+        self._bases: Dict[str, Dict[str, Dict[str, dict]]] = {}
+
+        # Rate limit par base (fenêtre glissante d'une seconde)
+        self._hits: Dict[str, List[float]] = {}
+        self._blocked_until: Dict[str, float] = {}
+
+        self.requests = 0
+        self.throttled = 0
+
+    # ---------------------------------------------------------
+    # Données
+    # ---------------------------------------------------------
+    def _table(self, base_id: str, table: str) -> Dict[str, dict]:
+        return self._bases.setdefault(base_id, {}).setdefault(table, {})
+
+    def insert(self, base_id: str, table: str, fields: dict, record_id: Optional[str] = None) -> dict:
+        now = _now_iso()
+        record = {
+            "id": record_id or _new_record_id(),
+            "createdTime": now,
+            "lastModifiedTime": now,
+            "fields": dict(fields),
+        }
+        with self._lock:
+            self._table(base_id, table)[record["id"]] = record
+        return _public(record)
+
+    def seed(self, base_id: str, table: str, records: List[dict]) -> None:
+        """
+        records : [{"id"?, "fields": {...}}] ou dicts de champs.
+        """
+        for rec in records:
+            if "fields" in rec:
+                self.insert(base_id, table, rec["fields"], rec.get("id"))
+            else:
+                self.insert(base_id, table, rec)
+
+    def load_seed_file(self, base_id: str, path: Path) -> None:
+        """
+        JSON {"<table>": [records…]}.
+        """
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+        for table, records in data.items():
+            self.seed(base_id, table, records)
+
+    def seed_from_scn6_fixtures(
+        self,
+        base_id: str,
+        directory: Path,
+        coureurs_table: str,
+        slots_table: str,
+    ) -> int:
+        """
+        Crée 1 coureur + 1 slot par fixture *_input.json (format tests/data/scn_6).
+        """
+        count = 0
+        for path in sorted(Path(directory).glob("*_input.json")):
+            data = json.loads(path.read_text(encoding="utf-8"))
+            run_ctx = (data.get("payload") or {}).get("run_context") or {}
+            slot = run_ctx.get("slot") or {}
+            profile = run_ctx.get("profile") or {}
+            objective = run_ctx.get("objective") or {}
+            coureur_id = data.get("record_id") or _new_record_id()
+
+            self.insert(base_id, coureurs_table, {
+                "Mode": profile.get("mode"),
+                "Sous-mode": profile.get("submode"),
+                "Âge": profile.get("age"),
+                "Objectif": objective.get("type"),
+                "Objectif_temps": objective.get("time"),
+                "Jours_final": run_ctx.get("jours_final"),
+            }, record_id=coureur_id)
+
+            if slot.get("slot_id"):
+                self.insert(base_id, slots_table, {
+                    "Slot_ID": slot["slot_id"],
+                    "Coureur": coureur_id,
+                    "Coureur_ID": coureur_id,
+                    "Date_slot": slot.get("date"),
+                    "status": "planned",
+                })
+            count += 1
+        return count
+
+    # ---------------------------------------------------------
+    # Rate limit / latence
+    # ---------------------------------------------------------
+    def admit(self, base_id: str) -> bool:
+        with self._lock:
+            self.requests += 1
+            now = time.monotonic()
+
+            if now < self._blocked_until.get(base_id, 0):
+                self.throttled += 1
+                return False
+
+            if not self.rate_limit_rps:
+                return True
+
+            hits = [t for t in self._hits.get(base_id, []) if now - t < 1.0]
+            if len(hits) >= self.rate_limit_rps:
+                self._hits[base_id] = hits
+                self._blocked_until[base_id] = now + self.penalty_s
+                self.throttled += 1
+                return False
+
+            hits.append(now)
+            self._hits[base_id] = hits
+            return True
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "throttled_429": self.throttled,
+                "tables": {
+                    f"{base}/{table}": len(records)
+                    for base, tables in self._bases.items()
+                    for table, records in tables.items()
+                },
+            }
+
+    # ---------------------------------------------------------
+    # Opérations REST
+    # ---------------------------------------------------------
+    def list(self, base_id: str, table: str, params: Dict[str, Any]) -> dict:
+        formula = params.get("filterByFormula")
+        predicate = compile_formula(formula) if formula else None
+
+        with self._lock:
+            records = list(self._table(base_id, table).values())
+
+        if predicate is not None:
+            records = [r for r in records if predicate(r)]
+
+        for sort in reversed(params.get("sort") or []):
+            field = sort.get("field")
+            desc = sort.get("direction") == "desc"
+            filled = [r for r in records if r["fields"].get(field) not in (None, "")]
+            empty = [r for r in records if r["fields"].get(field) in (None, "")]
+            filled.sort(key=lambda r: str(r["fields"][field]), reverse=desc)
+            records = filled + empty
+
+        max_records = params.get("maxRecords")
+        if max_records:
+            records = records[:int(max_records)]
+
+        offset = int(params.get("offset") or 0)
+        page_size = min(int(params.get("pageSize") or MAX_PAGE_SIZE), MAX_PAGE_SIZE)
+        page = records[offset:offset + page_size]
+
+        fields = params.get("fields")
+        body = {"records": [_public(r, fields) for r in page]}
+        if offset + page_size < len(records):
+            body["offset"] = str(offset + page_size)
+        return body
+
+    def get(self, base_id: str, table: str, record_id: str) -> Optional[dict]:
+        with self._lock:
+            record = self._table(base_id, table).get(record_id)
+            return _public(record) if record else None
+
+    def update(self, base_id: str, table: str, record_id: str, fields: dict, replace: bool = False) -> Optional[dict]:
+        with self._lock:
+            record = self._table(base_id, table).get(record_id)
+            if record is None:
+                return None
+            record["fields"] = dict(fields) if replace else {**record["fields"], **fields}
+            record["lastModifiedTime"] = _now_iso()
+            return _public(record)
+
+    def delete(self, base_id: str, table: str, record_id: str) -> bool:
+        with self._lock:
+            return self._table(base_id, table).pop(record_id, None) is not None
+
+    def upsert(self, base_id: str, table: str, rows: List[dict], merge_on: List[str], replace: bool) -> dict:
+        result = {"records": [], "createdRecords": [], "updatedRecords": []}
+        for row in rows:
+            fields = row.get("fields") or {}
+            key = tuple(_key_value(fields.get(k)) for k in merge_on)
+
+            with self._lock:
+                matches = [
+                    r for r in self._table(base_id, table).values()
+                    if tuple(_key_value(r["fields"].get(k)) for k in merge_on) == key
+                ]
+
+            if len(matches) > 1:
+                raise ValueError(f"Upsert ambigu : {len(matches)} records pour {dict(zip(merge_on, key))}")
+
+            if matches:
+                record = self.update(base_id, table, matches[0]["id"], fields, replace=replace)
+                result["updatedRecords"].append(record["id"])
+            else:
+                record = self.insert(base_id, table, fields)
+                result["createdRecords"].append(record["id"])
+            result["records"].append(record)
+        return result
+
+
+def _key_value(value: Any) -> Any:
+    if isinstance(value, list):
+        return tuple(value)
+    return value
+
+
+def _public(record: dict, fields: Optional[List[str]] = None) -> dict:
+    values = record["fields"]
+    if fields:
+        values = {k: v for k, v in values.items() if k in fields}
+    return {"id": record["id"], "createdTime": record["createdTime"], "fields": dict(values)}
+
+
+# ---------------------------------------------------------
+# Paramètres de liste (query string ou corps listRecords)
+# ---------------------------------------------------------
+def _list_params_from_query(request: Request) -> Dict[str, Any]:
+    query = request.query_params
+    params: Dict[str, Any] = {
+        "filterByFormula": query.get("filterByFormula"),
+        "maxRecords": query.get("maxRecords"),
+        "pageSize": query.get("pageSize"),
+        "offset": query.get("offset"),
+        "fields": query.getlist("fields[]") or query.getlist("fields") or None,
+    }
+
+    sorts: Dict[int, dict] = {}
+    for key, value in query.multi_items():
+        if key.startswith("sort["):
+            index, attr = key[5:].rstrip("]").split("][")
+            sorts.setdefault(int(index), {})[attr] = value
+    params["sort"] = [sorts[i] for i in sorted(sorts)]
+    return params
+
+
+def create_app(fake: FakeAirtable) -> FastAPI:
+    app = FastAPI(title="Fake Airtable")
+
+    async def _gate(base_id: str) -> Optional[JSONResponse]:
+        if fake.latency_s:
+            await asyncio.sleep(fake.latency_s)
+        if not fake.admit(base_id):
+            return JSONResponse(
+                status_code=429,
+                content={"errors": [{"error": "RATE_LIMIT_REACHED"}]},
+                headers={"Retry-After": str(int(fake.penalty_s) or 1)},
+            )
+        return None
+
+    @app.get("/_fake/stats")
+    def fake_stats():
+        return fake.stats()
+
+    @app.get("/v0/{base_id}/{table}")
+    async def list_records(base_id: str, table: str, request: Request):
+        if (blocked := await _gate(base_id)) is not None:
+            return blocked
+        try:
+            return fake.list(base_id, table, _list_params_from_query(request))
+        except FormulaError as e:
+            return _error(422, "INVALID_FILTER_BY_FORMULA", str(e))
+
+    @app.post("/v0/{base_id}/{table}/listRecords")
+    async def list_records_post(base_id: str, table: str, request: Request):
+        if (blocked := await _gate(base_id)) is not None:
+            return blocked
+        body = await request.json()
+        try:
+            return fake.list(base_id, table, body)
+        except FormulaError as e:
+            return _error(422, "INVALID_FILTER_BY_FORMULA", str(e))
+
+    @app.get("/v0/{base_id}/{table}/{record_id}")
+    async def get_record(base_id: str, table: str, record_id: str):
+        if (blocked := await _gate(base_id)) is not None:
+            return blocked
+        record = fake.get(base_id, table, record_id)
+        if record is None:
+            return _error(404, "NOT_FOUND")
+        return record
+
+    @app.post("/v0/{base_id}/{table}")
+    async def create_records(base_id: str, table: str, request: Request):
+        if (blocked := await _gate(base_id)) is not None:
+            return blocked
+        body = await request.json()
+        if "records" not in body:
+            return fake.insert(base_id, table, body.get("fields") or {})
+        if len(body["records"]) > MAX_RECORDS_PER_WRITE:
+            return _error(422, "INVALID_RECORDS", "10 records max par requête")
+        return {"records": [fake.insert(base_id, table, r.get("fields") or {}) for r in body["records"]]}
+
+    async def _write(base_id: str, table: str, request: Request, replace: bool):
+        if (blocked := await _gate(base_id)) is not None:
+            return blocked
+        body = await request.json()
+        rows = body.get("records") or []
+        if len(rows) > MAX_RECORDS_PER_WRITE:
+            return _error(422, "INVALID_RECORDS", "10 records max par requête")
+
+        upsert = body.get("performUpsert")
+        if upsert:
+            try:
+                return fake.upsert(base_id, table, rows, upsert.get("fieldsToMergeOn") or [], replace)
+            except ValueError as e:
+                return _error(422, "INVALID_VALUE_FOR_COLUMN", str(e))
+
+        records = []
+        for row in rows:
+            record = fake.update(base_id, table, row.get("id"), row.get("fields") or {}, replace=replace)
+            if record is None:
+                return _error(404, "NOT_FOUND", row.get("id") or "")
+            records.append(record)
+        return {"records": records}
+
+    @app.patch("/v0/{base_id}/{table}")
+    async def update_records(base_id: str, table: str, request: Request):
+        return await _write(base_id, table, request, replace=False)
+
+    @app.put("/v0/{base_id}/{table}")
+    async def replace_records(base_id: str, table: str, request: Request):
+        return await _write(base_id, table, request, replace=True)
+
+    async def _write_one(base_id: str, table: str, record_id: str, request: Request, replace: bool):
+        if (blocked := await _gate(base_id)) is not None:
+            return blocked
+        body = await request.json()
+        record = fake.update(base_id, table, record_id, body.get("fields") or {}, replace=replace)
+        if record is None:
+            return _error(404, "NOT_FOUND")
+        return record
+
+    @app.patch("/v0/{base_id}/{table}/{record_id}")
+    async def update_record(base_id: str, table: str, record_id: str, request: Request):
+        return await _write_one(base_id, table, record_id, request, replace=False)
+
+    @app.put("/v0/{base_id}/{table}/{record_id}")
+    async def replace_record(base_id: str, table: str, record_id: str, request: Request):
+        return await _write_one(base_id, table, record_id, request, replace=True)
+
+    @app.delete("/v0/{base_id}/{table}/{record_id}")
+    async def delete_record(base_id: str, table: str, record_id: str):
+        if (blocked := await _gate(base_id)) is not None:
+            return blocked
+        if not fake.delete(base_id, table, record_id):
+            return _error(404, "NOT_FOUND")
+        return {"id": record_id, "deleted": True}
+
+    @app.delete("/v0/{base_id}/{table}")
+    async def delete_records(base_id: str, table: str, request: Request):
+        if (blocked := await _gate(base_id)) is not None:
+            return blocked
+        ids = request.query_params.getlist("records[]")
+        return {"records": [{"id": rid, "deleted": fake.delete(base_id, table, rid)} for rid in ids]}
+
+    return app
+
+
+# ---------------------------------------------------------
+# Serveur localhost en tâche de fond (tests, benchmarks)
+# ---------------------------------------------------------
+class FakeAirtableServer:
+    """
+    Lance le faux serveur sur 127.0.0.1 dans un thread (port 0 = port libre).
+    """
+
+    def __init__(self, fake: Optional[FakeAirtable] = None, host: str = "127.0.0.1", port: int = 0):
+        import uvicorn
+
+        self.fake = fake or FakeAirtable()
+        self._server = uvicorn.Server(uvicorn.Config(
+            create_app(self.fake), host=host, port=port, log_level="warning", lifespan="off",
+        ))
+        self._thread: Optional[threading.Thread] = None
+        self.url: Optional[str] = None
+
+    def start(self) -> "FakeAirtableServer":
+        self._thread = threading.Thread(target=self._server.run, name="fake-airtable", daemon=True)
+        self._thread.start()
+        while not self._server.started:
+            time.sleep(0.01)
+        host, port = self._server.servers[0].sockets[0].getsockname()[:2]
+        self.url = f"http://{host}:{port}"
+        return self
+
+    def stop(self) -> None:
+        self._server.should_exit = True
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def __enter__(self) -> "FakeAirtableServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def main() -> None:
+    import uvicorn
+
+    from core.config import config
+    from services.airtable_tables import ATABLES
+
+    parser = argparse.ArgumentParser(description="Faux serveur Airtable SmartCoach")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--rps", type=float, default=None, help="Limite par base (429 au-delà)")
+    parser.add_argument("--penalty-s", type=float, default=0)
+    parser.add_argument("--base-id", default=config.base_id or "appFAKE")
+    parser.add_argument("--seed", action="append", default=[],
+                        help="Répertoire de fixtures SCN_6 ou fichier JSON {table: [records]}")
+    args = parser.parse_args()
+
+    fake = FakeAirtable(
+        latency_s=args.latency_ms / 1000,
+        rate_limit_rps=args.rps,
+        penalty_s=args.penalty_s,
+    )
+    for seed in args.seed:
+        path = Path(seed)
+        if path.is_dir():
+            fake.seed_from_scn6_fixtures(
+                args.base_id, path,
+                coureurs_table=ATABLES.COU_TABLE_ID or "Coureurs",
+                slots_table=ATABLES.REF_SLOTS_ID or "Slots",
+            )
+        else:
+            fake.load_seed_file(args.base_id, path)
+
+    print(f"AIRTABLE_ENDPOINT_URL=http://{args.host}:{args.port}  (base {args.base_id})")
+    uvicorn.run(create_app(fake), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
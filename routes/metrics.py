@@ -0,0 +1,180 @@
+# routes/metrics.py
+# Observabilité technique (hors moteur décisionnel)
+
+from fastapi import APIRouter
+
+from core.utils.timings import stage_histograms
+from engine.vdot import vdot_engine
+from scenarios.agregateur.scn_2_catalogue import session_catalogue
+
+from services.airtable_cache import key_index, last_known_good, record_cache
+from services.airtable_client import registry
+from services.airtable_mirror import airtable_mirror
+from services.airtable_outbox import airtable_outbox
+from services.airtable_singleflight import single_flight
+from services.idempotency import idempotency_store
+from services.reference_data import reference_store
+from services.session_cache import session_cache
+from services.training_load import training_load_store
+
+router = APIRouter(prefix="/metrics", tags=["METRICS"])
+
+
+@router.get("/airtable/pool")
+def airtable_pool_metrics():
+    """
+    Connexions Airtable : taille du pool et ratio de réutilisation.
+    """
+    return {
+        "status": "ok",
+        "data": registry.stats(),
+    }
+
+
+@router.get("/airtable/scheduler")
+def airtable_scheduler_metrics():
+    """
+    Ordonnanceur Airtable (par base) : file d'attente, temps d'attente, retries.
+    """
+    return {
+        "status": "ok",
+        "data": registry.scheduler_stats(),
+    }
+
+
+@router.get("/airtable/breaker")
+def airtable_breaker_metrics():
+    """
+    Disjoncteur Airtable (par base) : état, échecs consécutifs, appels refusés.
+    """
+    return {
+        "status": "ok",
+        "data": registry.breaker_stats(),
+    }
+
+
+@router.get("/airtable/coalescing")
+def airtable_coalescing_metrics():
+    """
+    Lectures Airtable concurrentes identiques fusionnées (single-flight).
+    """
+    return {
+        "status": "ok",
+        "data": single_flight.stats(),
+    }
+
+
+@router.get("/airtable/cache")
+def airtable_cache_metrics():
+    """
+    Cache records Airtable : hits / misses / évictions,
+    dernier résultat connu des listes (servi si Airtable tombe)
+    et index d'égalité (requêtes servies en mémoire, gabarits compilés).
+    """
+    return {
+        "status": "ok",
+        "data": {
+            **record_cache.stats(),
+            "last_known_good": last_known_good.stats(),
+            "key_index": key_index.stats(),
+        },
+    }
+
+
+@router.get("/airtable/mirror")
+def airtable_mirror_metrics():
+    """
+    Réplique SQLite locale : fraîcheur par table, lectures servies.
+    """
+    return {
+        "status": "ok",
+        "data": airtable_mirror.stats(),
+    }
+
+
+@router.get("/airtable/outbox")
+def airtable_outbox_metrics():
+    """
+    Outbox des écritures différées : en attente, retard (lag_s), abandons.
+    """
+    return {
+        "status": "ok",
+        "data": airtable_outbox.stats(),
+    }
+
+
+@router.get("/reference-data")
+def reference_data_metrics():
+    """
+    Référentiel mémoire : version courante et état des rafraîchissements.
+    """
+    return {
+        "status": "ok",
+        "data": reference_store.stats(),
+    }
+
+
+@router.get("/timings")
+def timings_metrics():
+    """
+    Histogrammes de durée par étape (SCN_6, SCN_2, SCN_RUN, dispatcher).
+    """
+    return {
+        "status": "ok",
+        "data": stage_histograms.stats(),
+    }
+
+
+@router.get("/session-cache")
+def session_cache_metrics():
+    """
+    Cache des séances générées : hits / misses, écritures Type_cible évitées.
+    """
+    return {
+        "status": "ok",
+        "data": session_cache.stats(),
+    }
+
+
+@router.get("/scn-2-catalogue")
+def scn_2_catalogue_metrics():
+    """
+    Catalogue SCN_2 : séances précalculées, hits / repli sur composition.
+    """
+    return {
+        "status": "ok",
+        "data": session_catalogue.stats(),
+    }
+
+
+@router.get("/training-load")
+def training_load_metrics():
+    """
+    Charge d'entraînement : coureurs suivis, mises à jour, feedbacks appliqués.
+    """
+    return {
+        "status": "ok",
+        "data": training_load_store.stats(),
+    }
+
+
+@router.get("/vdot")
+def vdot_metrics():
+    """
+    Tables VDOT : source des allures (formule / Airtable), plage couverte.
+    """
+    return {
+        "status": "ok",
+        "data": vdot_engine.stats(),
+    }
+
+
+@router.get("/idempotency")
+def idempotency_metrics():
+    """
+    Idempotency-Key : requêtes exécutées, rejouées, doublons en attente.
+    """
+    return {
+        "status": "ok",
+        "data": idempotency_store.stats(),
+    }
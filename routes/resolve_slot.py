@@ -1,6 +1,11 @@
+from typing import List
+
 from fastapi import APIRouter
 from pydantic import BaseModel
-from scenarios.agregateur.scn_slot_resolver import run_scn_slot_resolver
+from scenarios.agregateur.scn_slot_resolver import (
+    run_scn_slot_resolver_async,
+    run_scn_slot_resolver_batch_async,
+)
 
 router = APIRouter()
 
@@ -10,10 +15,31 @@ class ResolveSlotInput(BaseModel):
     current_slot_date: str | None = None
 
 @router.post("/resolve_slot")
-def resolve_slot(payload: ResolveSlotInput):
-    result = run_scn_slot_resolver(
+async def resolve_slot(payload: ResolveSlotInput):
+    result = await run_scn_slot_resolver_async(
     payload.coureur_id,
     payload.mode,
     payload.current_slot_date
 )
     return result
+
+
+class ResolveSlotBatchItem(BaseModel):
+    coureur_id: str
+    current_slot_date: str | None = None
+
+class ResolveSlotBatchInput(BaseModel):
+    mode: str
+    items: List[ResolveSlotBatchItem]
+
+@router.post("/resolve_slot/batch")
+async def resolve_slot_batch(payload: ResolveSlotBatchInput):
+    """
+    Plusieurs coureurs en un appel : 1 requête Airtable OR par lot
+    au lieu d'une par coureur. Réponse : {coureur_id: résultat}.
+    """
+    results = await run_scn_slot_resolver_batch_async(
+        [item.model_dump() for item in payload.items],
+        payload.mode,
+    )
+    return {"success": True, "status": "ok", "data": results}
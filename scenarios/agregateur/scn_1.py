@@ -139,6 +139,74 @@ def run_scn_1_slots(coureur_id: str) -> dict:
     if not record:
         raise RuntimeError(f"Coureur introuvable : {coureur_id}")
 
+    plan = _prepare_scn_1(record)
+
+    # 2ter️⃣ Persistance des jours validés dans Airtable (si modifiés)
+    if _jours_final_changed(record, plan):
+        airtable.update_record_by_id(
+            ATABLES.COU_TABLE,
+            coureur_id,
+            {
+                ATFIELDS.COU_JOURS_FINAL: plan["dispos"],
+            },
+        )
+
+    return _finalize_scn_1(plan)
+
+
+async def run_scn_1_async(context) -> InternalResult:
+    """
+    Wrapper SCN_1 asyncio (routes async : la boucle n'est jamais bloquée).
+    """
+    try:
+        result = await run_scn_1_slots_async(context.record_id)
+
+        return InternalResult.ok(
+            message="SCN_1 exécuté avec succès",
+            source="SCN_1",
+            data=result,
+        )
+
+    except Exception as e:
+        return InternalResult.error(
+            message=f"Exception SCN_1 : {e}",
+            source="SCN_1",
+            data={},
+        )
+
+
+async def run_scn_1_slots_async(coureur_id: str) -> dict:
+    """
+    Version asyncio de run_scn_1_slots (mêmes étapes, mêmes règles).
+    """
+    from services.airtable_async import AsyncAirtableService
+
+    airtable = AsyncAirtableService()
+
+    record = await airtable.get_record(ATABLES.COU_TABLE, coureur_id)
+    if not record:
+        raise RuntimeError(f"Coureur introuvable : {coureur_id}")
+
+    plan = _prepare_scn_1(record)
+
+    if _jours_final_changed(record, plan):
+        await airtable.update_record_by_id(
+            ATABLES.COU_TABLE,
+            coureur_id,
+            {
+                ATFIELDS.COU_JOURS_FINAL: plan["dispos"],
+            },
+        )
+
+    return _finalize_scn_1(plan)
+
+
+def _prepare_scn_1(record: dict) -> dict:
+    """
+    Étapes 2 / 2bis de SCN_1 : lecture des champs Coureur
+    et construction des jours validés (sans I/O).
+    """
+
     # 2️⃣ Lecture des champs via référentiel ATFIELDS
     date_debut = get_field(record, ATFIELDS.COU_DATE_DEBUT_PLAN)
     date_course = get_field(record, ATFIELDS.COU_DATE_COURSE)
@@ -158,9 +226,6 @@ def run_scn_1_slots(coureur_id: str) -> dict:
     else:
         date_debut_date = date_debut
 
-    # 🔒 Source de vérité unique pour SCN_1
-    date_reference = date_debut_date
-
     # 2bis️⃣ Construction intelligente des jours (SmartCoach)
     result_jours = build_training_days(
         jours_disponibles=dispos,
@@ -169,17 +234,33 @@ def run_scn_1_slots(coureur_id: str) -> dict:
     )
 
     # Jours et nb séances VALIDÉS
-    dispos = result_jours["jours_seances"]
-    sessions_per_week = result_jours["nb_seances"]
-
-    # 2ter️⃣ Persistance des jours validés dans Airtable
-    airtable.update_record_by_id(
-        ATABLES.COU_TABLE,
-        coureur_id,
-        {
-            ATFIELDS.COU_JOURS_FINAL: dispos,
-        },
-    )
+    return {
+        "date_debut": date_debut,
+        # 🔒 Source de vérité unique pour SCN_1
+        "date_debut_date": date_debut_date,
+        "date_course": date_course,
+        "nb_semaines": nb_semaines,
+        "dispos": result_jours["jours_seances"],
+        "sessions_per_week": result_jours["nb_seances"],
+    }
+
+
+def _jours_final_changed(record: dict, plan: dict) -> bool:
+    """
+    Évite un PATCH Airtable quand Jours_final est déjà à jour.
+    """
+    return get_field(record, ATFIELDS.COU_JOURS_FINAL) != plan["dispos"]
+
+
+def _finalize_scn_1(plan: dict) -> dict:
+    """
+    Étapes 3 → 5 de SCN_1 : garde-fous et squelette de plan (sans I/O).
+    """
+    date_debut = plan["date_debut"]
+    date_debut_date = plan["date_debut_date"]
+    nb_semaines = plan["nb_semaines"]
+    dispos = plan["dispos"]
+    sessions_per_week = plan["sessions_per_week"]
 
     # 3️⃣ Garde-fous minimum
     if not date_debut:
@@ -223,7 +304,7 @@ def run_scn_1_slots(coureur_id: str) -> dict:
         # Première séance réelle
         "date_premier_slot": first_slot_date.isoformat(),
 
-        "date_fin_plan": date_course if date_course else None,
+        "date_fin_plan": plan["date_course"] if plan["date_course"] else None,
         "jours_optimises": dispos,
         "plan_squelette": plan_squelette,
     }
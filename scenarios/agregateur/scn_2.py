@@ -18,12 +18,15 @@ Rôle :
 Ce module est centré sur RUNNING mais extensible à d’autres univers plus tard.
 """
 
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, List, Optional, Tuple
 
 from core.internal_result import InternalResult
 from core.utils.logger import log_info, log_error
+from core.utils.timings import span
 from ics.ics_builder import run_generate_ics
 from engine.adaptation_engine import apply_adaptation
+from engine.block_library import block_library
+from engine.vdot import valid_vdot, vdot_engine
 
 
 MODULE_NAME = "SCN_2"
@@ -51,7 +54,7 @@ VOLUME_TARGET_MIN = {
     },
 }
 
-# Allures cibles “placeholder” en min/km selon niveau (en attendant VDOT)
+# Allures E par défaut en min/km selon niveau (profil sans VDOT)
 PACE_E_MIN_PER_KM = {
     "debutant": 7.0,       # 7:00/km
     "intermediaire": 6.0,  # 6:00/km
@@ -88,6 +91,13 @@ def _get_level(profile: Dict[str, Any]) -> str:
     # défaut raisonnable
     return "debutant"
 
+def _get_vdot(run_context: Dict[str, Any]) -> Optional[float]:
+    """
+    VDOT du profil (profile.vdot), None s'il est absent ou hors tables.
+    """
+    profile = run_context.get("profile")
+    return valid_vdot(profile.get("vdot")) if isinstance(profile, dict) else None
+
 def _get_phase_name(phase_context: Dict[str, Any], slot: Dict[str, Any]) -> str:
     """
     Récupère le nom de la phase (General / Specifique / Affutage).
@@ -132,11 +142,20 @@ def _compute_volume_target_minutes(
     return max(20, target)
 
 
-def _estimate_distance_km(duration_min: int, level: str) -> float:
+def _pace_e(level: str, vdot: Optional[float] = None) -> float:
+    """
+    Allure E (min/km) : tables VDOT si connu, sinon allure par niveau.
+    """
+    if vdot is not None:
+        return vdot_engine.tables.pace(vdot, "E")
+    return PACE_E_MIN_PER_KM.get(level, 6.0)
+
+
+def _estimate_distance_km(duration_min: int, level: str, vdot: Optional[float] = None) -> float:
     """
-    Estimation de la distance à partir de la durée et d'une allure E simplifiée.
+    Estimation de la distance à partir de la durée et de l'allure E.
     """
-    pace = PACE_E_MIN_PER_KM.get(level, 6.0)  # min/km
+    pace = _pace_e(level, vdot)  # min/km
     km = duration_min / pace
     return round(km, 1)
 
@@ -174,245 +193,55 @@ def _select_block_id(
     return block_id
 
 
-def _build_steps_for_ef(volume_target_min: int) -> List[Dict[str, Any]]:
-    """
-    Construction d'une séance EF simple :
-    - pas d'échauffement/spécifique pour le MVP
-    - à raffiner plus tard (split, éducatifs, retour au calme)
-    """
-    return [
-        {
-            "label": "Endurance fondamentale",
-            "type": "E",
-            "duration_min": volume_target_min,
-            "comment": "Allure confortable, respiration aisée.",
-        }
-    ]
-
-
 def _build_steps_from_block(
     block_id: str,
     seance_type: str,
     volume_target_min: int,
     level: str,
     phase_name: str,
-) -> Tuple[List[Dict[str, Any]], float, int, List[str]]:
-    """
-    À terme : mapping complet block_id -> structure de séance.
-    Pour l'instant :
-    - si EF => séance continue
-    - autres types : placeholder simple
+    vdot: Optional[float] = None,
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], float, int, List[str]]:
     """
-    seance_type = seance_type.upper()
-    intensity_tags = [seance_type]
-
-    if seance_type == "E" or seance_type == "EF":
-        steps = _build_steps_for_ef(volume_target_min)
-        distance_km = _estimate_distance_km(volume_target_min, level)
-        load = _compute_load(volume_target_min, "E")
-        return steps, distance_km, load, ["E"]
-
-    # Placeholder pour les autres types : une seule étape
-    steps = [
-        {
-            "label": f"Séance {seance_type} (MVP)",
-            "type": seance_type,
-            "duration_min": volume_target_min,
-            "comment": f"Séance {seance_type} simple – structure à enrichir.",
-        }
-    ]
-    distance_km = _estimate_distance_km(volume_target_min, level)
-    load = _compute_load(volume_target_min, seance_type)
-    return steps, distance_km, load, intensity_tags
-
-
-# -------------------------------------------------------------------
-# Générateur principal de séance RUNNING
-# -------------------------------------------------------------------
-
-def generate_running_session(
-    run_context: Dict[str, Any],
-    phase_context: Dict[str, Any],
-) -> Dict[str, Any]:
+    block_id -> structure de séance via la bibliothèque de blocs
+    (engine/blocks/running.json) : steps, blocs, distance, charge, tags.
     """
-    Génère une séance RUNNING complète à partir du run_context et du phase_context.
-    C'est la brique centrale niveau C pour l'univers RUNNING.
-    """
-
-    profile = run_context.get("profile") or {}
-    objectif = run_context.get("objectif") or {}
-    slot = run_context.get("slot") or {}
-    historique = run_context.get("historique") or []
-
-    mode = run_context.get("mode") or "ondemand"
-    seance_type = phase_context.get("seance_type") or phase_context.get("type_seance") or "EF"
-
-    # --------------------------------------------------
-    # Détermination du niveau (priorité payload)
-    # --------------------------------------------------
-    level = phase_context.get("level") or "debutant"  # valeur par défaut existante
-    payload_level = (
-        run_context
-        .get("profile", {})
-        .get("level")
-    )
-
-    if payload_level:
-        level = payload_level
-
-    phase_name = _get_phase_name(phase_context, slot)
-
-    log_info(
-        f"[{MODULE_NAME}] Génération séance RUNNING – "
-        f"mode={mode}, type={seance_type}, level={level}, phase={phase_name}",
-        module=MODULE_NAME,
-    )
-
-    volume_target_min = _compute_volume_target_minutes(
-        level=level,
-        phase_name=phase_name,
-        historique=historique,
-        run_context=run_context,
-    )
-    # --- PHASE 3 : adaptation explicite ---------------------------------
-
-    base_decision = {
-        "volume_target_min": volume_target_min,
-        "seance_type": seance_type.upper(),
-    }
-
-    adapted_decision, adaptation_trace = apply_adaptation(run_context, base_decision)
-    # --- CONTRACT GUARD : adapted_decision must expose adaptation ---
-    if not isinstance(adapted_decision, dict):
-        adapted_decision = {}
-
-    adp = adapted_decision.get("adaptation")
-    if not isinstance(adp, dict):
-        adp = {}
-
-    # Defaults expected by SCN_2
-    adp.setdefault("volume_factor", 1.0)
-    adp.setdefault("target_type_override", None)
-
-    adapted_decision["adaptation"] = adp
-
-    # --- PHASE 3-D : adaptation sémantique du type ----------------------
-
-    # Si l'adaptation force un type de séance (ex: EF_ONLY)
-    forced_type = adapted_decision["adaptation"].get("target_type_override")
-
-    if forced_type:
-        # Normalisation explicite vers EF
-        seance_type = "EF"
-
-        # Traçabilité métier claire
-        adaptation_trace.setdefault("arbitrations", []).append(
-            "ARB_ADP_001_SEANCE_TYPE_DOWNGRADE"
-        )
-
-    volume_target_min = int(round(
-        volume_target_min * adapted_decision["adaptation"]["volume_factor"]
-    ))
-
-    block_id = _select_block_id(
+    steps, blocks, intensity_tags = block_library.build(
+        block_id=block_id,
         seance_type=seance_type,
         phase_name=phase_name,
         level=level,
         volume_target_min=volume_target_min,
     )
+    distance_km = _estimate_distance_km(volume_target_min, level, vdot)
+    load = _compute_load(volume_target_min, intensity_tags[0])
+    return steps, blocks, distance_km, load, intensity_tags
 
-    steps, distance_km, load, intensity_tags = _build_steps_from_block(
-        block_id=block_id,
-        seance_type=seance_type,
-        volume_target_min=volume_target_min,
-        level=level,
-        phase_name=phase_name,
-    )
 
+def _assemble_session(
+    run_context: Dict[str, Any],
+    phase_context: Dict[str, Any],
+    slot: Dict[str, Any],
+    level: str,
+    phase_name: str,
+    seance_type: str,
+    volume_target_min: int,
+    block_id: str,
+    steps: List[Dict[str, Any]],
+    blocks: List[Dict[str, Any]],
+    distance_km: float,
+    load: int,
+    intensity_tags: List[str],
+    adaptation_trace: Dict[str, Any],
+    verbose: bool = True,
+) -> Dict[str, Any]:
+    """
+    Séance finale (session_spec, decision_trace) à partir des
+    décisions prises (volume, type, block_id, steps / blocs). Partagé avec le
+    générateur de plan (scn_2_plan).
+    """
     title = f"Séance {seance_type.upper()}"
     description = f"Séance {seance_type.upper()} générée par SmartCoach (niveau {level}, phase {phase_name})."
 
-    # --------------------------------------------------
-    # Construction des blocs de séance
-    # --------------------------------------------------
-
-    if seance_type.upper() in ["E", "EF"]:
-        total_duration = volume_target_min
-
-        warmup_duration = 10
-        cooldown_duration = 5
-        main_duration = max(
-            total_duration - warmup_duration - cooldown_duration,
-            15
-        )
-
-        is_progressive = (
-            level != "debutant"
-            and total_duration >= 40
-        )
-
-        if is_progressive:
-            # EF progressive : facile → tonique
-            first_part = int(main_duration * 0.6)
-            second_part = main_duration - first_part
-
-            blocks = [
-                {
-                    "block_type": "warmup",
-                    "description": "Footing très facile + mobilité articulaire",
-                    "duration_min": warmup_duration,
-                    "distance_km": None,
-                    "intensity": {"type": "tag", "value": "E-"},
-                },
-                {
-                    "block_type": "main",
-                    "description": "Endurance fondamentale facile",
-                    "duration_min": first_part,
-                    "distance_km": None,
-                    "intensity": {"type": "tag", "value": "E"},
-                },
-                {
-                    "block_type": "main",
-                    "description": "Endurance fondamentale progressive (plus tonique)",
-                    "duration_min": second_part,
-                    "distance_km": None,
-                    "intensity": {"type": "tag", "value": "E+"},
-                },
-                {
-                    "block_type": "cooldown",
-                    "description": "Retour au calme progressif",
-                    "duration_min": cooldown_duration,
-                    "distance_km": None,
-                    "intensity": {"type": "tag", "value": "E-"},
-                },
-            ]
-        else:
-            # EF continue (comportement existant)
-            blocks = [
-                {
-                    "block_type": "warmup",
-                    "description": "Footing très facile + mobilité articulaire",
-                    "duration_min": warmup_duration,
-                    "distance_km": None,
-                    "intensity": {"type": "tag", "value": "E-"},
-                },
-                {
-                    "block_type": "main",
-                    "description": "Endurance fondamentale continue",
-                    "duration_min": main_duration,
-                    "distance_km": None,
-                    "intensity": {"type": "tag", "value": "E"},
-                },
-                {
-                    "block_type": "cooldown",
-                    "description": "Retour au calme progressif",
-                    "duration_min": cooldown_duration,
-                    "distance_km": None,
-                    "intensity": {"type": "tag", "value": "E-"},
-                },
-            ]
-
-
     session_spec = {
         "session_type": seance_type.upper(),
         "focus": "aerobic" if seance_type.upper() in ["E", "EF"] else "mixed",
@@ -438,6 +267,7 @@ def generate_running_session(
             "seance_type": seance_type,
             "objectif": run_context.get("objectif_normalisé"),
             "engine_version": run_context.get("engine_version"),
+            "vdot": _get_vdot(run_context),
             "adaptation": adaptation_trace
         },
 
@@ -487,10 +317,11 @@ def generate_running_session(
         },
     }
 
-    log_info(
-        f"[{MODULE_NAME}] DecisionTrace={decision_trace}",
-        module=MODULE_NAME,
-    )
+    if verbose:
+        log_info(
+            f"[{MODULE_NAME}] DecisionTrace={decision_trace}",
+            module=MODULE_NAME,
+        )
 
     session = {
         "session_id": run_context.get("session_id") or None,
@@ -516,6 +347,153 @@ def generate_running_session(
     return session
 
 
+# -------------------------------------------------------------------
+# Générateur principal de séance RUNNING
+# -------------------------------------------------------------------
+
+def generate_running_session(
+    run_context: Dict[str, Any],
+    phase_context: Dict[str, Any],
+) -> Dict[str, Any]:
+    """
+    Génère une séance RUNNING complète à partir du run_context et du phase_context.
+    C'est la brique centrale niveau C pour l'univers RUNNING.
+
+    Séance servie depuis le catalogue précalculé quand les entrées y
+    figurent, sinon composée à la volée.
+    """
+    from scenarios.agregateur.scn_2_catalogue import session_catalogue
+
+    session = session_catalogue.lookup(run_context, phase_context)
+    if session is not None:
+        return session
+    return compose_running_session(run_context, phase_context)
+
+
+def compose_running_session(
+    run_context: Dict[str, Any],
+    phase_context: Dict[str, Any],
+    verbose: bool = True,
+) -> Dict[str, Any]:
+    """
+    Composition complète de la séance (volume, adaptation, blocs, trace).
+    verbose=False : sans logs (construction du catalogue).
+    """
+
+    profile = run_context.get("profile") or {}
+    objectif = run_context.get("objectif") or {}
+    slot = run_context.get("slot") or {}
+    historique = run_context.get("historique") or []
+
+    mode = run_context.get("mode") or "ondemand"
+    seance_type = phase_context.get("seance_type") or phase_context.get("type_seance") or "EF"
+
+    # --------------------------------------------------
+    # Détermination du niveau (priorité payload)
+    # --------------------------------------------------
+    level = phase_context.get("level") or "debutant"  # valeur par défaut existante
+    payload_level = (
+        run_context
+        .get("profile", {})
+        .get("level")
+    )
+
+    if payload_level:
+        level = payload_level
+
+    phase_name = _get_phase_name(phase_context, slot)
+
+    if verbose:
+        log_info(
+            f"[{MODULE_NAME}] Génération séance RUNNING – "
+            f"mode={mode}, type={seance_type}, level={level}, phase={phase_name}",
+            module=MODULE_NAME,
+        )
+
+    with span("scn_2.volume"):
+        volume_target_min = _compute_volume_target_minutes(
+            level=level,
+            phase_name=phase_name,
+            historique=historique,
+            run_context=run_context,
+        )
+    # --- PHASE 3 : adaptation explicite ---------------------------------
+
+    base_decision = {
+        "volume_target_min": volume_target_min,
+        "seance_type": seance_type.upper(),
+    }
+
+    with span("scn_2.adaptation"):
+        adapted_decision, adaptation_trace = apply_adaptation(run_context, base_decision)
+    # --- CONTRACT GUARD : adapted_decision must expose adaptation ---
+    if not isinstance(adapted_decision, dict):
+        adapted_decision = {}
+
+    adp = adapted_decision.get("adaptation")
+    if not isinstance(adp, dict):
+        adp = {}
+
+    # Defaults expected by SCN_2
+    adp.setdefault("volume_factor", 1.0)
+    adp.setdefault("target_type_override", None)
+
+    adapted_decision["adaptation"] = adp
+
+    # --- PHASE 3-D : adaptation sémantique du type ----------------------
+
+    # Si l'adaptation force un type de séance (ex: EF_ONLY)
+    forced_type = adapted_decision["adaptation"].get("target_type_override")
+
+    if forced_type:
+        # Normalisation explicite vers EF
+        seance_type = "EF"
+
+        # Traçabilité métier claire
+        adaptation_trace.setdefault("arbitrations", []).append(
+            "ARB_ADP_001_SEANCE_TYPE_DOWNGRADE"
+        )
+
+    volume_target_min = int(round(
+        volume_target_min * adapted_decision["adaptation"]["volume_factor"]
+    ))
+
+    block_id = _select_block_id(
+        seance_type=seance_type,
+        phase_name=phase_name,
+        level=level,
+        volume_target_min=volume_target_min,
+    )
+
+    with span("scn_2.steps"):
+        steps, blocks, distance_km, load, intensity_tags = _build_steps_from_block(
+            block_id=block_id,
+            seance_type=seance_type,
+            volume_target_min=volume_target_min,
+            level=level,
+            phase_name=phase_name,
+            vdot=_get_vdot(run_context),
+        )
+
+    return _assemble_session(
+        run_context=run_context,
+        phase_context=phase_context,
+        slot=slot,
+        level=level,
+        phase_name=phase_name,
+        seance_type=seance_type,
+        volume_target_min=volume_target_min,
+        block_id=block_id,
+        steps=steps,
+        blocks=blocks,
+        distance_km=distance_km,
+        load=load,
+        intensity_tags=intensity_tags,
+        adaptation_trace=adaptation_trace,
+        verbose=verbose,
+    )
+
+
 # -------------------------------------------------------------------
 # Wrapper SCN_2 compatible SOCLE (InternalResult)
 # -------------------------------------------------------------------
@@ -547,7 +525,8 @@ def run_scn_2(context) -> InternalResult:
                         "fatigue_streak": 0,
                     }
 
-        session = generate_running_session(run_context, phase_context)
+        with span("scn_2"):
+            session = generate_running_session(run_context, phase_context)
 
         return InternalResult.ok(
             message="SCN_2 – Séance RUNNING générée",
@@ -0,0 +1,220 @@
+# scenarios/agregateur/scn_2_catalogue.py
+# =====================================================
+# Catalogue précalculé des séances SCN_2
+# - la séance ne dépend que d'entrées discrètes :
+#   niveau × phase × type de séance × tranche de recent_load
+#   (légère / normale / forte) × état adaptatif
+#   (aucun / fatigued / neutral / good / déjà appliqué)
+# - cet espace est énuméré une fois au démarrage en appelant
+#   le moteur lui-même (compose_running_session) : parité garantie
+# - table immuable clé → modèle (session_spec, blocs, steps,
+#   decision_trace) sérialisé en pickle : chaque requête en
+#   obtient une copie indépendante pour ~1/6 du coût d'un
+#   deepcopy ; à la requête : lookup + estampillage des
+#   champs d'identité (slot_id, date, ids, phase_context…) ;
+#   VDOT du profil : seule la distance en dépend, réestimée
+#   à l'estampillage (lookup O(1) dans les tables VDOT)
+# - entrées hors catalogue (niveau non canonique, état inconnu,
+#   recent_load non numérique…) : composition à la volée
+#
+# Désactivé par SCN2_CATALOGUE=0.
+# =====================================================
+
+import itertools
+import pickle
+import time
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from core.config import config
+from core.utils.logger import log_info
+from scenarios.agregateur.scn_2 import (
+    MODULE_NAME,
+    VOLUME_TARGET_MIN,
+    _estimate_distance_km,
+    _get_phase_name,
+    _get_vdot,
+    compose_running_session,
+)
+
+LEVELS = tuple(VOLUME_TARGET_MIN)
+PHASES = ("General", "Specifique", "Affutage")
+SEANCE_TYPES = ("EF", "E", "M", "T", "I", "R")
+
+# Valeur représentative de chaque tranche de _compute_volume_target_minutes
+LOAD_BUCKETS = {"light": 0, "normal": 1.0, "heavy": 1.5}
+
+APPLIED = "applied"
+ADAPTIVE_STATES = (None, "fatigued", "neutral", "good", APPLIED)
+
+CatalogueKey = Tuple[str, str, str, str, Optional[str]]
+
+
+def load_bucket(recent_load: Any) -> Optional[str]:
+    """
+    Tranche de charge (mêmes seuils que le moteur), None si non numérique.
+    """
+    value = recent_load or 0
+    if not isinstance(value, (int, float)):
+        return None
+    if value > 1.2:
+        return "heavy"
+    if value < 0.8:
+        return "light"
+    return "normal"
+
+
+def adaptive_key(run_context: Dict[str, Any]) -> Tuple[bool, Optional[str]]:
+    """
+    (au catalogue ?, état) selon les règles d'apply_adaptation.
+    """
+    if run_context.get("adaptation_applied") is True:
+        return True, APPLIED
+    adaptive = run_context.get("adaptive_context") or run_context.get("adaptation") or {}
+    if not isinstance(adaptive, dict):
+        return False, None
+    state = adaptive.get("perceived_state")
+    if not state:
+        return True, None
+    return state in ADAPTIVE_STATES, state
+
+
+def catalogue_key(run_context: Dict[str, Any], phase_context: Dict[str, Any]) -> Optional[CatalogueKey]:
+    """
+    Clé du catalogue, ou None si les entrées sortent de l'espace énuméré.
+    """
+    profile = run_context.get("profile", {})
+    if not isinstance(profile, dict):
+        return None
+    level = profile.get("level") or phase_context.get("level") or "debutant"
+    seance_type = phase_context.get("seance_type") or phase_context.get("type_seance") or "EF"
+    bucket = load_bucket(run_context.get("recent_load"))
+    known, state = adaptive_key(run_context)
+    if level not in LEVELS or seance_type not in SEANCE_TYPES or bucket is None or not known:
+        return None
+    phase_name = _get_phase_name(phase_context, run_context.get("slot") or {})
+    return level, phase_name, seance_type, bucket, state
+
+
+def _synthetic_context(key: CatalogueKey) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    level, phase_name, seance_type, bucket, state = key
+    run_context: Dict[str, Any] = {
+        "profile": {"level": level},
+        "slot": {"phase": phase_name},
+        "recent_load": LOAD_BUCKETS[bucket],
+    }
+    if state == APPLIED:
+        run_context["adaptation_applied"] = True
+    elif state:
+        run_context["adaptive_context"] = {"perceived_state": state}
+    return run_context, {"seance_type": seance_type}
+
+
+def stamp(template: bytes, run_context: Dict[str, Any], phase_context: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Copie du modèle avec les champs propres à la requête
+    (mêmes expressions que compose_running_session).
+    """
+    session = pickle.loads(template)
+    slot = run_context.get("slot") or {}
+    session.update({
+        "session_id": run_context.get("session_id") or None,
+        "slot_id": slot.get("slot_id"),
+        "plan_id": run_context.get("plan_id"),
+        "user_id": run_context.get("user_id") or "unknown",
+        "date": slot.get("date"),
+        "type": slot.get("type") or "Séance",
+        "phase_context": phase_context,
+    })
+    trace = session["decision_trace"]
+    trace["inputs"]["objectif"] = run_context.get("objectif_normalisé")
+    trace["inputs"]["engine_version"] = run_context.get("engine_version")
+    trace["context"]["recent_load"] = run_context.get("recent_load")
+
+    vdot = _get_vdot(run_context)
+    if vdot is not None:
+        trace["inputs"]["vdot"] = vdot
+        distance_km = _estimate_distance_km(session["duration_min"], trace["inputs"]["level"], vdot)
+        session["distance_km"] = distance_km
+        session["session_spec"]["volume"]["distance_estimate_km"] = distance_km
+    return session
+
+
+class SessionCatalogue:
+    """
+    Table immuable des séances précalculées (chargée au démarrage).
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._table: Mapping[CatalogueKey, bytes] = MappingProxyType({})
+        self.loaded = False
+        self.unbuildable = 0
+        self.build_ms: Optional[float] = None
+        self.hits = 0
+        self.misses = 0
+
+    def load(self) -> None:
+        """
+        Énumère l'espace des entrées et construit la table.
+        """
+        if not self.enabled:
+            return
+        started = time.perf_counter()
+        table: Dict[CatalogueKey, bytes] = {}
+        unbuildable = 0
+
+        for key in itertools.product(LEVELS, PHASES, SEANCE_TYPES, LOAD_BUCKETS, ADAPTIVE_STATES):
+            run_context, phase_context = _synthetic_context(key)
+            try:
+                session = compose_running_session(run_context, phase_context, verbose=False)
+            except Exception:
+                # Types sans blocs définis : le moteur lève, la requête
+                # réelle passera par la composition (même erreur)
+                unbuildable += 1
+                continue
+            session["phase_context"] = None
+            table[key] = pickle.dumps(session, protocol=pickle.HIGHEST_PROTOCOL)
+
+        self._table = MappingProxyType(table)
+        self.unbuildable = unbuildable
+        self.build_ms = round((time.perf_counter() - started) * 1000, 1)
+        self.loaded = True
+        log_info(
+            f"Catalogue SCN_2 : {len(table)} séances précalculées "
+            f"({unbuildable} combinaisons non générables) en {self.build_ms} ms",
+            module=MODULE_NAME,
+        )
+
+    def lookup(self, run_context: Dict[str, Any], phase_context: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Séance estampillée, ou None (composition à la volée).
+        """
+        if not self.loaded:
+            return None
+        key = catalogue_key(run_context, phase_context)
+        template = self._table.get(key) if key is not None else None
+        if template is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        # Même effet de bord que apply_adaptation (idempotence)
+        if key[4] not in (None, APPLIED):
+            run_context["adaptation_applied"] = True
+        return stamp(template, run_context, phase_context)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "loaded": self.loaded,
+            "sessions": len(self._table),
+            "unbuildable": self.unbuildable,
+            "build_ms": self.build_ms,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+# Instance unique pour tout le process
+session_catalogue = SessionCatalogue(enabled=config.scn2_catalogue_enabled)
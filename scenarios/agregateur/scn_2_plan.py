@@ -0,0 +1,250 @@
+# scenarios/agregateur/scn_2_plan.py
+"""
+SCN_2 à l'échelle du plan – toutes les séances (semaines × jours) en une passe
+
+Rôle :
+- Recevoir la structure Step4/Step5 (build_step4_running +
+  apply_phases_and_progression : weeks[].phase, weeks[].slots[])
+- Calculer en une passe NumPy, pour tous les slots : volume cible,
+  distance, charge, block_id (mêmes règles que SCN_2)
+- Matérialiser les séances à la demande (PlanSessions[i]) : seuls les
+  slots consultés paient la construction du dict séance
+
+Adaptation (état ressenti) : non appliquée ici. Elle concerne le slot
+du jour et reste appliquée par SCN_6 / SCN_2 au moment de la séance.
+"""
+
+from collections.abc import Sequence
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from core.utils.logger import log_info
+from core.utils.timings import span
+from engine.adaptation_engine import apply_adaptation
+from engine.block_library import block_library
+from scenarios.agregateur.scn_2 import (
+    LOAD_COEFF,
+    MODULE_NAME,
+    VOLUME_TARGET_MIN,
+    _assemble_session,
+    _get_phase_name,
+    _get_vdot,
+    _pace_e,
+)
+
+PHASES = ("General", "Specifique", "Affutage")
+DEFAULT_VOLUME_RANGE = (40, 50)
+# Zones de _select_block_id : <= 40, <= 60, au-delà
+VOLUME_TAGS = ("SHORT", "MEDIUM", "LONG")
+
+
+def _volume_targets(level: str, phase_idx: np.ndarray, recent_load: Any) -> np.ndarray:
+    """
+    _compute_volume_target_minutes vectorisé (minutes, int).
+    """
+    ranges = VOLUME_TARGET_MIN.get(level) or {}
+    base_min = np.array([ranges.get(p, DEFAULT_VOLUME_RANGE)[0] for p in PHASES])[phase_idx]
+    base_max = np.array([ranges.get(p, DEFAULT_VOLUME_RANGE)[1] for p in PHASES])[phase_idx]
+
+    recent_load = recent_load or 0
+    if recent_load > 1.2:
+        base_max = np.maximum(base_min, base_max - 10)
+    elif recent_load < 0.8:
+        base_min = base_min + 5
+
+    return np.maximum(20, (base_min + base_max) // 2)
+
+
+def _block_ids(type_labels: List[str], type_idx: np.ndarray, phase_idx: np.ndarray, level: str, volumes: np.ndarray) -> np.ndarray:
+    """
+    _select_block_id vectorisé : un code par combinaison
+    (type, phase, zone de volume), libellé construit une fois par code.
+    """
+    vol_idx = np.searchsorted(np.array([40, 60]), volumes, side="left")
+    codes = (type_idx * len(PHASES) + phase_idx) * len(VOLUME_TAGS) + vol_idx
+    unique_codes, inverse = np.unique(codes, return_inverse=True)
+
+    labels = []
+    for code in unique_codes.tolist():
+        rest, v = divmod(code, len(VOLUME_TAGS))
+        t, ph = divmod(rest, len(PHASES))
+        labels.append(f"BF_RUN_{type_labels[t]}_{PHASES[ph].upper()}_{level.upper()}_{VOLUME_TAGS[v]}")
+    return np.array(labels, dtype=str)[inverse]
+
+
+class PlanSessions(Sequence):
+    """
+    Séances d'un plan : tableaux calculés d'avance, dict séance
+    construit au premier accès à plan[i] (puis conservé).
+    """
+
+    def __init__(
+        self,
+        run_context: Dict[str, Any],
+        phase_context: Dict[str, Any],
+        level: str,
+        weeks: List[Dict[str, Any]],
+        week_idx: np.ndarray,
+        slots: List[Dict[str, Any]],
+        seance_types: List[str],
+        phase_idx: np.ndarray,
+        volumes: np.ndarray,
+        distances: np.ndarray,
+        loads: np.ndarray,
+        block_ids: np.ndarray,
+    ):
+        self.run_context = run_context
+        self.phase_context = phase_context
+        self.level = level
+        self.weeks = weeks
+        self.week_idx = week_idx
+        self.slots = slots
+        self.seance_types = seance_types
+        self.phase_idx = phase_idx
+        self.volumes = volumes
+        self.distances = distances
+        self.loads = loads
+        self.block_ids = block_ids
+        self._sessions: Dict[int, Dict[str, Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self.slots)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        session = self._sessions.get(index)
+        if session is None:
+            session = self._materialize(index)
+            self._sessions[index] = session
+        return session
+
+    # ---------------------------------------------------------
+    # Contexte SCN_2 équivalent du slot i
+    # ---------------------------------------------------------
+    def slot(self, i: int) -> Dict[str, Any]:
+        week = self.weeks[self.week_idx[i]]
+        return {**self.slots[i], "phase": week.get("phase")}
+
+    def slot_phase_context(self, i: int) -> Dict[str, Any]:
+        slot_type = _slot_type(self.slots[i])
+        return {**self.phase_context, "seance_type": slot_type} if slot_type else self.phase_context
+
+    def _materialize(self, i: int) -> Dict[str, Any]:
+        seance_type = self.seance_types[i]
+        volume = int(self.volumes[i])
+        phase_name = PHASES[self.phase_idx[i]]
+        block_id = str(self.block_ids[i])
+        steps, blocks, intensity_tags = block_library.build(block_id, seance_type, phase_name, self.level, volume)
+        # Trace d'adaptation neutre (aucun état ressenti au niveau plan)
+        _, adaptation_trace = apply_adaptation({}, {})
+
+        return _assemble_session(
+            run_context=self.run_context,
+            phase_context=self.slot_phase_context(i),
+            slot=self.slot(i),
+            level=self.level,
+            phase_name=phase_name,
+            seance_type=seance_type,
+            volume_target_min=volume,
+            block_id=block_id,
+            steps=steps,
+            blocks=blocks,
+            distance_km=float(self.distances[i]),
+            load=int(self.loads[i]),
+            intensity_tags=intensity_tags,
+            adaptation_trace=adaptation_trace,
+            verbose=False,
+        )
+
+    def weekly_totals(self) -> List[Dict[str, Any]]:
+        """
+        Durée / distance / charge cumulées par semaine (sans matérialiser).
+        """
+        n = len(self.weeks)
+        duration = np.bincount(self.week_idx, weights=self.volumes, minlength=n)
+        distance = np.bincount(self.week_idx, weights=self.distances, minlength=n)
+        load = np.bincount(self.week_idx, weights=self.loads, minlength=n)
+        return [
+            {
+                "semaine": week.get("semaine") or w + 1,
+                "duration_min": int(duration[w]),
+                "distance_km": round(float(distance[w]), 1),
+                "load": int(load[w]),
+            }
+            for w, week in enumerate(self.weeks)
+        ]
+
+
+def _slot_type(slot: Dict[str, Any]) -> Optional[str]:
+    return slot.get("seance_type") or slot.get("type_seance")
+
+
+def generate_plan_sessions(
+    run_context: Dict[str, Any],
+    weeks: List[Dict[str, Any]],
+    phase_context: Optional[Dict[str, Any]] = None,
+) -> PlanSessions:
+    """
+    Séances de tout le plan à partir des semaines Step5.
+    Type de séance par slot : slot["seance_type"] / slot["type_seance"],
+    sinon celui du phase_context (défaut EF), comme SCN_2.
+    """
+    phase_context = phase_context or {}
+    profile = run_context.get("profile", {})
+    level = profile.get("level") or phase_context.get("level") or "debutant"
+    default_type = phase_context.get("seance_type") or phase_context.get("type_seance") or "EF"
+
+    with span("scn_2.plan"):
+        week_slots = [week.get("slots") or [] for week in weeks]
+        counts = np.array([len(s) for s in week_slots], dtype=np.int64)
+        week_idx = np.repeat(np.arange(len(weeks)), counts)
+
+        # Phase : une fois par libellé de phase, répétée sur les slots
+        phase_of: Dict[Any, int] = {}
+        for week in weeks:
+            raw = week.get("phase")
+            if raw not in phase_of:
+                phase_of[raw] = PHASES.index(_get_phase_name(phase_context, {"phase": raw}))
+        week_phase_idx = np.array([phase_of[week.get("phase")] for week in weeks], dtype=np.int64)
+        phase_idx = np.repeat(week_phase_idx, counts)
+
+        slots = [slot for s in week_slots for slot in s]
+        seance_types = [slot.get("seance_type") or slot.get("type_seance") or default_type for slot in slots]
+        raw_types, type_idx = np.unique(np.array(seance_types, dtype=str), return_inverse=True)
+        type_labels = [t.upper() for t in raw_types.tolist()]
+
+        volumes = _volume_targets(level, phase_idx, run_context.get("recent_load"))
+        # Allure E unique pour le plan (VDOT du profil, sinon niveau)
+        distances = np.round(volumes / _pace_e(level, _get_vdot(run_context)), 1)
+
+        # Charge : EF comptée en E (intensity_tags des gabarits de blocs)
+        coeffs = np.array([LOAD_COEFF.get("E" if t in ("E", "EF") else t, 1.0) for t in type_labels])
+        loads = np.rint(volumes * coeffs[type_idx]).astype(np.int64)
+
+        block_ids = _block_ids(type_labels, type_idx, phase_idx, level, volumes)
+
+    log_info(
+        f"[{MODULE_NAME}] Plan : {len(slots)} séances calculées ({len(weeks)} semaines, level={level})",
+        module=MODULE_NAME,
+    )
+
+    return PlanSessions(
+        run_context=run_context,
+        phase_context=phase_context,
+        level=level,
+        weeks=weeks,
+        week_idx=week_idx,
+        slots=slots,
+        seance_types=seance_types,
+        phase_idx=phase_idx,
+        volumes=volumes,
+        distances=distances,
+        loads=loads,
+        block_ids=block_ids,
+    )
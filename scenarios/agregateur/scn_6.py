@@ -1,18 +1,26 @@
+import contextvars
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from core.utils.logger import log_info, log_error
+from core.utils.timings import span, timings_requested, track_timings
 from datetime import datetime, date
 
 from typing import Any, Dict
 
+from core.config import config
 from core.internal_result import InternalResult
 from core.context import SmartCoachContext
 
 from scenarios.socle.scn_0g import run_scn_0g
 from scenarios.run.family_selector import scenario_and_family
 
-from services.airtable_service import AirtableService
+from services.airtable_io import track_io
+from services.airtable_outbox import OP_UPSERT, airtable_outbox
 from services.airtable_tables import ATABLES
+from services.session_cache import ENGINE_SCN_0G, ENGINE_SCN_2, session_cache
+from services.training_load import training_load_store
 
 from utils.training_day import resolve_training_days
 from utils.next_slot import compute_next_slot
@@ -86,6 +94,35 @@ def compute_adaptive_context(feedback_slots):
         "rule": "RG_MEM_001_NEUTRAL",
     }
 
+def _persist_type_cible(context, outbox_id):
+    # En file : marqué écrit seulement quand l'outbox l'a envoyé
+    if outbox_id is None:
+        session_cache.type_cible_written(context.slot_id, context.type_cible)
+        context.war_room["airtable_update"] = "Type_cible written"
+    else:
+        session_cache.type_cible_pending(context.slot_id)
+        context.war_room["airtable_update"] = f"Type_cible queued (outbox #{outbox_id})"
+
+
+def _type_cible_failed(context, error):
+    # Écriture non critique : la séance est générée malgré l'échec
+    log_error(f"[SCN_6] Type_cible non persisté (slot {context.slot_id}) : {error}", module="SCN_6")
+    context.war_room["airtable_update"] = f"Type_cible not persisted : {error}"
+
+
+def _type_cible_sent(table_id, op, rows):
+    """
+    Abonné outbox : Type_cible réellement écrits dans Airtable.
+    """
+    if table_id != ATABLES.SLOTS or op != OP_UPSERT:
+        return
+    for row in rows:
+        if "Type_cible" in row:
+            session_cache.type_cible_written(row.get("Slot_ID"), row["Type_cible"])
+
+
+airtable_outbox.add_sent_listener(_type_cible_sent)
+
 # ======================================================================
 #  SCN_6 – Orchestrateur OnDemand (version CLEAN v2026-ready)
 # ======================================================================
@@ -94,6 +131,194 @@ def run_scn_6(payload, record_id=None):
     logger.info("[SCN_6] Début SCN_6")
     logger.info(f"[SCN_6] PAYLOAD_RECU = {payload}")
 
+    return _run_scn_6_tracked(payload)
+
+
+def _run_scn_6_tracked(payload, writes=None):
+    # Appels Airtable de ce run → war_room["io"] (y compris en erreur)
+    # Durées par étape → war_room["timings"] (si demandé)
+    with track_io() as io, track_timings() as timings:
+        context = _new_scn_6_context()
+        try:
+            with span("scn_6"):
+                return _run_scn_6(context, payload, writes)
+        finally:
+            context.war_room["io"] = io.summary()
+            if timings_requested(payload):
+                context.war_room["timings"] = timings.summary()
+
+
+def _run_scn_6(context, payload, writes=None):
+    try:
+        with span("scn_6.prepare"):
+            run_ctx, early_result = _scn_6_prepare(context, payload)
+        if early_result is not None:
+            return early_result
+
+        # --------------------------------------------------
+        # 5) Persistence du Type_cible dans Airtable (Slots)
+        #    Non critique : mise en outbox, envoyée en fond
+        #    (lot : regroupée par l'appelant)
+        # --------------------------------------------------
+        try:
+            with span("scn_6.persist"):
+                row = {"Slot_ID": context.slot_id, "Type_cible": context.type_cible}
+                if session_cache.type_cible_unchanged(context.slot_id, context.type_cible):
+                    context.war_room["airtable_update"] = "Type_cible unchanged (skipped)"
+                elif writes is not None:
+                    writes.append(row)
+                    context.war_room["airtable_update"] = "Type_cible batched"
+                else:
+                    _persist_type_cible(context, airtable_outbox.upsert(ATABLES.SLOTS, ["Slot_ID"], row))
+
+        except Exception as e:
+            _type_cible_failed(context, e)
+
+        return _scn_6_generate(context, run_ctx)
+
+    except Exception as e:
+        logger.exception("[SCN_6] Exception")
+        return InternalResult.error(
+            message=f"Erreur SCN_6 : {e}",
+            source="SCN_6",
+        )
+
+
+async def run_scn_6_async(payload, record_id=None):
+    """
+    SCN_6 asyncio : mêmes étapes que run_scn_6, la persistance
+    du Type_cible passe par le client Airtable async.
+    """
+    logger.info("[SCN_6] Début SCN_6 (async)")
+
+    with track_io() as io, track_timings() as timings:
+        context = _new_scn_6_context()
+        try:
+            with span("scn_6"):
+                return await _run_scn_6_async(context, payload)
+        finally:
+            context.war_room["io"] = io.summary()
+            if timings_requested(payload):
+                context.war_room["timings"] = timings.summary()
+
+
+async def _run_scn_6_async(context, payload):
+    from services.airtable_async import AsyncAirtableService
+
+    try:
+        with span("scn_6.prepare"):
+            run_ctx, early_result = _scn_6_prepare(context, payload)
+        if early_result is not None:
+            return early_result
+
+        try:
+            with span("scn_6.persist"):
+                row = {"Slot_ID": context.slot_id, "Type_cible": context.type_cible}
+                if session_cache.type_cible_unchanged(context.slot_id, context.type_cible):
+                    context.war_room["airtable_update"] = "Type_cible unchanged (skipped)"
+                elif airtable_outbox.enabled:
+                    _persist_type_cible(context, airtable_outbox.upsert(ATABLES.SLOTS, ["Slot_ID"], row))
+                else:
+                    await AsyncAirtableService().upsert_many(ATABLES.SLOTS, key_fields=["Slot_ID"], rows=[row])
+                    _persist_type_cible(context, None)
+
+        except Exception as e:
+            _type_cible_failed(context, e)
+
+        return _scn_6_generate(context, run_ctx)
+
+    except Exception as e:
+        logger.exception("[SCN_6] Exception")
+        return InternalResult.error(
+            message=f"Erreur SCN_6 : {e}",
+            source="SCN_6",
+        )
+
+
+# ======================================================================
+#  SCN_6 par lot (pré-génération hebdomadaire)
+# ======================================================================
+
+def iter_scn_6_batch(payloads, workers=None):
+    """
+    Exécute SCN_6 sur chaque payload ({run_context, feedback_slots})
+    dans un pool borné ; produit les résultats au fil de l'eau :
+      {"index": i, "result": {...}}  (ordre d'achèvement)
+      …
+      {"summary": {...}}             (dernière ligne)
+
+    Les Type_cible ne sont pas écrits item par item : ils sont
+    regroupés et envoyés en upserts par lots (outbox si activée).
+    """
+    payloads = list(payloads)
+    workers = max(1, min(workers or config.scn6_batch_workers, config.scn6_batch_workers, len(payloads) or 1))
+    started = time.monotonic()
+
+    def _one(payload):
+        writes = []
+        try:
+            result = _run_scn_6_tracked(payload, writes)
+        except Exception as e:
+            logger.exception("[SCN_6] Exception (lot)")
+            result = InternalResult.error(message=f"Erreur SCN_6 : {e}", source="SCN_6")
+        return result, writes
+
+    summary = {"items": len(payloads), "ok": 0, "errors": 0, "writes": 0, "write_calls": 0, "write_errors": []}
+    pending_rows = []
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="scn6-batch") as pool:
+        # 1 copie de contexte par item : registre I/O et contextvars isolés
+        futures = {
+            pool.submit(contextvars.copy_context().run, _one, payload): index
+            for index, payload in enumerate(payloads)
+        }
+        for future in as_completed(futures):
+            result, writes = future.result()
+            summary["ok" if result.success else "errors"] += 1
+            pending_rows.extend(writes)
+            if len(pending_rows) >= config.scn6_batch_write_rows:
+                _flush_type_cible(pending_rows, summary)
+            yield {"index": futures[future], "result": result.to_api()}
+
+    _flush_type_cible(pending_rows, summary)
+    summary["workers"] = workers
+    summary["elapsed_ms"] = round((time.monotonic() - started) * 1000, 1)
+    log_info(
+        f"[SCN_6] Lot : {summary['items']} items, {summary['ok']} ok, {summary['errors']} erreurs, "
+        f"{summary['writes']} Type_cible en {summary['write_calls']} envoi(s), {summary['elapsed_ms']} ms",
+        module="SCN_6",
+    )
+    yield {"summary": summary}
+
+
+def _flush_type_cible(rows, summary):
+    """
+    Type_cible du lot → upserts par 10 (dernière valeur par Slot_ID).
+    """
+    if not rows:
+        return
+    merged = {}
+    for row in rows:
+        merged[row["Slot_ID"]] = row
+    batch = [r for r in merged.values() if r.get("Slot_ID")]
+    rows.clear()
+    if not batch:
+        return
+    try:
+        queued = airtable_outbox.upsert_many(ATABLES.SLOTS, ["Slot_ID"], batch)
+        for row in batch:
+            if queued is None:
+                session_cache.type_cible_written(row["Slot_ID"], row.get("Type_cible"))
+            else:
+                session_cache.type_cible_pending(row["Slot_ID"])
+        summary["writes"] += len(batch)
+        summary["write_calls"] += 1
+    except Exception as e:
+        log_error(f"[SCN_6] Lot : écriture Type_cible impossible ({len(batch)} slots) : {e}", module="SCN_6")
+        summary["write_errors"].append({"slots": [r["Slot_ID"] for r in batch], "error": str(e)})
+
+
+def _new_scn_6_context() -> SmartCoachContext:
     # ✅ CONTEXTE UNIQUE
     context = SmartCoachContext()
 
@@ -108,209 +333,227 @@ def run_scn_6(payload, record_id=None):
         }
         context.war_room["adaptation_initialized_default"] = True
 
-    try:
-        # ----------------------------------------------------
-        # 1) Extraction universelle du run_context
-        # ----------------------------------------------------
-        if isinstance(payload, dict):
-            run_ctx = payload.get("run_context", {}) or {}
-
-            # ----------------------------------------------------
-            # GARDE-FOU SCN_2 : adaptation TOUJOURS présente
-            # (même sans feedback utilisateur)
-            # ----------------------------------------------------
-            if "adaptation" not in run_ctx:
-                run_ctx["adaptation"] = {
-                    "perceived_state": "neutral",
-                    "fatigue_streak": 0
-                }
-        elif hasattr(payload, "payload") and isinstance(payload.payload, dict):
-            run_ctx = payload.payload.get("run_context", {}) or {}
-        else:
-            run_ctx = getattr(payload, "run_context", {}) or {}
-        # ----------------------------------------------------
-        # 1ter) Extraction des feedbacks slots (P3-E)
-        # ----------------------------------------------------
-        if isinstance(payload, dict):
-            feedback_slots = payload.get("feedback_slots", [])
-        elif hasattr(payload, "payload") and isinstance(payload.payload, dict):
-            feedback_slots = payload.payload.get("feedback_slots", [])
-        else:
-            feedback_slots = []
+    return context
 
-        context.war_room["feedback_slots_count"] = len(feedback_slots)
 
-        # ----------------------------------------------------
-        # 2) Extraction du slot
-        # ----------------------------------------------------
-        slot = run_ctx.get("slot", {}) or {}
-        context.slot_id = slot.get("slot_id")
-        context.slot_date = slot.get("date")
-
-        # ----------------------------------------------------
-        # 3) Extraction du contexte métier NORMALISÉ
-        # ----------------------------------------------------
-        profile = run_ctx.get("profile", {}) or {}
-        objective = run_ctx.get("objective", {}) or {}
-
-        context.mode = profile.get("mode")
-        context.submode = profile.get("submode")
-        context.age = profile.get("age")
-        context.level = profile.get("level")
-
-        context.objective_type = objective.get("type")
-        context.objective_time = objective.get("time")
-
-        # 🔑 vérité métier normalisée (issue d’Airtable / Make)
-        context.objectif_normalisé = run_ctx.get("objectif_normalisé")
-        context.war_room["objectif_normalisé"] = context.objectif_normalisé
-
-        # Nettoyage éventuel
-        if isinstance(context.objective_time, str):
-            context.objective_time = context.objective_time.strip()
+def _scn_6_prepare(context, payload):
+    """
+    Étapes 1 → 4 de SCN_6 (sans I/O).
+    Retourne (run_ctx, résultat d'erreur anticipé ou None).
+    """
+    # ----------------------------------------------------
+    # 1) Extraction universelle du run_context
+    # ----------------------------------------------------
+    if isinstance(payload, dict):
+        run_ctx = payload.get("run_context", {}) or {}
 
         # ----------------------------------------------------
-        # 1bis) Validation du run_context
+        # GARDE-FOU SCN_2 : adaptation TOUJOURS présente
+        # (même sans feedback utilisateur)
         # ----------------------------------------------------
-        if not isinstance(run_ctx, dict) or not run_ctx:
-            context.war_room["error"] = "run_context manquant ou vide"
-            context.war_room["received_payload"] = payload
-
-            return InternalResult.error(
-                message="run_context manquant ou vide",
-                source="SCN_6",
-                data={"war_room": context.war_room},
-            )
+        if "adaptation" not in run_ctx:
+            run_ctx["adaptation"] = {
+                "perceived_state": "neutral",
+                "fatigue_streak": 0
+            }
+    elif hasattr(payload, "payload") and isinstance(payload.payload, dict):
+        run_ctx = payload.payload.get("run_context", {}) or {}
+    else:
+        run_ctx = getattr(payload, "run_context", {}) or {}
+    # ----------------------------------------------------
+    # 1ter) Extraction des feedbacks slots (P3-E)
+    # ----------------------------------------------------
+    if isinstance(payload, dict):
+        feedback_slots = payload.get("feedback_slots", [])
+    elif hasattr(payload, "payload") and isinstance(payload.payload, dict):
+        feedback_slots = payload.payload.get("feedback_slots", [])
+    else:
+        feedback_slots = []
+
+    context.war_room["feedback_slots_count"] = len(feedback_slots)
+
+    # ----------------------------------------------------
+    # 2) Extraction du slot
+    # ----------------------------------------------------
+    slot = run_ctx.get("slot", {}) or {}
+    context.slot_id = slot.get("slot_id")
+    context.slot_date = slot.get("date")
+
+    # ----------------------------------------------------
+    # 3) Extraction du contexte métier NORMALISÉ
+    # ----------------------------------------------------
+    profile = run_ctx.get("profile", {}) or {}
+    objective = run_ctx.get("objective", {}) or {}
+
+    context.mode = profile.get("mode")
+    context.submode = profile.get("submode")
+    context.age = profile.get("age")
+    context.level = profile.get("level")
+
+    context.objective_type = objective.get("type")
+    context.objective_time = objective.get("time")
+
+    # 🔑 vérité métier normalisée (issue d’Airtable / Make)
+    context.objectif_normalisé = run_ctx.get("objectif_normalisé")
+    context.war_room["objectif_normalisé"] = context.objectif_normalisé
+
+    # Nettoyage éventuel
+    if isinstance(context.objective_time, str):
+        context.objective_time = context.objective_time.strip()
+
+    # ----------------------------------------------------
+    # 1bis) Validation du run_context
+    # ----------------------------------------------------
+    if not isinstance(run_ctx, dict) or not run_ctx:
+        context.war_room["error"] = "run_context manquant ou vide"
+        context.war_room["received_payload"] = payload
+
+        return run_ctx, InternalResult.error(
+            message="run_context manquant ou vide",
+            source="SCN_6",
+            data={"war_room": context.war_room},
+        )
 
-        context.war_room["inputs"] = {
-            "mode": context.mode,
-            "submode": context.submode,
-            "objective_type": context.objective_type,
-            "objective_time": context.objective_time,
-            "objectif_normalisé": context.objectif_normalisé,
-            "age": context.age,
-        }
+    context.war_room["inputs"] = {
+        "mode": context.mode,
+        "submode": context.submode,
+        "objective_type": context.objective_type,
+        "objective_time": context.objective_time,
+        "objectif_normalisé": context.objectif_normalisé,
+        "age": context.age,
+    }
 
-        # ----------------------------------------------------
-        # 4) Sélection scénario + famille via RG-00
-        # ----------------------------------------------------
+    # ----------------------------------------------------
+    # 4) Sélection scénario + famille via RG-00
+    # ----------------------------------------------------
+    with span("scn_6.rg00"):
         scenario_id, model_family, scores = scenario_and_family(context)
 
-        context.war_room["scenario_id"] = scenario_id
-        context.war_room["model_family"] = model_family
-        context.war_room["scores"] = scores
+    context.war_room["scenario_id"] = scenario_id
+    context.war_room["model_family"] = model_family
+    context.war_room["scores"] = scores
 
-        if scenario_id == "KO_SCENARIO":
-            return InternalResult.error(
-                message="Aucun scénario fonctionnel applicable",
-                source="SCN_6",
-                data={"war_room": context.war_room},
-            )
+    if scenario_id == "KO_SCENARIO":
+        return run_ctx, InternalResult.error(
+            message="Aucun scénario fonctionnel applicable",
+            source="SCN_6",
+            data={"war_room": context.war_room},
+        )
 
-        # Injection du modèle dans le contexte pour SCN_0g
-        context.__dict__["model_family"] = model_family
+    # Injection du modèle dans le contexte pour SCN_0g
+    context.__dict__["model_family"] = model_family
 
-        # ----------------------------------------------------
-        # 4bis) Calcul du Type_cible (intensité dominante)
-        # ----------------------------------------------------
+    # ----------------------------------------------------
+    # 4bis) Calcul du Type_cible (intensité dominante)
+    # ----------------------------------------------------
+    with span("scn_6.type_cible"):
         type_cible = compute_type_cible(model_family)
-        context.__dict__["type_cible"] = type_cible
-        context.war_room["type_cible"] = type_cible
+    context.__dict__["type_cible"] = type_cible
+    context.war_room["type_cible"] = type_cible
 
-        # ----------------------------------------------------
-        # 4ter) Calcul du contexte adaptatif (P3-E)
-        # ----------------------------------------------------
+    # ----------------------------------------------------
+    # 4ter) Calcul du contexte adaptatif (P3-E)
+    # ----------------------------------------------------
+    with span("scn_6.adaptive_context"):
         adaptive_context = compute_adaptive_context(feedback_slots)
-        context.__dict__["adaptive_context"] = adaptive_context
-        context.war_room["adaptive_context"] = adaptive_context
-
-        # ----------------------------------------------------
-        # 4quater) Initialisation adaptation (contrat SCN_2)
-        # ----------------------------------------------------
-        adaptation = {
-            "perceived_state": adaptive_context.get("perceived_state"),
-            "fatigue_streak": adaptive_context.get("fatigue_streak", 0),
-        }
+    context.__dict__["adaptive_context"] = adaptive_context
+    context.war_room["adaptive_context"] = adaptive_context
+
+    # ----------------------------------------------------
+    # 4quater) Initialisation adaptation (contrat SCN_2)
+    # ----------------------------------------------------
+    adaptation = {
+        "perceived_state": adaptive_context.get("perceived_state"),
+        "fatigue_streak": adaptive_context.get("fatigue_streak", 0),
+    }
 
-        # ✅ écrasement contrôlé
-        context.adaptation = adaptation
-        context.war_room["adaptation_overridden_by_P3E"] = True
+    # ✅ écrasement contrôlé
+    context.adaptation = adaptation
+    context.war_room["adaptation_overridden_by_P3E"] = True
 
-        # --------------------------------------------------
-        # 5) Persistence du Type_cible dans Airtable (Slots)
-        # --------------------------------------------------
-        try:
-            airtable = AirtableService()
-
-            airtable.upsert_record(
-                ATABLES.SLOTS,
-                key_field="Slot_ID",
-                key_value=context.slot_id,
-                fields={
-                    "Type_cible": context.type_cible
-                }
-            )
-            context.war_room["airtable_update"] = "Type_cible written"
+    return run_ctx, None
 
-        except Exception as e:
-            return InternalResult.error(
-                message=f"Erreur Airtable SCN_6 : {str(e)}",
-                source="SCN_6",
-                data={"war_room": context.war_room},
-            )
 
-        # ----------------------------------------------------
-        # 5) Exécution SOCLE SCN_0g / SCN_2
-        # ----------------------------------------------------
-        # ⚠️ Adaptation contrat SCN_0g V1 (payload legacy)
+def _scn_6_generate(context, run_ctx):
+    """
+    Étapes 5 → 6 de SCN_6 : génération SCN_2 / SCN_0g et prochain slot (sans I/O).
+    """
+    adaptive_context = context.adaptive_context
 
-        incoming_run_context = run_ctx
+    # ----------------------------------------------------
+    # 5) Exécution SOCLE SCN_0g / SCN_2
+    # ----------------------------------------------------
+    # ⚠️ Adaptation contrat SCN_0g V1 (payload legacy)
 
-        engine_version = run_ctx.get("engine_version")
-        mode = (incoming_run_context.get("profile", {}).get("mode") or "").lower()
-        if "adaptation" not in incoming_run_context:
-            incoming_run_context["adaptation"] = {
-                "perceived_state": "neutral",
-                "fatigue_streak": 0
-            }
+    incoming_run_context = run_ctx
 
-        # ----------------------------------------------------
-        # 5bis-ter) Injection adaptation dans run_context (contrat SCN_2 réel)
-        # ----------------------------------------------------
+    engine_version = run_ctx.get("engine_version")
+    mode = (incoming_run_context.get("profile", {}).get("mode") or "").lower()
+    if "adaptation" not in incoming_run_context:
         incoming_run_context["adaptation"] = {
-            "perceived_state": adaptive_context.get("perceived_state"),
-            "fatigue_streak": adaptive_context.get("fatigue_streak", 0),
+            "perceived_state": "neutral",
+            "fatigue_streak": 0
         }
 
-        context.war_room["adaptation_injected_in_run_context"] = True
-
-        # ----------------------------------------------------
-        # Initialisation du phase_context (contrat SCN_2)
-        # ----------------------------------------------------
-        phase_context = {}
-        context.war_room["phase_context_initialized"] = True
+    # ----------------------------------------------------
+    # 5bis-ter) Injection adaptation dans run_context (contrat SCN_2 réel)
+    # ----------------------------------------------------
+    incoming_run_context["adaptation"] = {
+        "perceived_state": adaptive_context.get("perceived_state"),
+        "fatigue_streak": adaptive_context.get("fatigue_streak", 0),
+    }
 
-        # ----------------------------------------------------
-        # 5bis-final) Payload conforme au contrat SCN_2
-        # ----------------------------------------------------
-        context.payload = {
-            "run_context": incoming_run_context,   # ✅ clé attendue par SCN_2
-            "phase_context": phase_context,        # ✅ clé attendue par SCN_2
-
-            # (optionnel) on garde aussi le legacy si SCN_0g en a besoin
-            "slot": {
-                "slot_id": context.slot_id,
-                "date": context.slot_date,
-                "type": getattr(context, "type_cible", None),
-            },
-            "profile": {
-                "level": context.level
-            }
+    context.war_room["adaptation_injected_in_run_context"] = True
+
+    # ----------------------------------------------------
+    # 5bis-quater) Charge d'entraînement du coureur → recent_load
+    # (ATL/CTL tenus à jour à chaque séance et feedback)
+    # ----------------------------------------------------
+    runner_id = incoming_run_context.get("runner_id") or incoming_run_context.get("user_id")
+    if incoming_run_context.get("recent_load") is None:
+        with span("scn_6.training_load"):
+            training_load = training_load_store.snapshot(runner_id, context.slot_date)
+        if training_load is not None:
+            context.war_room["training_load"] = training_load
+            if training_load["acwr"] is not None:
+                incoming_run_context["recent_load"] = training_load["acwr"]
+
+    # ----------------------------------------------------
+    # Initialisation du phase_context (contrat SCN_2)
+    # ----------------------------------------------------
+    phase_context = {}
+    context.war_room["phase_context_initialized"] = True
+
+    # ----------------------------------------------------
+    # 5bis-final) Payload conforme au contrat SCN_2
+    # ----------------------------------------------------
+    context.payload = {
+        "run_context": incoming_run_context,   # ✅ clé attendue par SCN_2
+        "phase_context": phase_context,        # ✅ clé attendue par SCN_2
+
+        # (optionnel) on garde aussi le legacy si SCN_0g en a besoin
+        "slot": {
+            "slot_id": context.slot_id,
+            "date": context.slot_date,
+            "type": getattr(context, "type_cible", None),
+        },
+        "profile": {
+            "level": context.level
         }
+    }
+
+    context.war_room["payload_contract"] = "SCN_2_run_context"
 
-        context.war_room["payload_contract"] = "SCN_2_run_context"
+    with span("scn_6.generate"):
+        engine = ENGINE_SCN_2 if engine_version == "C" and mode == "running" else ENGINE_SCN_0G
 
-        if engine_version == "C" and mode == "running":
+        # Mêmes entrées normalisées → séance déjà générée, réestampillée au slot
+        cache_key, cached = session_cache.lookup(engine, context.payload)
+        if cached is not None:
+            log_info(f"[SCN_6] séance servie depuis le cache ({engine})")
+            context.war_room["session_cache"] = "hit"
+            result = InternalResult.ok(message=f"{engine} : séance servie depuis le cache", source=engine, data=cached)
+        elif engine == ENGINE_SCN_2:
             log_info("[SCN_6] engine_version=C → utilisation SCN_2")
             from scenarios.agregateur.scn_2 import run_scn_2
             result = run_scn_2(context)
@@ -319,56 +562,61 @@ def run_scn_6(payload, record_id=None):
             from scenarios.socle.scn_0g import run_scn_0g
             result = run_scn_0g(context)
 
+        if cached is None and result.success:
+            context.war_room["session_cache"] = "miss"
+            session_cache.store(engine, cache_key, result.data or {})
 
-        if not result.success:
-            raise RuntimeError(f"SCN_0g a échoué : {result.message}")
 
-        final_data = result.data or {}
-        final_data["war_room"] = context.war_room
-        
-        # ----------------------------------------------------
-        # 6bis) Calcul du prochain slot (BACKEND ONLY)
-        # ----------------------------------------------------
-        try:
-            # 1️⃣ Récupération des jours d'entraînement (string Airtable)
-            jours_final = run_ctx.get("jours_final")
-            session_date = (run_ctx.get("slot") or {}).get("date")
+    if not result.success:
+        raise RuntimeError(f"SCN_0g a échoué : {result.message}")
+
+    # Charge planifiée ajoutée à l'état du coureur (corrigée au feedback)
+    try:
+        session = (result.data or {}).get("session") or {}
+        training_load_store.record_session(runner_id, context.slot_id, context.slot_date, session.get("load"))
+    except Exception as e:
+        log_error(f"[SCN_6] charge d'entraînement non enregistrée : {e}")
+
+    final_data = result.data or {}
+    final_data["war_room"] = context.war_room
+    
+    # ----------------------------------------------------
+    # 6bis) Calcul du prochain slot (BACKEND ONLY)
+    # ----------------------------------------------------
+    try:
+        # 1️⃣ Récupération des jours d'entraînement (string Airtable)
+        jours_final = run_ctx.get("jours_final")
+        session_date = (run_ctx.get("slot") or {}).get("date")
 
-            if not jours_final:
-                raise ValueError("jours_final manquant dans run_context")
-            if not session_date:
-                raise ValueError("slot.date manquant dans run_context")
+        if not jours_final:
+            raise ValueError("jours_final manquant dans run_context")
+        if not session_date:
+            raise ValueError("slot.date manquant dans run_context")
 
-            # 2️⃣ Normalisation robuste (string → List[int])
-            training_days = resolve_training_days(jours_final)
+        # 2️⃣ Normalisation robuste (string → List[int])
+        training_days = resolve_training_days(jours_final)
 
-            # 4️⃣ Appel UNIQUE à la logique centrale
+        # 4️⃣ Appel UNIQUE à la logique centrale
+        with span("scn_6.next_slot"):
             next_slot = compute_next_slot(
                 current_date=date.fromisoformat(session_date),
                 training_days=training_days
             )
 
-            # 5️⃣ Injection dans la réponse finale
-            final_data["next_slot"] = next_slot
-            context.war_room["next_slot"] = next_slot
-
-        except Exception as e:
-            context.war_room["next_slot_error"] = str(e)
-
-        # ----------------------------------------------------
-        # 6) Réponse finale
-        # ----------------------------------------------------
-        engine_label = "SCN_2" if engine_version == "C" else "SCN_0g"
-
-        return InternalResult.ok(
-            message=f"Séance générée avec {engine_label} via SCN_6",
-            source="SCN_6",
-            data=final_data,
-        )
+        # 5️⃣ Injection dans la réponse finale
+        final_data["next_slot"] = next_slot
+        context.war_room["next_slot"] = next_slot
 
     except Exception as e:
-        logger.exception("[SCN_6] Exception")
-        return InternalResult.error(
-            message=f"Erreur SCN_6 : {e}",
-            source="SCN_6",
-        )
\ No newline at end of file
+        context.war_room["next_slot_error"] = str(e)
+
+    # ----------------------------------------------------
+    # 6) Réponse finale
+    # ----------------------------------------------------
+    engine_label = "SCN_2" if engine_version == "C" else "SCN_0g"
+
+    return InternalResult.ok(
+        message=f"Séance générée avec {engine_label} via SCN_6",
+        source="SCN_6",
+        data=final_data,
+    )
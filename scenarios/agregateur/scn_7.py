@@ -4,7 +4,7 @@ import logging
 from core.internal_result import InternalResult
 from core.utils.logger import log_info, log_error
 
-# from services.airtable_service import AirtableService
+# from services.airtable_outbox import airtable_outbox
 # from services.airtable_tables import ATABLES
 
 logger = logging.getLogger("SCN_7")
@@ -54,9 +54,9 @@ def run_scn_7(context):
     }
 
     try:
-        # TODO : ici, brancher réellement Airtable :
-        # at = AirtableService(ATABLES.SLOTS)
-        # record = at.upsert_slot(fields)
+        # TODO : ici, brancher réellement Airtable, en différé via l'outbox
+        # (écriture non critique, acquittée tout de suite) :
+        # airtable_outbox.upsert(ATABLES.SLOTS, ["Slot_ID"], fields)
         record = {"id": "mock_record_id", "fields": fields}
     except Exception as e:
         log_error(f"[SCN_7] Erreur Airtable : {e}")
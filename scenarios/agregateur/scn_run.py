@@ -1,5 +1,6 @@
 from core.internal_result import InternalResult
 from core.utils.logger import log_info, log_error
+from core.utils.timings import span
 
 
 def run_scn_run(context):
@@ -43,17 +44,18 @@ def run_scn_run(context):
     mode = run_context.get("profile", {}).get("mode")
 
     try:
-        # 🔵 Nouveau moteur RUNNING (SCN_2) — activé par flag
-        if engine_version == "C" and mode == "running":
-            log_info("[SCN_RUN] engine_version=C → utilisation SCN_2")
-            from scenarios.agregateur.scn_2 import run_scn_2
-            result = run_scn_2(context)
-
-        # 🔴 Fallback legacy — BAB_ENGINE_MVP (SCN_0g)
-        else:
-            log_info("[SCN_RUN] fallback BAB_ENGINE_MVP (SCN_0g)")
-            from engine import bab_engine_mvp
-            result = bab_engine_mvp.run(run_context)
+        with span("scn_run.engine"):
+            # 🔵 Nouveau moteur RUNNING (SCN_2) — activé par flag
+            if engine_version == "C" and mode == "running":
+                log_info("[SCN_RUN] engine_version=C → utilisation SCN_2")
+                from scenarios.agregateur.scn_2 import run_scn_2
+                result = run_scn_2(context)
+
+            # 🔴 Fallback legacy — BAB_ENGINE_MVP (SCN_0g)
+            else:
+                log_info("[SCN_RUN] fallback BAB_ENGINE_MVP (SCN_0g)")
+                from engine import bab_engine_mvp
+                result = bab_engine_mvp.run(run_context)
 
     except Exception as e:
         log_error(f"[SCN_RUN] Exception moteur : {e}")
@@ -1,4 +1,5 @@
 from datetime import datetime, timedelta
+from services.airtable_query import and_, eq, ne
 from services.airtable_service import AirtableService
 from core.internal_result import InternalResult
 from core.utils.logger import get_logger
@@ -9,9 +10,13 @@ logger = get_logger("CORE_1")
 def run_scn_slot_generator(coureur_id: str):
     airtable = AirtableService()
 
+    # Dernier slot daté du coureur : tri décroissant + 1 record côté Airtable
     records = airtable.list_records(
         ATABLES.SLOTS,
-        filter_by_formula=f"{{Coureur}} = '{coureur_id}'",
+        filter_by_formula=and_(eq("Coureur", coureur_id), ne("Date_slot", "")),
+        fields=["Date_slot"],
+        sort=["-Date_slot"],
+        max_records=1,
     )
 
     if not records:
@@ -39,15 +44,17 @@ def run_scn_slot_generator(coureur_id: str):
     last_date = max(slots)
     next_date = last_date + timedelta(days=2)
 
-    new_record = airtable.create_record(
+    # Upsert sur (Coureur, Date_slot) : un retry ne crée pas de doublon
+    new_record = airtable.upsert_many(
         ATABLES.SLOTS,
-        fields={
+        key_fields=["Coureur", "Date_slot"],
+        rows=[{
             "Coureur": coureur_id,
             "Date_slot": next_date.date().isoformat(),
             "Statut": "planned",
             "Source": "SCN_SLOT_GENERATOR",
-        },
-    )
+        }],
+    )["records"][0]
 
     logger.info(
         f"[SCN_SLOT_GENERATOR] Nouveau slot créé "
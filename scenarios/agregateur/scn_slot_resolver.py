@@ -1,8 +1,42 @@
+import asyncio
 from datetime import datetime, timedelta
+from services.airtable_async import AsyncAirtableService
+from services.airtable_loader import AsyncBatchLoader, BatchLoader
+from services.airtable_query import RECORD_ID, and_, apply_options, eq
 from services.airtable_service import AirtableService
 from services.airtable_tables import ATABLES
 
 airtable = AirtableService()
+airtable_async = AsyncAirtableService()
+
+
+def _first_planned_formula(coureur_id: str):
+    return and_(eq("Coureur_ID", coureur_id), eq("status", "planned"))
+
+
+# Le slot FIRST = le planned le plus ancien : 1 seul record, 3 champs
+FIRST_QUERY = {
+    "fields": ["Date_slot", "week_index", "day_index"],
+    "sort": ["Date_slot"],
+    "max_records": 1,
+}
+
+# Lots multi-coureurs : 1 requête OR par table (slots planned, coureurs)
+PLANNED_SLOTS = {
+    "table_id": ATABLES.SLOTS,
+    "key_field": "Coureur_ID",
+    "where": eq("status", "planned"),
+    "fields": FIRST_QUERY["fields"] + ["Coureur_ID"],
+}
+planned_slots = BatchLoader(**PLANNED_SLOTS, service=airtable)
+planned_slots_async = AsyncBatchLoader(**PLANNED_SLOTS, service=airtable_async)
+coureurs = BatchLoader(ATABLES.COU_TABLE, RECORD_ID, service=airtable)
+coureurs_async = AsyncBatchLoader(ATABLES.COU_TABLE, RECORD_ID, service=airtable_async)
+
+
+def _first_of(slots: list) -> dict:
+    # Même sélection que FIRST_QUERY, appliquée aux slots du lot
+    return _first_from_records(apply_options(slots, sort=FIRST_QUERY["sort"], max_records=1))
 
 # -------------------------------------------------
 # FIRST = création du tout premier slot
@@ -12,9 +46,13 @@ def run_first(payload: dict):
 
     records = airtable.list_records(
         ATABLES.SLOTS,
-        filter_by_formula=f"AND({{Coureur_ID}} = '{coureur_id}', {{status}} = 'planned')"
+        filter_by_formula=_first_planned_formula(coureur_id),
+        **FIRST_QUERY,
     )
+    return _first_from_records(records)
+
 
+def _first_from_records(records: list) -> dict:
     if not records:
         return {
             "success": False,
@@ -23,7 +61,7 @@ def run_first(payload: dict):
             "source": "SCN_SLOT_RESOLVER"
         }
 
-    # on prend le premier slot planned (pas de tri, pas de magie)
+    # premier slot planned par Date_slot (tri fait par Airtable)
     r = records[0]
     fields = r.get("fields", {})
 
@@ -60,6 +98,10 @@ def run_next(payload: dict):
         }
 
     coureur_record = airtable.get_record(ATABLES.COU_TABLE, coureur_id)
+    return _next_from_coureur(coureur_record, current_date)
+
+
+def _next_from_coureur(coureur_record, current_date: str) -> dict:
     fields = coureur_record.get("fields", {}) if coureur_record else {}
     dispos = fields.get("dispos", [])
 
@@ -129,3 +171,117 @@ def run_scn_slot_resolver(
         "message": f"Mode non implémenté : {mode}",
         "source": "SCN_SLOT_RESOLVER"
     }
+
+
+# -------------------------------------------------
+# Variantes asyncio (routes async, client httpx)
+# -------------------------------------------------
+async def run_first_async(payload: dict):
+    records = await airtable_async.list_records(
+        ATABLES.SLOTS,
+        filter_by_formula=_first_planned_formula(payload["coureur_id"]),
+        **FIRST_QUERY,
+    )
+    return _first_from_records(records)
+
+
+async def run_next_async(payload: dict):
+    current_date = payload.get("current_slot_date")
+
+    if not current_date:
+        return {
+            "success": False,
+            "status": "error",
+            "message": "current_slot_date manquant",
+            "source": "SCN_SLOT_RESOLVER"
+        }
+
+    coureur_record = await airtable_async.get_record(ATABLES.COU_TABLE, payload["coureur_id"])
+    return _next_from_coureur(coureur_record, current_date)
+
+
+async def run_scn_slot_resolver_async(
+    coureur_id: str,
+    mode: str,
+    current_slot_date: str | None = None
+):
+    mode = mode.upper().strip()
+
+    if mode == "FIRST":
+        return await run_first_async({
+            "coureur_id": coureur_id
+        })
+
+    if mode == "NEXT":
+        return await run_next_async({
+            "coureur_id": coureur_id,
+            "current_slot_date": current_slot_date
+        })
+
+    return {
+        "success": False,
+        "status": "error",
+        "message": f"Mode non implémenté : {mode}",
+        "source": "SCN_SLOT_RESOLVER"
+    }
+
+
+# -------------------------------------------------
+# Lots multi-coureurs (flux nocturnes / Make)
+# items : [{"coureur_id": …, "current_slot_date": …}, …]
+# -------------------------------------------------
+def _mode_error(mode: str) -> dict:
+    return {
+        "success": False,
+        "status": "error",
+        "message": f"Mode non implémenté : {mode}",
+        "source": "SCN_SLOT_RESOLVER"
+    }
+
+
+def run_scn_slot_resolver_batch(items: list, mode: str) -> dict:
+    """
+    Version lot de run_scn_slot_resolver : {coureur_id: résultat}.
+    """
+    mode = mode.upper().strip()
+    ids = [item["coureur_id"] for item in items]
+
+    if mode == "FIRST":
+        slots = planned_slots.load_many(ids)
+        return {cid: _first_of(slots.get(cid, [])) for cid in ids}
+
+    if mode == "NEXT":
+        records = coureurs.load_many(ids)
+        results = {}
+        for item in items:
+            if not item.get("current_slot_date"):
+                # Erreur « current_slot_date manquant », sans appel Airtable
+                results[item["coureur_id"]] = run_next(item)
+                continue
+            found = records.get(item["coureur_id"]) or [None]
+            results[item["coureur_id"]] = _next_from_coureur(found[0], item["current_slot_date"])
+        return results
+
+    return {cid: _mode_error(mode) for cid in ids}
+
+
+async def run_scn_slot_resolver_batch_async(items: list, mode: str) -> dict:
+    """
+    Version asyncio : chaque coureur attend son loader ; les clés du
+    même tour de boucle partent dans une seule requête OR.
+    """
+    mode = mode.upper().strip()
+
+    async def _one(item: dict) -> dict:
+        if mode == "FIRST":
+            return _first_of(await planned_slots_async.load(item["coureur_id"]))
+        if mode == "NEXT":
+            if not item.get("current_slot_date"):
+                return await run_next_async(item)
+            records = await coureurs_async.load(item["coureur_id"])
+            return _next_from_coureur(records[0] if records else None, item["current_slot_date"])
+        return _mode_error(mode)
+
+    results = await asyncio.gather(*(_one(item) for item in items))
+    return {item["coureur_id"]: result for item, result in zip(items, results)}
+
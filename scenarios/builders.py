@@ -5,12 +5,10 @@
 # =============================================================
 
 from typing import Any, Dict, List
-import os
-
-from pyairtable import Table
 
 from services.airtable_fields import ATFIELDS, get_field
 from services.airtable_tables import ATABLES
+from services.reference_data import reference_store
 from core.utils.logger import log_info, log_warning
 
 # -------------------------------------------------------------
@@ -113,36 +111,16 @@ def _load_mapping_phases(distance: str) -> List[Dict[str, Any]]:
     """Récupère les phases dans la table 🛣️ Mapping Phase pour une distance donnée.
 
     On s'appuie uniquement sur les données Airtable, aucune valeur métier
-    n'est codée en dur dans le code.
+    n'est codée en dur dans le code (snapshot du référentiel, rafraîchi
+    en tâche de fond).
     """
 
-    api_key = os.getenv("AIRTABLE_API_KEY")
-    base_id = os.getenv("AIRTABLE_BASE_ID")
-
-    if not api_key or not base_id:
-        log_warning(
-            "Mapping Phase → variables d'environnement Airtable manquantes (API KEY / BASE ID)",
-            module="SCN_1",
-        )
-        return []
-
-    try:
-        table_name = ATABLES.MAPPING_PHASES  # ⚠️ à déclarer dans services/airtable_tables.py
-    except AttributeError:
-        log_warning(
-            "ATABLES.MAPPING_PHASES non défini → aucune phase chargée.",
-            module="SCN_1",
-        )
-        return []
-
-    table = Table(api_key, base_id, table_name)
-
     # Filtre : uniquement les lignes correspondant à la distance (5K, 10K, HM, M…)
-    formula = f"{{Distance}}='{distance}'"
-    log_info(f"Mapping Phase → formula={formula}", module="SCN_1")
+    # Lecture dans le référentiel mémoire (index Distance), sans appel Airtable
+    log_info(f"Mapping Phase → distance={distance}", module="SCN_1")
 
     try:
-        records = table.all(formula=formula)
+        records = reference_store.lookup("mapping_phases", "Distance", distance)
     except Exception as e:
         log_warning(
             f"Erreur lors de la lecture de la table Mapping Phase : {e}",
@@ -4,14 +4,17 @@
 # ==========================================================
 
 import logging
+from starlette.concurrency import run_in_threadpool
+
 from core.utils.logger import log_info
+from core.utils.timings import span
 from core.internal_result import InternalResult
 
 # ➜ Tous tes scénarios fonctionnels sont bien dans agregateur
 from scenarios.agregateur.scn_run import run_scn_run
-from scenarios.agregateur.scn_1 import run_scn_1
+from scenarios.agregateur.scn_1 import run_scn_1, run_scn_1_async
 from scenarios.agregateur.scn_2 import run_scn_2
-from scenarios.agregateur.scn_6 import run_scn_6
+from scenarios.agregateur.scn_6 import run_scn_6, run_scn_6_async
 from scenarios.agregateur.scn_7 import run_scn_7
 
 logger = logging.getLogger("Dispatcher")
@@ -27,6 +30,11 @@ def dispatch_scenario(scn_name: str, record_id: str, payload: dict = None):
     """
     Router principal qui appelle le bon scénario SmartCoach.
     """
+    with span(f"dispatch.{scn_name}"):
+        return _dispatch_scenario(scn_name, record_id, payload)
+
+
+def _dispatch_scenario(scn_name: str, record_id: str, payload: dict = None):
     log_info(f"Dispatcher → Scénario demandé : {scn_name}")
 
     # Construction d’un contexte standard
@@ -105,3 +113,39 @@ def dispatch_scenario(scn_name: str, record_id: str, payload: dict = None):
         message=f"Scénario inconnu : {scn_name}",
         source="dispatcher"
     )
+
+
+async def dispatch_scenario_async(scn_name: str, record_id: str, payload: dict = None):
+    """
+    Pendant asyncio de dispatch_scenario (routes async).
+    SCN_1 / SCN_6 utilisent le client Airtable async ; les autres
+    scénarios (sans I/O ou encore sync) passent par le threadpool.
+    """
+    with span(f"dispatch.{scn_name}"):
+        return await _dispatch_scenario_async(scn_name, record_id, payload)
+
+
+async def _dispatch_scenario_async(scn_name: str, record_id: str, payload: dict = None):
+    log_info(f"Dispatcher async → Scénario demandé : {scn_name}")
+
+    context = SmartCoachContext(
+        scenario=scn_name,
+        record_id=record_id,
+        payload=payload or {}
+    )
+
+    if scn_name == "SCN_1":
+        return await run_scn_1_async(context)
+
+    if scn_name == "SCN_6":
+        return await run_scn_6_async(context)
+
+    if scn_name == "SCN_2" and not context.payload.get("data_scn1"):
+        norm_res = await run_scn_1_async(context)
+
+        if norm_res.status != "ok":
+            return norm_res
+
+        context.payload["data_scn1"] = norm_res.data
+
+    return await run_in_threadpool(_dispatch_scenario, scn_name, record_id, context.payload)
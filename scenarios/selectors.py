@@ -14,6 +14,7 @@ from itertools import combinations
 from services.airtable_fields import ATFIELDS
 from services.airtable_service import AirtableService
 from services.airtable_tables import ATABLES
+from services.reference_data import reference_store
 from scenarios.validators import _compute_phases_for_objectif
 from core.utils.logger import log_info
 
@@ -388,8 +389,8 @@ def apply_phases_and_progression(weeks: List[Dict[str, Any]], phases: List[Dict[
 # STEP6 – Récupération & attribution des modèles de séances
 # ------------------------------------------------------------
 def fetch_seances_types() -> list:
-    service = AirtableService()
-    records = service.list_all(ATABLES.SEANCES_TYPES)
+    # Snapshot mémoire du référentiel (aucun appel Airtable)
+    records = list(reference_store.records("seances_types"))
     log_info(f"STEP6 → {len(records)} séances types chargées", module="SCN_1")
     return records
 
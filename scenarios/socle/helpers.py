@@ -6,6 +6,8 @@
 import datetime
 from typing import List, Optional
 
+from engine.vdot import vdot_engine
+
 # ---------------------------------------------------------------
 # Normalisation du mode
 # ---------------------------------------------------------------
@@ -89,32 +91,15 @@ def _parse_time(text: str) -> int:
 
 
 # ---------------------------------------------------------------
-# Estimation VDOT : version simple (placeholder)
+# Estimation VDOT (tables de Daniels, engine/vdot.py)
 # ---------------------------------------------------------------
 def estimate_vdot(objectif: str, chrono_seconds: int) -> Optional[float]:
     """
-    Fonction placeholder simple.
-    Plus tard, cette fonction sera remplacée par ton vrai algo VDOT.
+    VDOT à partir d'un chrono sur 5K / 10K / HM / M (alias : Semi,
+    Marathon…). None si la distance est inconnue ou le chrono absent.
+    Borné à la plage des tables (20 → 85).
     """
     if not objectif or not chrono_seconds:
         return None
 
-    # Ici une formule très simple juste pour débloquer la pipeline :
-    # → moins le chrono est long, plus le VDOT est élevé
-    base_ref = {
-        "5K": 1500,
-        "10K": 3200,
-        "HM": 7200,
-        "M": 15000
-    }
-
-    objectif_norm = objectif.upper()
-    ref = base_ref.get(objectif_norm)
-
-    if not ref:
-        return None
-
-    # Formule simplifiée (à remplacer plus tard : Daniels)
-    vdot = max(20, min(70, ref / (chrono_seconds / 10)))
-
-    return round(vdot, 1)
+    return vdot_engine.tables.vdot_from_race(objectif, chrono_seconds)
@@ -16,6 +16,21 @@ from core.utils.logger import log_info
 logger = logging.getLogger("SCN_0h")
 ATABLES.SLOTS
 
+def _slot_fields(context, slot: dict) -> dict:
+    """
+    Champs compatibles Airtable pour un slot.
+    """
+    return {
+        "Slot_ID": slot.get("slot_id"),
+        "Semaine": str(slot.get("semaine") or ""),
+        "Jour_nom": slot.get("jour_sem"),
+        "Date_slot": slot.get("date_cible"),
+        "Phase": slot.get("phase"),
+        "Statut": slot.get("status", "planned"),
+        "Coureur_ID": context.record_id,
+    }
+
+
 def run_scn_0h(context, slot: dict):
     """
     SOCLE : écrit un slot dans la table Slots.
@@ -35,31 +50,55 @@ def run_scn_0h(context, slot: dict):
             source="SCN_0h"
         )
 
-    # Champs compatibles Airtable
-    fields = {
-        "Slot_ID": slot_id,
-        "Semaine": str(slot.get("semaine") or ""),
-        "Jour_nom": slot.get("jour_sem"),
-        "Date_slot": slot.get("date_cible"),
-        "Phase": slot.get("phase"),
-        "Statut": slot.get("status", "planned"),
-        "Coureur_ID": context.record_id,
-    }
+    result = run_scn_0h_many(context, [slot])
+    if not result.success:
+        return result
+
+    return InternalResult.ok(
+        message=f"SCN_0h : slot {slot_id} enregistré",
+        data={"slot_id": slot_id, "fields": result.data["fields"][0]},
+        source="SCN_0h"
+    )
+
+
+def run_scn_0h_many(context, slots: list):
+    """
+    SOCLE : écrit N slots dans la table Slots en upsert par lots
+    (10 slots par appel Airtable, clé Slot_ID).
+    Un plan 20 semaines × 4 jours = 8 appels.
+    """
+
+    if not slots:
+        return InternalResult.error(
+            message="SCN_0h : slots manquants",
+            source="SCN_0h"
+        )
+
+    missing = [i for i, slot in enumerate(slots) if not (slot or {}).get("slot_id")]
+    if missing:
+        return InternalResult.error(
+            message=f"SCN_0h : slot_id manquant (index {missing})",
+            source="SCN_0h"
+        )
+
+    rows = [_slot_fields(context, slot) for slot in slots]
 
-    log_info(f"[SCN_0h] Upsert slot {slot_id} → {fields}")
+    log_info(f"[SCN_0h] Upsert de {len(rows)} slot(s)")
 
     try:
-        service = AirtableService()     
-        record = service.upsert_record(
+        service = AirtableService()
+        service.upsert_many(
             ATABLES.SLOTS,      # table_id
-            "Slot_ID",          # key_field (champ Airtable)
-            slot_id,            # key_value
-            fields              # fields
+            ["Slot_ID"],        # key_fields (champ Airtable)
+            rows,               # fields
         )
 
         return InternalResult.ok(
-            message=f"SCN_0h : slot {slot_id} enregistré",
-            data={"slot_id": slot_id, "fields": fields},
+            message=f"SCN_0h : {len(rows)} slot(s) enregistré(s)",
+            data={
+                "slot_ids": [row["Slot_ID"] for row in rows],
+                "fields": rows,
+            },
             source="SCN_0h"
         )
 
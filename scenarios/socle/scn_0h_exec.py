@@ -5,7 +5,9 @@
 # ⚠️ Ne pas utiliser pour la persistance STRUCTURE (planning)
 
 from datetime import datetime
-from services.airtable_service import upsert_record, get_record_by_id
+from services.airtable_outbox import airtable_outbox
+from services.airtable_service import AirtableService
+from services.airtable_tables import ATABLES
 
 SCN_NAME = "SCN_0h_exec"
 
@@ -33,7 +35,7 @@ def run_scn_0h_exec(payload: dict) -> dict:
             timestamp = datetime.utcnow().isoformat()
 
         # 2️⃣ Charger le slot existant
-        record = get_record_by_id(table="Slots", record_id=slot_id)
+        record = AirtableService().get_record(ATABLES.SLOTS, slot_id)
         if not record:
             return _error(f"Slot introuvable : {slot_id}")
 
@@ -59,12 +61,8 @@ def run_scn_0h_exec(payload: dict) -> dict:
             "seance_id": f"SEANCE_{slot_id}",
         }
 
-        # 5️⃣ Upsert (update uniquement)
-        upsert_record(
-            table="Slots",
-            record_id=slot_id,
-            fields=update_fields,
-        )
+        # 5️⃣ Update différé (outbox) : acquitté tout de suite, envoyé en fond
+        outbox_id = airtable_outbox.update(ATABLES.SLOTS, slot_id, update_fields)
 
         # 6️⃣ Retour standardisé
         return {
@@ -73,6 +71,7 @@ def run_scn_0h_exec(payload: dict) -> dict:
             "data": {
                 "slot_id": slot_id,
                 "timestamp": timestamp,
+                "outbox_id": outbox_id,
             },
             "source": SCN_NAME,
         }
@@ -0,0 +1,481 @@
+# services/airtable_async.py
+# =====================================================
+# Client Airtable asyncio (httpx)
+# - même surface que AirtableService (get_record, list_records,
+#   upsert_record, upsert_many, update_record_by_id…)
+# - 1 httpx.AsyncClient keep-alive par (api_key, boucle d'événements)
+# - même ordonnanceur (rate limit) et même cache que le client sync
+#
+# Les routes async l'utilisent pour ne jamais bloquer la boucle :
+# un worker uvicorn sert alors des centaines de requêtes concurrentes.
+# =====================================================
+
+import asyncio
+import contextvars
+import time
+from typing import Dict, Optional, Tuple
+
+import httpx
+from pyairtable.api.params import options_to_params
+
+from core.config import config
+from core.utils.logger import log_info, log_error
+from services.airtable_breaker import CircuitOpenError
+from services.airtable_cache import FRESH, REVALIDATE, key_index, last_known_good, record_cache
+from services.airtable_client import registry
+from services.airtable_io import (
+    IOBudgetExceeded,
+    check_budget,
+    fallback_allowed,
+    operation_for,
+    record_call,
+    record_hit,
+)
+from services.airtable_mirror import airtable_mirror
+from services.airtable_scheduler import (
+    IDEMPOTENT_METHODS,
+    RETRYABLE_5XX,
+    AirtableScheduler,
+)
+from services.airtable_query import to_formula
+from services.airtable_service import answer_locally, stale_query, stale_record
+from services.airtable_singleflight import query_key, single_flight
+
+
+# ---------------------------------------------------------
+# Clients HTTP partagés
+# ---------------------------------------------------------
+# Un AsyncClient est lié à la boucle qui a ouvert ses connexions
+_CLIENTS: Dict[Tuple[str, int], Tuple[asyncio.AbstractEventLoop, httpx.AsyncClient]] = {}
+
+
+def _client(api_key: str) -> httpx.AsyncClient:
+    loop = asyncio.get_running_loop()
+    key = (api_key, id(loop))
+
+    entry = _CLIENTS.get(key)
+    if entry is not None and entry[0] is loop and not entry[1].is_closed:
+        return entry[1]
+
+    client = httpx.AsyncClient(
+        headers={"Authorization": f"Bearer {api_key}"},
+        limits=httpx.Limits(
+            max_connections=config.airtable_pool_size,
+            max_keepalive_connections=config.airtable_pool_size,
+        ),
+        timeout=httpx.Timeout(config.airtable_timeout_s, connect=min(5, config.airtable_timeout_s)),
+    )
+    _CLIENTS[key] = (loop, client)
+    return client
+
+
+# Rafraîchissements SWR en cours (référence forte jusqu'à leur fin)
+_BACKGROUND: set = set()
+
+
+async def aclose_clients() -> None:
+    """
+    Ferme les clients de la boucle courante (arrêt de l'API).
+    """
+    loop = asyncio.get_running_loop()
+    for key, (client_loop, client) in list(_CLIENTS.items()):
+        if client_loop is loop:
+            await client.aclose()
+            _CLIENTS.pop(key, None)
+
+
+class AsyncAirtableService:
+    """
+    Service Airtable asyncio — pendant de AirtableService.
+    """
+
+    # Cache borné partagé avec le client sync
+    _RECORD_CACHE = record_cache
+
+    # Limite Airtable : 10 records par requête d'écriture
+    BATCH_SIZE = 10
+
+    def __init__(self):
+        self.api_key = config.api_key
+        self.base_id = config.base_id
+
+        if not self.api_key:
+            raise RuntimeError("API KEY is missing")
+
+        if not self.base_id:
+            raise RuntimeError(f"BASE_ID is missing for ENV={config.env}")
+
+    # ---------------------------------------------------------
+    # Transport : ordonnanceur + retries 429 / 5xx
+    # ---------------------------------------------------------
+    def _scheduler(self) -> AirtableScheduler:
+        return registry.scheduler(base_id=self.base_id, api_key=self.api_key)
+
+    def _url(self, table_id: str, record_id: Optional[str] = None) -> str:
+        url = f"{config.airtable_endpoint_url}/v0/{self.base_id}/{table_id}"
+        return f"{url}/{record_id}" if record_id else url
+
+    async def _request(self, method: str, table_id: str, record_id: Optional[str] = None, **kwargs) -> dict:
+        scheduler = self._scheduler()
+        client = _client(self.api_key)
+        url = self._url(table_id, record_id)
+        operation = operation_for(method, record_id is not None, "performUpsert" in (kwargs.get("json") or {}))
+        attempt = 0
+        wait_s = 0.0
+        duration_s = 0.0
+
+        check_budget(table_id, operation)
+        breaker = registry.breaker(base_id=self.base_id, api_key=self.api_key)
+        breaker.before_call()
+
+        while True:
+            wait_s += await scheduler.acquire_async(table_id)
+
+            started = time.monotonic()
+            try:
+                response = await client.request(method, url, **kwargs)
+            except httpx.TransportError as e:
+                duration_s += time.monotonic() - started
+                if attempt >= scheduler.max_retries or method not in IDEMPOTENT_METHODS or breaker.is_open:
+                    breaker.record_failure(e)
+                    raise
+                attempt += 1
+                scheduler.count("retries")
+                await asyncio.sleep(scheduler.backoff(attempt))
+                continue
+
+            duration_s += time.monotonic() - started
+            status = response.status_code
+
+            if status == 429 and attempt < scheduler.max_retries:
+                retry_after = _retry_after(response)
+                scheduler.penalize(retry_after)
+                log_error(
+                    f"429 Airtable sur '{table_id}' → base gelée "
+                    f"{retry_after if retry_after is not None else scheduler.penalty_s}s",
+                    module="AsyncAirtableService",
+                )
+                attempt += 1
+                scheduler.count("retries")
+                await asyncio.sleep(scheduler.backoff(attempt) / 4)
+                continue
+
+            if (
+                status in RETRYABLE_5XX
+                and method in IDEMPOTENT_METHODS
+                and attempt < scheduler.max_retries
+                and not breaker.is_open
+            ):
+                scheduler.count("server_errors")
+                attempt += 1
+                scheduler.count("retries")
+                await asyncio.sleep(scheduler.backoff(attempt))
+                continue
+
+            # 429 encore présent après tous les retries : échec, pas un succès
+            if status >= 500 or status == 429:
+                breaker.record_failure(f"HTTP {status}")
+            else:
+                breaker.record_success()
+
+            response.raise_for_status()
+            record_call(
+                table_id,
+                operation,
+                bytes_out=len(response.request.content or b""),
+                bytes_in=len(response.content),
+                wait_s=wait_s,
+                duration_s=duration_s,
+                retries=attempt,
+            )
+            return response.json()
+
+    # ---------------------------------------------------------
+    # Lecture
+    # ---------------------------------------------------------
+    async def get_record(self, table_id: str, record_id: str):
+        cached, state = self._RECORD_CACHE.lookup(table_id, record_id)
+        if state == FRESH:
+            record_hit("cache")
+            return cached
+
+        mirrored = airtable_mirror.get(table_id, record_id)
+        if mirrored is not None:
+            record_hit("mirror")
+            return mirrored
+
+        # Expiré depuis peu : servi tel quel, rafraîchi en fond
+        if state == REVALIDATE:
+            record_hit("swr")
+            self._revalidate_record(table_id, record_id)
+            return cached
+
+        if fallback_allowed():
+            stale = stale_record(table_id, record_id)
+            if stale is not None:
+                return stale
+
+        try:
+            record = await single_flight.do_async(
+                query_key("record", self.base_id, table_id, record_id=record_id),
+                lambda: self._request("GET", table_id, record_id),
+            )
+            self._RECORD_CACHE.set(table_id, record_id, record)
+            return record
+
+        except IOBudgetExceeded:
+            raise
+        except Exception as e:
+            # Airtable lent / indisponible : dernière donnée connue
+            stale = stale_record(table_id, record_id)
+            if stale is not None:
+                log_error(
+                    f"[AsyncAirtableService] Airtable indisponible → {table_id}/{record_id} périmé servi : {e}",
+                    module="AsyncAirtableService"
+                )
+                return stale
+            log_error(
+                f"[AsyncAirtableService] Erreur get_record sur {table_id}/{record_id} : {e}",
+                module="AsyncAirtableService"
+            )
+            return None
+
+    def _revalidate_record(self, table_id: str, record_id: str) -> None:
+        if not self._RECORD_CACHE.begin_revalidate(table_id, record_id):
+            return
+
+        async def _refresh():
+            try:
+                record = await single_flight.do_async(
+                    query_key("record", self.base_id, table_id, record_id=record_id),
+                    lambda: self._request("GET", table_id, record_id),
+                )
+                self._RECORD_CACHE.set(table_id, record_id, record)
+            except CircuitOpenError:
+                pass
+            except Exception as e:
+                log_error(
+                    f"Rafraîchissement en fond de {table_id}/{record_id} en échec : {e}",
+                    module="AsyncAirtableService",
+                )
+            finally:
+                self._RECORD_CACHE.end_revalidate(table_id, record_id)
+
+        # Contexte vierge : l'appel n'est pas compté dans le budget de la requête
+        task = asyncio.get_running_loop().create_task(_refresh(), context=contextvars.Context())
+        _BACKGROUND.add(task)
+        task.add_done_callback(_BACKGROUND.discard)
+
+    async def list_all(self, table_id: str, **options) -> list:
+        return await self.list_records(table_id, **options)
+
+    async def find_all(self, table_id: str, formula: str, **options) -> list:
+        return await self.list_records(table_id, filter_by_formula=formula, **options)
+
+    async def fetch_all(self, table_id: str) -> list:
+        return await self.list_records(table_id)
+
+    async def list_records(
+        self,
+        table_id: str,
+        filter_by_formula=None,
+        fields: list | None = None,
+        sort: list | None = None,
+        max_records: int | None = None,
+        page_size: int | None = None,
+    ) -> list:
+        """
+        Tous les records d'une table (pagination par offset),
+        filtrés par formule (texte ou Query) si fournie. Mêmes options
+        que AirtableService.list_records (fields, sort, max_records, page_size).
+        """
+        local = answer_locally(table_id, filter_by_formula, fields=fields, sort=sort, max_records=max_records)
+        if local is not None:
+            return local
+        filter_by_formula = to_formula(filter_by_formula)
+
+        if not filter_by_formula:
+            mirrored = airtable_mirror.all(table_id, fields=fields, sort=sort, max_records=max_records)
+            if mirrored is not None:
+                record_hit("mirror")
+                return mirrored
+
+        options = {
+            "formula": filter_by_formula,
+            "fields": fields,
+            "sort": sort,
+            "max_records": max_records,
+            "page_size": page_size,
+        }
+        options = {k: v for k, v in options.items() if v is not None}
+        # Même encodage des paramètres que pyairtable (fields[], sort[i][…])
+        params = options_to_params(options)
+
+        key = query_key("query", self.base_id, table_id, **options)
+        try:
+            records = await single_flight.do_async(key, lambda: self._paginate(table_id, params))
+        except IOBudgetExceeded:
+            raise
+        except Exception as e:
+            # Airtable lent / indisponible : dernier résultat connu
+            stale = stale_query(table_id, key)
+            if stale is not None:
+                log_error(
+                    f"Airtable indisponible sur '{table_id}' → {len(stale)} records périmés servis : {e}",
+                    module="AsyncAirtableService"
+                )
+                return stale
+            log_error(
+                f"Erreur Airtable list_records() sur '{table_id}' : {e}",
+                module="AsyncAirtableService"
+            )
+            return []
+
+        last_known_good.set(table_id, key, records)
+        if not filter_by_formula and not fields and not max_records:
+            key_index.store(table_id, records)
+
+        log_info(
+            f"AsyncAirtableService → {len(records)} records lus depuis '{table_id}'",
+            module="AsyncAirtableService"
+        )
+        return records
+
+    async def _paginate(self, table_id: str, params: dict) -> list:
+        return [record async for record in self._iterate(table_id, params)]
+
+    async def _iterate(self, table_id: str, params: dict):
+        params = dict(params)
+        while True:
+            data = await self._request("GET", table_id, params=params)
+            for record in data.get("records", []):
+                yield record
+
+            offset = data.get("offset")
+            if not offset:
+                return
+            params["offset"] = offset
+
+    async def iterate_records(
+        self,
+        table_id: str,
+        formula: str | None = None,
+        fields: list | None = None,
+        sort: list | None = None,
+        page_size: int | None = None,
+        max_records: int | None = None,
+    ):
+        """
+        Générateur async : records page par page (mémoire bornée à une page).
+        `async for … : break` arrête les appels Airtable.
+        """
+        options = {
+            "formula": to_formula(formula),
+            "fields": fields,
+            "sort": sort,
+            "page_size": page_size,
+            "max_records": max_records,
+        }
+        params = options_to_params({k: v for k, v in options.items() if v is not None})
+        async for record in self._iterate(table_id, params):
+            yield record
+
+    def get_session_types(self):
+        from services.reference_data import reference_store
+        return list(reference_store.records("seances_types"))
+
+    # ---------------------------------------------------------
+    # Écriture
+    # ---------------------------------------------------------
+    async def update_record_by_id(self, table_id: str, record_id: str, fields: dict):
+        try:
+            log_info(
+                f"[AsyncAirtableService] Update by ID → {table_id}/{record_id}",
+                module="AsyncAirtableService"
+            )
+            record = await self._request("PATCH", table_id, record_id, json={"fields": fields})
+            self._RECORD_CACHE.invalidate(table_id, record_id)
+            airtable_mirror.apply(table_id, [record])
+            key_index.invalidate(table_id)
+            return record
+
+        except Exception as e:
+            log_error(
+                f"[AsyncAirtableService] Erreur update_record_by_id sur {table_id}/{record_id} : {e}",
+                module="AsyncAirtableService"
+            )
+            raise
+
+    async def upsert_record(self, table_id: str, key_field: str, key_value: str, fields: dict):
+        try:
+            row = {**fields, key_field: key_value}
+            result = await self.upsert_many(table_id, [key_field], [row])
+
+            action = "Create" if result["createdRecords"] else "Update"
+            log_info(f"[Airtable UPSERT] {action} → {table_id} ({key_field}={key_value})")
+            return result["records"][0]
+
+        except Exception as e:
+            log_error(f"[Airtable UPSERT] Erreur sur {table_id} : {e}")
+            raise
+
+    async def upsert_many(self, table_id: str, key_fields: list, rows: list) -> dict:
+        """
+        Upsert natif (performUpsert) par lots de 10, lots envoyés en parallèle.
+        Même contrat que AirtableService.upsert_many.
+        """
+        result = {"records": [], "createdRecords": [], "updatedRecords": []}
+        if not rows:
+            return result
+
+        for row in rows:
+            missing = [k for k in key_fields if row.get(k) in (None, "")]
+            if missing:
+                raise ValueError(f"upsert_many : clé(s) {missing} manquante(s) dans {row}")
+
+        chunks = [
+            rows[i:i + self.BATCH_SIZE]
+            for i in range(0, len(rows), self.BATCH_SIZE)
+        ]
+        semaphore = asyncio.Semaphore(max(1, config.airtable_batch_concurrency))
+
+        async def _send(chunk):
+            async with semaphore:
+                return await self._request(
+                    "PATCH",
+                    table_id,
+                    json={
+                        "records": [{"fields": row} for row in chunk],
+                        "performUpsert": {"fieldsToMergeOn": list(key_fields)},
+                        "typecast": False,
+                    },
+                )
+
+        responses = await asyncio.gather(*(_send(chunk) for chunk in chunks))
+
+        for response in responses:
+            result["records"].extend(response["records"])
+            result["createdRecords"].extend(response.get("createdRecords", []))
+            result["updatedRecords"].extend(response.get("updatedRecords", []))
+
+        for record in result["records"]:
+            self._RECORD_CACHE.invalidate(table_id, record["id"])
+        airtable_mirror.apply(table_id, result["records"])
+        key_index.invalidate(table_id)
+
+        log_info(
+            f"[Airtable UPSERT_MANY] {table_id} → {len(rows)} lignes, {len(chunks)} appel(s) "
+            f"(created={len(result['createdRecords'])}, updated={len(result['updatedRecords'])})",
+            module="AsyncAirtableService",
+        )
+        return result
+
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
@@ -0,0 +1,165 @@
+# services/airtable_breaker.py
+# =====================================================
+# Disjoncteur (circuit breaker) Airtable, 1 par base
+# - FERMÉ : appels normaux, échecs consécutifs comptés
+#   (erreur réseau / timeout / 5xx après retries)
+# - OUVERT après N échecs : appels refusés immédiatement
+#   (CircuitOpenError) → les services servent la dernière
+#   donnée connue, marquée périmée
+# - SEMI-OUVERT : une sonde (tâche de fond ou 1er appel après
+#   le délai) ; succès → FERMÉ, échec → OUVERT à nouveau
+# =====================================================
+
+import threading
+import time
+from typing import Callable, Optional
+
+from core.utils.logger import log_info, log_error
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """
+    Airtable indisponible (disjoncteur ouvert) : appel non effectué.
+    """
+
+
+class CircuitBreaker:
+    """
+    Disjoncteur thread-safe (threads du client sync et boucle asyncio).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30,
+        probe: Optional[Callable[[], object]] = None,
+    ):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.probe = probe
+
+        self._lock = threading.Lock()
+        self.state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._probe_started = 0.0
+        self._probe_timer: Optional[threading.Timer] = None
+
+        self.opened = 0
+        self.rejected = 0
+        self.probes = 0
+        self.last_error: Optional[str] = None
+
+    # ---------------------------------------------------------
+    # Avant / après chaque appel Airtable
+    # ---------------------------------------------------------
+    def before_call(self) -> None:
+        """
+        Lève CircuitOpenError si l'appel ne doit pas partir.
+        En SEMI-OUVERT, un seul appel (la sonde) passe à la fois.
+        """
+        with self._lock:
+            if self.state == CLOSED:
+                return
+
+            now = time.monotonic()
+            if self.state == OPEN and now - self._opened_at >= self.reset_timeout:
+                self.state = HALF_OPEN
+
+            # Sonde perdue (appel annulé sans résultat) : une autre peut partir
+            probe_lost = now - self._probe_started >= self.reset_timeout
+            if self.state == HALF_OPEN and (not self._probe_in_flight or probe_lost):
+                self._probe_in_flight = True
+                self._probe_started = now
+                self.probes += 1
+                return
+
+            self.rejected += 1
+            raise CircuitOpenError(f"Airtable indisponible (disjoncteur ouvert, base {self.name})")
+
+    def record_success(self) -> None:
+        with self._lock:
+            recovered = self.state != CLOSED
+            self.state = CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+        if recovered:
+            log_info(f"Airtable rétabli → disjoncteur fermé (base {self.name})", module="CircuitBreaker")
+
+    def record_failure(self, error: object = None) -> None:
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            self.last_error = str(error) if error is not None else self.last_error
+
+            if self.state == CLOSED and self._failures < self.failure_threshold:
+                return
+
+            reopened = self.state == CLOSED
+            self.state = OPEN
+            self._opened_at = time.monotonic()
+            if reopened:
+                self.opened += 1
+            self._schedule_probe()
+
+        if reopened:
+            log_error(
+                f"Airtable en échec ({self._failures} erreurs) → disjoncteur ouvert "
+                f"{self.reset_timeout}s (base {self.name}) : {self.last_error}",
+                module="CircuitBreaker",
+            )
+
+    # ---------------------------------------------------------
+    # Sonde de rétablissement (tâche de fond)
+    # ---------------------------------------------------------
+    def _schedule_probe(self) -> None:
+        # Appelé sous verrou
+        if self.probe is None or (self._probe_timer is not None and self._probe_timer.is_alive()):
+            return
+        timer = threading.Timer(self.reset_timeout, self._run_probe)
+        timer.daemon = True
+        timer.start()
+        self._probe_timer = timer
+
+    def _run_probe(self) -> None:
+        self._probe_timer = None
+        if self.state == CLOSED:
+            return
+        try:
+            # Passe par le transport : before_call / record_* s'appliquent
+            self.probe()
+        except CircuitOpenError:
+            # Une requête réelle sonde déjà : on retente plus tard
+            with self._lock:
+                self._schedule_probe()
+        except Exception as e:
+            log_error(f"Sonde Airtable en échec (base {self.name}) : {e}", module="CircuitBreaker")
+
+    # ---------------------------------------------------------
+    # Observabilité
+    # ---------------------------------------------------------
+    @property
+    def is_open(self) -> bool:
+        return self.state != CLOSED
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self._failures,
+                "failure_threshold": self.failure_threshold,
+                "reset_timeout_s": self.reset_timeout,
+                "open_for_s": round(time.monotonic() - self._opened_at, 1) if self.state != CLOSED else 0.0,
+                "opened": self.opened,
+                "rejected": self.rejected,
+                "probes": self.probes,
+                "last_error": self.last_error,
+            }
@@ -0,0 +1,264 @@
+# services/airtable_cache.py
+# =====================================================
+# Cache mémoire des records Airtable
+# - TTL par table
+# - plafond en nombre d'entrées ET en taille (éviction LRU)
+# - invalidation explicite sur chaque écriture
+# - après expiration : stale-while-revalidate (servi + rafraîchi
+#   en fond), puis conservé comme dernière donnée connue
+#   (servie si Airtable est indisponible)
+# - compteurs hits / misses / evictions
+# =====================================================
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from core.config import config
+from services.airtable_query import KeyIndex
+from services.airtable_tables import ATABLES
+
+
+# TTL (secondes) par table.
+# Données coureur / slots : courtes (réécrites par SCN_1 / SCN_6).
+# Tables de référence : longues (modifiées rarement).
+DEFAULT_TABLE_TTLS = {
+    ATABLES.COU_TABLE_ID: 30,
+    ATABLES.REF_SLOTS_ID: 15,
+    ATABLES.SEANCES_TABLE_ID: 30,
+    ATABLES.SEANCES_TYPES_ID: 3600,
+    ATABLES.VDOT_TABLE_ID: 3600,
+    ATABLES.REF_JOURS_ID: 3600,
+    ATABLES.MAPPING_PHASES_ID: 3600,
+    ATABLES.REF_CATEGORIES_SEANCES_ID: 3600,
+    ATABLES.REF_NIVEAUX_ID: 3600,
+    ATABLES.REF_PARAM_PHASES_ID: 3600,
+}
+
+
+# États d'une entrée (lookup)
+MISS = "miss"
+FRESH = "fresh"
+REVALIDATE = "revalidate"
+STALE = "stale"
+
+
+def _estimate_size(value: Any) -> int:
+    """
+    Taille approximative (octets) d'un record Airtable.
+    Suffisant pour borner la mémoire, pas pour la mesurer.
+    """
+    return len(repr(value))
+
+
+class RecordCache:
+    """
+    Cache LRU thread-safe, clé = (table_id, record_id).
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 2000,
+        max_bytes: int = 20_000_000,
+        default_ttl: float = 60,
+        table_ttls: Optional[Dict[str, float]] = None,
+        swr_ttl: float = 0,
+        stale_ttl: float = 0,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.table_ttls = {k: v for k, v in (table_ttls or {}).items() if k}
+        # Fenêtres après expiration : SWR ⊂ conservation (stale_ttl)
+        self.stale_ttl = max(stale_ttl, swr_ttl)
+        self.swr_ttl = swr_ttl
+
+        self._lock = threading.Lock()
+        # clé → (expires_at, size, value)
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._bytes = 0
+        self._revalidating: set = set()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.revalidations = 0
+        self.stale_hits = 0
+
+    # ---------------------------------------------------------
+    # Lecture / écriture
+    # ---------------------------------------------------------
+    def ttl_for(self, table_id: str) -> float:
+        return self.table_ttls.get(table_id, self.default_ttl)
+
+    def get(self, table_id: str, record_id: str) -> Optional[Any]:
+        value, state = self.lookup(table_id, record_id)
+        return value if state == FRESH else None
+
+    def get_stale(self, table_id: str, record_id: str) -> Optional[Any]:
+        """
+        Dernière donnée connue, même expirée (Airtable indisponible,
+        budget épuisé). None si rien n'est conservé.
+        """
+        value, state = self.lookup(table_id, record_id)
+        if state == MISS:
+            return None
+        with self._lock:
+            self.stale_hits += 1
+        return value
+
+    def lookup(self, table_id: str, record_id: str) -> Tuple[Optional[Any], str]:
+        """
+        (valeur, état) : FRESH, REVALIDATE (expirée mais servable,
+        à rafraîchir en fond), STALE (dernière donnée connue) ou MISS.
+        """
+        key = (table_id, record_id)
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None, MISS
+
+            expires_at, size, value = entry
+            if expires_at + self.stale_ttl <= now:
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None, MISS
+
+            self._entries.move_to_end(key)
+            if expires_at > now:
+                self.hits += 1
+                return value, FRESH
+
+            self.misses += 1
+            if expires_at + self.swr_ttl > now:
+                return value, REVALIDATE
+            return value, STALE
+
+    def set(self, table_id: str, record_id: str, value: Any) -> None:
+        ttl = self.ttl_for(table_id)
+        if ttl <= 0 and self.stale_ttl <= 0:
+            return
+
+        key = (table_id, record_id)
+        size = _estimate_size(value)
+
+        # Un record plus gros que tout le cache n'est jamais conservé
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = (time.monotonic() + max(ttl, 0), size, value)
+            self._bytes += size
+            self._evict()
+
+    # ---------------------------------------------------------
+    # Stale-while-revalidate : 1 rafraîchissement en fond par clé
+    # ---------------------------------------------------------
+    def begin_revalidate(self, table_id: str, record_id: str) -> bool:
+        key = (table_id, record_id)
+        with self._lock:
+            if key in self._revalidating:
+                return False
+            self._revalidating.add(key)
+            self.revalidations += 1
+            return True
+
+    def end_revalidate(self, table_id: str, record_id: str) -> None:
+        with self._lock:
+            self._revalidating.discard((table_id, record_id))
+
+    # ---------------------------------------------------------
+    # Invalidation (chemins d'écriture)
+    # ---------------------------------------------------------
+    def invalidate(self, table_id: str, record_id: Optional[str] = None) -> int:
+        """
+        Supprime un record, ou toute la table si record_id est None.
+        Retourne le nombre d'entrées supprimées.
+        """
+        with self._lock:
+            if record_id is not None:
+                keys = [(table_id, record_id)] if (table_id, record_id) in self._entries else []
+            else:
+                keys = [k for k in self._entries if k[0] == table_id]
+
+            for key in keys:
+                self._remove(key)
+
+            self.invalidations += len(keys)
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    # ---------------------------------------------------------
+    # Internes (appelés sous verrou)
+    # ---------------------------------------------------------
+    def _remove(self, key: tuple) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def _evict(self) -> None:
+        while self._entries and (
+            len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+        ):
+            key = next(iter(self._entries))
+            self._remove(key)
+            self.evictions += 1
+
+    # ---------------------------------------------------------
+    # Observabilité
+    # ---------------------------------------------------------
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+                "swr_ttl_s": self.swr_ttl,
+                "stale_ttl_s": self.stale_ttl,
+                "revalidations": self.revalidations,
+                "stale_hits": self.stale_hits,
+            }
+
+
+# Instance unique pour tout le process
+record_cache = RecordCache(
+    max_entries=config.airtable_cache_max_entries,
+    max_bytes=config.airtable_cache_max_bytes,
+    default_ttl=config.airtable_cache_ttl,
+    table_ttls=DEFAULT_TABLE_TTLS,
+    swr_ttl=config.airtable_cache_swr_s,
+    stale_ttl=config.airtable_cache_stale_s,
+)
+
+# Index d'égalité des tables lues en entier (même TTL que les records)
+key_index = KeyIndex(ttl_for=record_cache.ttl_for)
+
+# Dernier résultat connu des requêtes de liste (clé = query_key) :
+# jamais servi frais, uniquement si Airtable est indisponible
+last_known_good = RecordCache(
+    max_entries=config.airtable_lkg_max_entries,
+    max_bytes=config.airtable_cache_max_bytes,
+    default_ttl=0,
+    stale_ttl=config.airtable_cache_stale_s,
+)
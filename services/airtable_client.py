@@ -0,0 +1,214 @@
+# services/airtable_client.py
+# =====================================================
+# Registre process-wide des clients Airtable
+# - 1 pyairtable.Api (= 1 requests.Session keep-alive) par base
+# - handles Table réutilisés par (base, table)
+# - stats : taille du pool et ratio de réutilisation des connexions
+# - chaque session passe par l'ordonnanceur de sa base (rate limit)
+#   et par son disjoncteur (Airtable indisponible → échec immédiat)
+# =====================================================
+
+import threading
+from typing import Dict, Optional, Tuple
+
+from pyairtable import Api
+from pyairtable.api.table import Table
+
+from core.config import config
+from core.utils.logger import log_info
+from services.airtable_breaker import CircuitBreaker
+from services.airtable_scheduler import AirtableScheduler, ScheduledHTTPAdapter
+from services.airtable_tables import ATABLES
+
+
+class AirtableClientRegistry:
+    """
+    Registre thread-safe des connexions Airtable.
+
+    Chaque couple (api_key, base_id) possède sa propre session HTTP
+    avec un pool de connexions keep-alive : les appels successifs
+    réutilisent les connexions TLS déjà ouvertes.
+    """
+
+    def __init__(self, pool_size: int = 10):
+        self.pool_size = pool_size
+        self._lock = threading.Lock()
+        self._apis: Dict[Tuple[str, str], Api] = {}
+        self._schedulers: Dict[Tuple[str, str], AirtableScheduler] = {}
+        self._breakers: Dict[Tuple[str, str], CircuitBreaker] = {}
+        self._tables: Dict[Tuple[str, str, str], Table] = {}
+
+    # ---------------------------------------------------------
+    # Construction d'un client (1 par base)
+    # ---------------------------------------------------------
+    def _build_api(self, api_key: str, base_id: str) -> Api:
+        # Les retries sont gérés par l'ordonnanceur (429 / 5xx), pas par urllib3
+        # Timeout borné : un Airtable lent ne bloque pas la requête jusqu'au timeout client
+        api = Api(
+            api_key,
+            timeout=(min(5, config.airtable_timeout_s), config.airtable_timeout_s),
+            retry_strategy=None,
+            endpoint_url=config.airtable_endpoint_url,
+        )
+
+        scheduler = AirtableScheduler(
+            rate=config.airtable_rate_limit_rps,
+            burst=config.airtable_rate_burst,
+            max_retries=config.airtable_max_retries,
+            penalty_s=config.airtable_429_penalty_s,
+        )
+        self._schedulers[(api_key, base_id)] = scheduler
+
+        # Sonde de rétablissement : lecture d'1 record Coureur
+        probe_table = ATABLES.COU_TABLE_ID
+        breaker = CircuitBreaker(
+            name=base_id,
+            failure_threshold=config.airtable_breaker_failures,
+            reset_timeout=config.airtable_breaker_reset_s,
+            probe=(lambda: api.table(base_id, probe_table).first()) if probe_table else None,
+        )
+        self._breakers[(api_key, base_id)] = breaker
+
+        adapter = ScheduledHTTPAdapter(
+            scheduler,
+            breaker,
+            pool_connections=1,
+            pool_maxsize=self.pool_size,
+        )
+        api.session.mount("https://", adapter)
+        api.session.mount("http://", adapter)
+
+        log_info(
+            f"Nouveau client Airtable → base={base_id} (pool={self.pool_size})",
+            module="AirtableClientRegistry",
+        )
+        return api
+
+    def api(self, base_id: Optional[str] = None, api_key: Optional[str] = None) -> Api:
+        """
+        Retourne le client partagé de la base (créé au premier appel).
+        """
+        api_key = api_key or config.api_key
+        base_id = base_id or config.base_id
+        key = (api_key, base_id)
+
+        api = self._apis.get(key)
+        if api is not None:
+            return api
+
+        with self._lock:
+            api = self._apis.get(key)
+            if api is None:
+                api = self._build_api(api_key, base_id)
+                self._apis[key] = api
+            return api
+
+    def table(
+        self,
+        table_id: str,
+        base_id: Optional[str] = None,
+        api_key: Optional[str] = None,
+    ) -> Table:
+        """
+        Retourne un handle Table partagé (même session que sa base).
+        """
+        api_key = api_key or config.api_key
+        base_id = base_id or config.base_id
+        key = (api_key, base_id, table_id)
+
+        table = self._tables.get(key)
+        if table is not None:
+            return table
+
+        api = self.api(base_id=base_id, api_key=api_key)
+        with self._lock:
+            table = self._tables.get(key)
+            if table is None:
+                table = api.table(base_id, table_id)
+                self._tables[key] = table
+            return table
+
+    def scheduler(self, base_id: Optional[str] = None, api_key: Optional[str] = None) -> AirtableScheduler:
+        """
+        Ordonnanceur (token bucket) de la base.
+        """
+        api_key = api_key or config.api_key
+        base_id = base_id or config.base_id
+        self.api(base_id=base_id, api_key=api_key)
+        return self._schedulers[(api_key, base_id)]
+
+    def breaker(self, base_id: Optional[str] = None, api_key: Optional[str] = None) -> CircuitBreaker:
+        """
+        Disjoncteur de la base (partagé par les clients sync et async).
+        """
+        api_key = api_key or config.api_key
+        base_id = base_id or config.base_id
+        self.api(base_id=base_id, api_key=api_key)
+        return self._breakers[(api_key, base_id)]
+
+    # ---------------------------------------------------------
+    # Observabilité
+    # ---------------------------------------------------------
+    def scheduler_stats(self) -> dict:
+        with self._lock:
+            items = list(self._schedulers.items())
+        return {base_id: scheduler.stats() for (_, base_id), scheduler in items}
+
+    def breaker_stats(self) -> dict:
+        with self._lock:
+            items = list(self._breakers.items())
+        return {base_id: breaker.stats() for (_, base_id), breaker in items}
+
+    def stats(self) -> dict:
+        """
+        Retourne, par base, le nombre de connexions ouvertes,
+        le nombre de requêtes servies et le ratio de réutilisation.
+        """
+        with self._lock:
+            items = list(self._apis.items())
+            nb_tables = len(self._tables)
+
+        bases = {}
+        total_requests = 0
+        total_connections = 0
+
+        for (_, base_id), api in items:
+            requests_count = 0
+            connections_count = 0
+
+            for adapter in api.session.adapters.values():
+                pools = adapter.poolmanager.pools
+                for pool_key in list(pools.keys()):
+                    pool = pools.get(pool_key)
+                    if pool is None:
+                        continue
+                    requests_count += pool.num_requests
+                    connections_count += pool.num_connections
+
+            bases[base_id] = {
+                "pool_size": self.pool_size,
+                "requests": requests_count,
+                "connections_opened": connections_count,
+                "reuse_ratio": _reuse_ratio(requests_count, connections_count),
+            }
+            total_requests += requests_count
+            total_connections += connections_count
+
+        return {
+            "pool_size": self.pool_size,
+            "bases": bases,
+            "tables": nb_tables,
+            "requests": total_requests,
+            "connections_opened": total_connections,
+            "reuse_ratio": _reuse_ratio(total_requests, total_connections),
+        }
+
+
+def _reuse_ratio(requests_count: int, connections_count: int) -> float:
+    if not requests_count:
+        return 0.0
+    return round(max(0, requests_count - connections_count) / requests_count, 3)
+
+
+# Instance unique pour tout le process
+registry = AirtableClientRegistry(pool_size=config.airtable_pool_size)
@@ -0,0 +1,242 @@
+# services/airtable_io.py
+# =====================================================
+# Comptabilité des appels Airtable PAR REQUÊTE
+# - nb d'appels par table et par opération, octets, attente, durée
+# - lectures évitées (cache, réplique, single-flight)
+# - budget optionnel (max appels / max ms) : échec rapide ou
+#   repli sur les données en cache
+# - replis sur la dernière donnée connue (budget, Airtable indisponible)
+#
+# Le registre courant est porté par un ContextVar : il suit la
+# requête (threads du pool d'upsert, tâches asyncio) sans paramètre.
+# Résumé exposé dans war_room["io"].
+# =====================================================
+
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+from core.config import config
+
+BUDGET_FAIL = "fail"
+BUDGET_FALLBACK = "fallback"
+
+
+class IOBudgetExceeded(RuntimeError):
+    """
+    Budget Airtable de la requête épuisé (appel non effectué).
+    """
+
+
+class IOLedger:
+    """
+    Registre des I/O Airtable d'une requête (thread-safe).
+    Un registre imbriqué reporte aussi ses appels à son parent.
+    """
+
+    def __init__(
+        self,
+        max_calls: Optional[int] = None,
+        max_ms: Optional[float] = None,
+        mode: str = BUDGET_FALLBACK,
+        parent: Optional["IOLedger"] = None,
+    ):
+        self.max_calls = max_calls or None
+        self.max_ms = max_ms or None
+        self.mode = mode
+        self.parent = parent
+
+        self._lock = threading.Lock()
+        self.started = time.monotonic()
+
+        self.calls = 0
+        self.by_table: Dict[str, Dict[str, int]] = {}
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.wait_s = 0.0
+        self.airtable_s = 0.0
+        self.retries = 0
+        self.hits: Dict[str, int] = {}
+        self.fallbacks = 0
+        self.exceeded = False
+
+    # ---------------------------------------------------------
+    # Budget
+    # ---------------------------------------------------------
+    def _exhausted(self) -> bool:
+        if self.max_calls is not None and self.calls >= self.max_calls:
+            return True
+        if self.max_ms is not None and (self.airtable_s + self.wait_s) * 1000 >= self.max_ms:
+            return True
+        return False
+
+    def exhausted(self) -> bool:
+        ledger = self
+        while ledger is not None:
+            if ledger._exhausted():
+                return True
+            ledger = ledger.parent
+        return False
+
+    def check(self, table: str, operation: str) -> None:
+        """
+        Appelé AVANT chaque appel Airtable : lève si le budget est épuisé.
+        """
+        ledger = self
+        while ledger is not None:
+            if ledger._exhausted():
+                ledger.exceeded = True
+                raise IOBudgetExceeded(
+                    f"Budget Airtable épuisé ({ledger.calls} appels, "
+                    f"{round((ledger.airtable_s + ledger.wait_s) * 1000)} ms) → {operation} {table} refusé"
+                )
+            ledger = ledger.parent
+
+    # ---------------------------------------------------------
+    # Enregistrement
+    # ---------------------------------------------------------
+    def record_call(
+        self,
+        table: str,
+        operation: str,
+        bytes_out: int = 0,
+        bytes_in: int = 0,
+        wait_s: float = 0.0,
+        duration_s: float = 0.0,
+        retries: int = 0,
+    ) -> None:
+        with self._lock:
+            self.calls += 1
+            ops = self.by_table.setdefault(table, {})
+            ops[operation] = ops.get(operation, 0) + 1
+            self.bytes_out += bytes_out
+            self.bytes_in += bytes_in
+            self.wait_s += wait_s
+            self.airtable_s += duration_s
+            self.retries += retries
+        if self.parent is not None:
+            self.parent.record_call(table, operation, bytes_out, bytes_in, wait_s, duration_s, retries)
+
+    def record_hit(self, source: str) -> None:
+        with self._lock:
+            self.hits[source] = self.hits.get(source, 0) + 1
+        if self.parent is not None:
+            self.parent.record_hit(source)
+
+    def record_fallback(self) -> None:
+        with self._lock:
+            self.fallbacks += 1
+        if self.parent is not None:
+            self.parent.record_fallback()
+
+    def summary(self) -> dict:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "by_table": {t: dict(ops) for t, ops in self.by_table.items()},
+                "bytes_out": self.bytes_out,
+                "bytes_in": self.bytes_in,
+                "wait_ms": round(self.wait_s * 1000, 1),
+                "airtable_ms": round(self.airtable_s * 1000, 1),
+                "retries": self.retries,
+                "hits": dict(self.hits),
+                "fallbacks": self.fallbacks,
+                "budget": {
+                    "max_calls": self.max_calls,
+                    "max_ms": self.max_ms,
+                    "mode": self.mode,
+                    "exceeded": self.exceeded,
+                },
+                "elapsed_ms": round((time.monotonic() - self.started) * 1000, 1),
+            }
+
+
+_CURRENT: contextvars.ContextVar[Optional[IOLedger]] = contextvars.ContextVar(
+    "airtable_io_ledger", default=None
+)
+
+
+def current_ledger() -> Optional[IOLedger]:
+    return _CURRENT.get()
+
+
+@contextmanager
+def track_io(
+    max_calls: Optional[int] = None,
+    max_ms: Optional[float] = None,
+    mode: Optional[str] = None,
+) -> Iterator[IOLedger]:
+    """
+    Ouvre un registre pour la durée du bloc.
+    Registre racine : budget par défaut de la config
+    (AIRTABLE_IO_BUDGET_CALLS / AIRTABLE_IO_BUDGET_MS, 0 = illimité).
+    Registre imbriqué : sans budget propre, celui du parent s'applique.
+    """
+    parent = _CURRENT.get()
+    root = parent is None
+    ledger = IOLedger(
+        max_calls=config.airtable_io_budget_calls if max_calls is None and root else max_calls,
+        max_ms=config.airtable_io_budget_ms if max_ms is None and root else max_ms,
+        mode=mode or (parent.mode if parent else config.airtable_io_budget_mode),
+        parent=parent,
+    )
+    token = _CURRENT.set(ledger)
+    try:
+        yield ledger
+    finally:
+        _CURRENT.reset(token)
+
+
+# ---------------------------------------------------------
+# Raccourcis pour la couche Airtable (sans effet hors requête)
+# ---------------------------------------------------------
+def check_budget(table: str, operation: str) -> None:
+    ledger = _CURRENT.get()
+    if ledger is not None:
+        ledger.check(table, operation)
+
+
+def record_call(table: str, operation: str, **kwargs) -> None:
+    ledger = _CURRENT.get()
+    if ledger is not None:
+        ledger.record_call(table, operation, **kwargs)
+
+
+def record_hit(source: str) -> None:
+    ledger = _CURRENT.get()
+    if ledger is not None:
+        ledger.record_hit(source)
+
+
+def record_fallback() -> None:
+    ledger = _CURRENT.get()
+    if ledger is not None:
+        ledger.record_fallback()
+
+
+def fallback_allowed() -> bool:
+    """
+    True si le budget est épuisé ET que la requête accepte le repli cache.
+    """
+    ledger = _CURRENT.get()
+    return ledger is not None and ledger.mode == BUDGET_FALLBACK and ledger.exhausted()
+
+
+def operation_for(method: str, has_record_id: bool, upsert: bool = False) -> str:
+    """
+    Nom lisible de l'opération Airtable (clé de war_room["io"]["by_table"]).
+    """
+    method = method.upper()
+    if method == "GET":
+        return "get" if has_record_id else "list"
+    if method == "POST":
+        return "list" if has_record_id else "create"
+    if method == "DELETE":
+        return "delete"
+    if has_record_id:
+        return "update"
+    if upsert:
+        return "upsert"
+    return "batch_update"
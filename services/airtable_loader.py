@@ -0,0 +1,219 @@
+# services/airtable_loader.py
+# =====================================================
+# Chargement par lots multi-coureurs (style DataLoader)
+# - les clés demandées (Coureur_ID, record IDs…) sont regroupées
+#   en 1 requête OR({clé}='a', {clé}='b', …) par table
+# - découpage au plafond de longueur de formule Airtable
+# - résultats redistribués par clé
+#
+#   BatchLoader       : jobs par lot (sync) → load_many(keys)
+#   AsyncBatchLoader  : clés demandées pendant un même tour de
+#                       boucle asyncio → 1 seul envoi
+#
+# 500 coureurs = quelques appels au lieu de 500.
+# =====================================================
+
+import asyncio
+from typing import Any, Dict, Hashable, Iterable, List, Optional
+
+from core.config import config
+from core.utils.logger import log_info
+from services.airtable_cache import record_cache
+from services.airtable_query import RECORD_ID, Query, and_, eq, in_
+
+
+def chunk_keys(key_field: Any, keys: List[Hashable], where: Optional[Query] = None, max_len: Optional[int] = None) -> List[List[Hashable]]:
+    """
+    Découpe les clés pour que chaque formule compilée reste sous max_len.
+    """
+    max_len = max_len or config.airtable_max_formula_len
+    base = len(where.compile()) + len("AND(, )") if where is not None else 0
+
+    chunks: List[List[Hashable]] = []
+    current: List[Hashable] = []
+    size = base + len("OR()")
+    for key in keys:
+        term = len(eq(key_field, key).compile()) + 2
+        if current and size + term > max_len:
+            chunks.append(current)
+            current, size = [], base + len("OR()")
+        current.append(key)
+        size += term
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _record_keys(record: dict, key_field: Any) -> List[Hashable]:
+    if key_field == RECORD_ID:
+        return [record["id"]]
+    value = (record.get("fields") or {}).get(key_field)
+    if isinstance(value, (list, tuple)):
+        return list(value)
+    return [value]
+
+
+def fan_out(records: Iterable[dict], key_field: Any, keys: Iterable[Hashable]) -> Dict[Hashable, List[dict]]:
+    """
+    {clé: [records]} ; une clé sans résultat reçoit une liste vide.
+    Comparaison en texte (Airtable compare '45' et 45 comme égaux).
+    """
+    wanted = {str(k): k for k in keys}
+    result: Dict[Hashable, List[dict]] = {k: [] for k in wanted.values()}
+    for record in records:
+        for value in _record_keys(record, key_field):
+            key = wanted.get(str(value))
+            if key is not None:
+                result[key].append(record)
+    return result
+
+
+class _LoaderBase:
+    def __init__(
+        self,
+        table_id: str,
+        key_field: Any,
+        where: Optional[Query] = None,
+        fields: Optional[List[str]] = None,
+    ):
+        self.table_id = table_id
+        self.key_field = key_field
+        self.where = where
+        self.fields = fields
+
+        self.batches = 0
+        self.calls = 0
+        self.keys = 0
+
+    def _query(self, chunk: List[Hashable]) -> Query:
+        query = in_(self.key_field, chunk)
+        return and_(self.where, query) if self.where is not None else query
+
+    def _prime(self, records: List[dict]) -> None:
+        # Records complets chargés par ID : les get_record suivants sont servis par le cache
+        if self.key_field == RECORD_ID and not self.fields:
+            for record in records:
+                record_cache.set(self.table_id, record["id"], record)
+
+    def _log(self, nb_keys: int, nb_calls: int, nb_records: int) -> None:
+        self.batches += 1
+        self.calls += nb_calls
+        self.keys += nb_keys
+        log_info(
+            f"Lot '{self.table_id}' → {nb_keys} clés, {nb_calls} appel(s), {nb_records} records",
+            module="AirtableLoader",
+        )
+
+    def stats(self) -> dict:
+        return {
+            "table_id": self.table_id,
+            "batches": self.batches,
+            "calls": self.calls,
+            "keys": self.keys,
+        }
+
+
+class BatchLoader(_LoaderBase):
+    """
+    Lot synchrone (jobs nocturnes, scripts) : load_many(keys) → {clé: [records]}.
+    """
+
+    def __init__(self, table_id: str, key_field: Any, where: Optional[Query] = None, fields: Optional[List[str]] = None, service=None):
+        super().__init__(table_id, key_field, where, fields)
+        self._service = service
+
+    def _airtable(self):
+        if self._service is None:
+            from services.airtable_service import AirtableService
+            self._service = AirtableService()
+        return self._service
+
+    def load_many(self, keys: Iterable[Hashable]) -> Dict[Hashable, List[dict]]:
+        keys = list(dict.fromkeys(k for k in keys if k not in (None, "")))
+        if not keys:
+            return {}
+
+        airtable = self._airtable()
+        chunks = chunk_keys(self.key_field, keys, self.where)
+        records: List[dict] = []
+        for chunk in chunks:
+            records.extend(airtable.find_all(self.table_id, self._query(chunk), fields=self.fields))
+
+        self._prime(records)
+        self._log(len(keys), len(chunks), len(records))
+        return fan_out(records, self.key_field, keys)
+
+    def load(self, key: Hashable) -> List[dict]:
+        return self.load_many([key]).get(key, [])
+
+
+class AsyncBatchLoader(_LoaderBase):
+    """
+    DataLoader asyncio : `await loader.load(key)` ; toutes les clés
+    demandées avant la fin du tour de boucle partent ensemble.
+    """
+
+    def __init__(self, table_id: str, key_field: Any, where: Optional[Query] = None, fields: Optional[List[str]] = None, service=None):
+        super().__init__(table_id, key_field, where, fields)
+        self._service = service
+        # Par boucle : clé → Future en attente du prochain envoi
+        self._pending: Dict[int, Dict[Hashable, asyncio.Future]] = {}
+
+    def _airtable(self):
+        if self._service is None:
+            from services.airtable_async import AsyncAirtableService
+            self._service = AsyncAirtableService()
+        return self._service
+
+    def load(self, key: Hashable) -> "asyncio.Future":
+        loop = asyncio.get_running_loop()
+        pending = self._pending.get(id(loop))
+        if pending is None:
+            pending = self._pending[id(loop)] = {}
+            loop.call_soon(self._dispatch, loop)
+
+        future = pending.get(key)
+        if future is None:
+            future = pending[key] = loop.create_future()
+        return future
+
+    async def load_many(self, keys: Iterable[Hashable]) -> Dict[Hashable, List[dict]]:
+        keys = list(dict.fromkeys(k for k in keys if k not in (None, "")))
+        results = await asyncio.gather(*(self.load(k) for k in keys))
+        return dict(zip(keys, results))
+
+    def _dispatch(self, loop: asyncio.AbstractEventLoop) -> None:
+        pending = self._pending.pop(id(loop), {})
+        if pending:
+            task = loop.create_task(self._send(pending))
+            # Référence forte jusqu'à la fin de l'envoi
+            _TASKS.add(task)
+            task.add_done_callback(_TASKS.discard)
+
+    async def _send(self, pending: Dict[Hashable, asyncio.Future]) -> None:
+        keys = list(pending)
+        try:
+            airtable = self._airtable()
+            chunks = chunk_keys(self.key_field, keys, self.where)
+            pages = await asyncio.gather(*(
+                airtable.list_records(self.table_id, filter_by_formula=self._query(chunk), fields=self.fields)
+                for chunk in chunks
+            ))
+            records = [r for page in pages for r in page]
+            self._prime(records)
+            self._log(len(keys), len(chunks), len(records))
+            by_key = fan_out(records, self.key_field, keys)
+        except BaseException as e:
+            for future in pending.values():
+                if not future.done():
+                    future.set_exception(e)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            return
+
+        for key, future in pending.items():
+            if not future.done():
+                future.set_result(by_key.get(key, []))
+
+
+_TASKS: set = set()
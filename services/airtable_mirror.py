@@ -0,0 +1,366 @@
+# services/airtable_mirror.py
+# =====================================================
+# Réplique locale SQLite de la base Airtable (optionnelle)
+# - 1 fichier par environnement (DEV / PROD, ATABLES.ENV)
+# - Coureurs, Slots et tables de référence
+# - sync incrémentale sur LAST_MODIFIED_TIME() en tâche de fond,
+#   resync complète périodique (suppressions côté Airtable)
+# - lectures servies localement si la table est assez fraîche
+# - écritures : toujours vers Airtable, puis reportées ici
+#
+# Activée par AIRTABLE_MIRROR=1. Désactivée : aucun effet.
+# =====================================================
+
+import json
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from core.config import BASE_DIR, config
+from core.utils.logger import log_info, log_error
+from services.airtable_client import registry
+from services.airtable_query import LAST_MODIFIED, apply_options, is_after
+from services.airtable_tables import ATABLES
+from services.reference_data import REFERENCE_TABLES
+
+# Nom logique → ID de table répliquée
+MIRRORED_TABLES = {
+    "coureurs": ATABLES.COU_TABLE_ID,
+    "slots": ATABLES.REF_SLOTS_ID,
+    **REFERENCE_TABLES,
+}
+
+# Recouvrement du curseur : absorbe le décalage d'horloge avec Airtable
+SYNC_OVERLAP_S = 5
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    table_id     TEXT NOT NULL,
+    record_id    TEXT NOT NULL,
+    created_time TEXT,
+    fields_json  TEXT NOT NULL,
+    PRIMARY KEY (table_id, record_id)
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+    table_id       TEXT PRIMARY KEY,
+    cursor         TEXT,
+    synced_at      REAL,
+    full_synced_at REAL
+);
+"""
+
+
+def _iso(dt: datetime) -> str:
+    return dt.strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+
+def _row_to_record(record_id: str, created_time: Optional[str], fields_json: str) -> dict:
+    return {"id": record_id, "createdTime": created_time, "fields": json.loads(fields_json)}
+
+
+class AirtableMirror:
+    """
+    Réplique SQLite thread-safe (1 connexion, verrou) des tables répliquées.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        tables: Dict[str, Optional[str]],
+        enabled: bool = False,
+        sync_interval: float = 30,
+        max_staleness: float = 120,
+        full_sync_interval: float = 3600,
+    ):
+        self.path = Path(path)
+        self.table_ids = {name: tid for name, tid in tables.items() if tid}
+        self.enabled = enabled
+        self.sync_interval = sync_interval
+        self.max_staleness = max_staleness
+        self.full_sync_interval = full_sync_interval
+
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        # Fraîcheur par table (copie mémoire de sync_state.synced_at)
+        self._synced_at: Dict[str, float] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.sync_count = 0
+        self.sync_errors = 0
+        self.last_error: Optional[str] = None
+
+    # ---------------------------------------------------------
+    # Connexion
+    # ---------------------------------------------------------
+    def _db(self) -> sqlite3.Connection:
+        # Appelé sous verrou
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            for table_id, synced_at in conn.execute("SELECT table_id, synced_at FROM sync_state"):
+                if synced_at:
+                    self._synced_at[table_id] = synced_at
+            self._conn = conn
+        return self._conn
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # ---------------------------------------------------------
+    # Lecture (chemins chauds)
+    # ---------------------------------------------------------
+    def _fresh(self, table_id: str, max_staleness: Optional[float]) -> bool:
+        if not self.enabled or table_id not in self.table_ids.values():
+            return False
+
+        bound = self.max_staleness if max_staleness is None else max_staleness
+        synced_at = self._synced_at.get(table_id)
+        if synced_at is None or time.time() - synced_at > bound:
+            self.stale += 1
+            return False
+        return True
+
+    def get(self, table_id: str, record_id: str, max_staleness: Optional[float] = None) -> Optional[dict]:
+        """
+        Record répliqué, ou None (table non répliquée / trop ancienne / absent).
+        """
+        if not self._fresh(table_id, max_staleness):
+            return None
+
+        with self._lock:
+            row = self._db().execute(
+                "SELECT created_time, fields_json FROM records WHERE table_id = ? AND record_id = ?",
+                (table_id, record_id),
+            ).fetchone()
+
+        if row is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return _row_to_record(record_id, row[0], row[1])
+
+    def all(
+        self,
+        table_id: str,
+        fields: Optional[List[str]] = None,
+        sort: Optional[List[str]] = None,
+        max_records: Optional[int] = None,
+        max_staleness: Optional[float] = None,
+    ) -> Optional[List[dict]]:
+        """
+        Tous les records d'une table (projection / tri / limite appliqués
+        localement), ou None si la table ne peut pas être servie.
+        Les formules Airtable ne sont PAS évaluées ici.
+        """
+        if not self._fresh(table_id, max_staleness):
+            return None
+
+        with self._lock:
+            rows = self._db().execute(
+                "SELECT record_id, created_time, fields_json FROM records WHERE table_id = ?",
+                (table_id,),
+            ).fetchall()
+
+        records = apply_options(
+            [_row_to_record(*row) for row in rows],
+            fields=fields,
+            sort=sort,
+            max_records=max_records,
+        )
+
+        self.hits += 1
+        return records
+
+    # ---------------------------------------------------------
+    # Écriture (write-through : après succès Airtable)
+    # ---------------------------------------------------------
+    def apply(self, table_id: str, records: Iterable[dict]) -> None:
+        """
+        Reporte des records renvoyés par Airtable (create / update / upsert).
+        """
+        if not self.enabled or table_id not in self.table_ids.values():
+            return
+
+        rows = [
+            (table_id, r["id"], r.get("createdTime"), json.dumps(r.get("fields") or {}))
+            for r in records
+            if r and r.get("id")
+        ]
+        if not rows:
+            return
+
+        with self._lock:
+            db = self._db()
+            with db:
+                db.executemany(
+                    "INSERT OR REPLACE INTO records (table_id, record_id, created_time, fields_json) "
+                    "VALUES (?, ?, ?, ?)",
+                    rows,
+                )
+
+    # ---------------------------------------------------------
+    # Synchronisation
+    # ---------------------------------------------------------
+    def _fetch_pages(self, table_id: str, formula: Optional[str]):
+        options = {"formula": formula} if formula else {}
+        return registry.table(table_id).iterate(**options)
+
+    def sync_table(self, table_id: str, full: bool = False) -> int:
+        """
+        Sync d'une table : incrémentale depuis le curseur, ou complète
+        (remplace le contenu, propage les suppressions).
+        Retourne le nombre de records reçus.
+        """
+        started = datetime.now(timezone.utc)
+
+        with self._lock:
+            state = self._db().execute(
+                "SELECT cursor, full_synced_at FROM sync_state WHERE table_id = ?",
+                (table_id,),
+            ).fetchone()
+
+        cursor, full_synced_at = state if state else (None, None)
+        if cursor is None or not full_synced_at or time.time() - full_synced_at > self.full_sync_interval:
+            full = True
+
+        formula = None if full else is_after(LAST_MODIFIED, cursor).compile()
+
+        count = 0
+        seen = set()
+
+        # Appels Airtable hors verrou : les lectures locales ne sont
+        # bloquées que le temps d'écrire chaque page
+        for page in self._fetch_pages(table_id, formula):
+            rows = [
+                (table_id, rec["id"], rec.get("createdTime"), json.dumps(rec.get("fields") or {}))
+                for rec in page
+            ]
+            seen.update(rec["id"] for rec in page)
+            count += len(rows)
+
+            with self._lock:
+                db = self._db()
+                with db:
+                    db.executemany("INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?)", rows)
+
+        with self._lock:
+            db = self._db()
+            with db:
+                if full:
+                    existing = {
+                        row[0] for row in db.execute(
+                            "SELECT record_id FROM records WHERE table_id = ?", (table_id,)
+                        )
+                    }
+                    db.executemany(
+                        "DELETE FROM records WHERE table_id = ? AND record_id = ?",
+                        [(table_id, rid) for rid in existing - seen],
+                    )
+
+                now = time.time()
+                db.execute(
+                    "INSERT OR REPLACE INTO sync_state (table_id, cursor, synced_at, full_synced_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (
+                        table_id,
+                        _iso(started - timedelta(seconds=SYNC_OVERLAP_S)),
+                        now,
+                        now if full else full_synced_at,
+                    ),
+                )
+                self._synced_at[table_id] = now
+
+        return count
+
+    def sync(self) -> Dict[str, int]:
+        """
+        Sync de toutes les tables répliquées. Une table en erreur
+        garde son ancienne fraîcheur (et finit par ne plus être servie).
+        """
+        received = {}
+        for name, table_id in self.table_ids.items():
+            try:
+                received[name] = self.sync_table(table_id)
+            except Exception as e:
+                self.sync_errors += 1
+                self.last_error = f"{name}: {e}"
+                log_error(f"Réplique '{name}' non synchronisée : {e}", module="AirtableMirror")
+
+        self.sync_count += 1
+        log_info(
+            "Réplique Airtable synchronisée → "
+            + ", ".join(f"{n}={c}" for n, c in received.items()),
+            module="AirtableMirror",
+        )
+        return received
+
+    # ---------------------------------------------------------
+    # Tâche de fond
+    # ---------------------------------------------------------
+    def start(self) -> None:
+        if not self.enabled or self._thread is not None:
+            return
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="airtable-mirror-sync", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread = None
+
+    def _run(self) -> None:
+        while True:
+            try:
+                self.sync()
+            except Exception as e:
+                log_error(f"Synchronisation de la réplique en échec : {e}", module="AirtableMirror")
+            if self._stop.wait(self.sync_interval):
+                return
+
+    def stats(self) -> dict:
+        now = time.time()
+        return {
+            "enabled": self.enabled,
+            "path": str(self.path),
+            "max_staleness_s": self.max_staleness,
+            "sync_interval_s": self.sync_interval,
+            "tables": {
+                name: {
+                    "age_s": round(now - self._synced_at[tid], 1) if tid in self._synced_at else None,
+                }
+                for name, tid in self.table_ids.items()
+            },
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale": self.stale,
+            "sync_count": self.sync_count,
+            "sync_errors": self.sync_errors,
+            "last_error": self.last_error,
+        }
+
+
+# Instance unique pour tout le process
+airtable_mirror = AirtableMirror(
+    path=config.airtable_mirror_path or BASE_DIR / "var" / f"airtable_mirror_{ATABLES.ENV.lower()}.sqlite3",
+    tables=MIRRORED_TABLES,
+    enabled=config.airtable_mirror_enabled,
+    sync_interval=config.airtable_mirror_sync_s,
+    max_staleness=config.airtable_mirror_max_staleness_s,
+    full_sync_interval=config.airtable_mirror_full_sync_s,
+)
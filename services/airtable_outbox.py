@@ -0,0 +1,358 @@
+# services/airtable_outbox.py
+# =====================================================
+# Outbox locale (write-behind) pour les écritures Airtable
+# NON critiques du chemin chaud (Type_cible SCN_6,
+# persistance SCN_0h_exec, stockage SCN_7)
+# - enqueue : 1 INSERT SQLite (WAL) → acquitté tout de suite
+# - thread de vidage : regroupe par table / clés, fusionne les
+#   écritures d'un même record, envoie par lots de 10
+# - échec : nouvel essai avec backoff exponentiel, puis
+#   abandon ("dead") après AIRTABLE_OUTBOX_MAX_ATTEMPTS
+# - survit à un redémarrage (reprise des lignes en attente)
+# - abonnés « envoyé » : prévenus une fois le lot accepté par
+#   Airtable (pas à la mise en file)
+#
+# Désactivée (AIRTABLE_OUTBOX=0) : écriture Airtable immédiate.
+# =====================================================
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from core.config import BASE_DIR, config
+from core.utils.logger import log_info, log_error
+from services.airtable_tables import ATABLES
+
+OP_UPSERT = "upsert"
+OP_UPDATE = "update"
+
+STATUS_PENDING = "pending"
+STATUS_DEAD = "dead"
+
+# Backoff entre deux essais (secondes, plafonné)
+RETRY_BASE_S = 2
+RETRY_MAX_S = 300
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id              INTEGER PRIMARY KEY AUTOINCREMENT,
+    table_id        TEXT NOT NULL,
+    op              TEXT NOT NULL,
+    key_json        TEXT NOT NULL,
+    fields_json     TEXT NOT NULL,
+    created_at      REAL NOT NULL,
+    attempts        INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    status          TEXT NOT NULL DEFAULT 'pending',
+    last_error      TEXT
+);
+CREATE INDEX IF NOT EXISTS outbox_pending ON outbox (status, next_attempt_at);
+"""
+
+
+class AirtableOutbox:
+    """
+    File d'écritures Airtable persistée en SQLite (1 connexion, verrou).
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        enabled: bool = True,
+        flush_interval: float = 2,
+        batch_size: int = 100,
+        max_attempts: int = 8,
+        service=None,
+    ):
+        self.path = Path(path)
+        self.enabled = enabled
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self._service = service
+
+        self._lock = threading.Lock()
+        # Un seul vidage à la fois (thread de fond / flush() explicite)
+        self._flush_lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._sent_listeners: List[Callable[[str, str, List[dict]], None]] = []
+
+        self.enqueued = 0
+        self.sent = 0
+        self.calls = 0
+        self.failures = 0
+        self.dead = 0
+        self.last_flush_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+    # ---------------------------------------------------------
+    # Connexion
+    # ---------------------------------------------------------
+    def _db(self) -> sqlite3.Connection:
+        # Appelé sous verrou
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _airtable(self):
+        if self._service is None:
+            from services.airtable_service import AirtableService
+            self._service = AirtableService()
+        return self._service
+
+    def add_sent_listener(self, listener: Callable[[str, str, List[dict]], None]) -> None:
+        """
+        listener(table_id, op, champs fusionnés par record) après chaque
+        envoi réussi du thread de vidage.
+        """
+        if listener not in self._sent_listeners:
+            self._sent_listeners.append(listener)
+
+    # ---------------------------------------------------------
+    # Mise en file (chemin chaud)
+    # ---------------------------------------------------------
+    def _enqueue(self, table_id: str, op: str, entries: List[Tuple[object, dict]]) -> List[int]:
+        # 1 transaction pour toutes les lignes
+        if not table_id:
+            raise ValueError("outbox : table_id manquant (variable AIRTABLE_*_TABLE non définie ?)")
+        now = time.time()
+        ids = []
+        with self._lock:
+            db = self._db()
+            for key, fields in entries:
+                cursor = db.execute(
+                    "INSERT INTO outbox (table_id, op, key_json, fields_json, created_at, next_attempt_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (table_id, op, json.dumps(key), json.dumps(fields, default=str), now, now),
+                )
+                ids.append(cursor.lastrowid)
+            db.commit()
+            self.enqueued += len(ids)
+        self._wake.set()
+        return ids
+
+    def upsert(self, table_id: str, key_fields: List[str], fields: dict) -> Optional[int]:
+        """
+        Upsert différé (fusion sur key_fields). Retourne l'ID d'outbox,
+        ou None si l'outbox est désactivée (écriture faite tout de suite).
+        """
+        ids = self.upsert_many(table_id, key_fields, [fields])
+        return ids[0] if ids else None
+
+    def upsert_many(self, table_id: str, key_fields: List[str], rows: List[dict]) -> Optional[List[int]]:
+        for row in rows:
+            missing = [k for k in key_fields if row.get(k) in (None, "")]
+            if missing:
+                raise ValueError(f"outbox.upsert : clé(s) {missing} manquante(s) dans {row}")
+
+        if not self.enabled:
+            self._airtable().upsert_many(table_id, key_fields=list(key_fields), rows=list(rows))
+            return None
+        return self._enqueue(table_id, OP_UPSERT, [(list(key_fields), row) for row in rows])
+
+    def update(self, table_id: str, record_id: str, fields: dict) -> Optional[int]:
+        """
+        PATCH différé par record_id Airtable.
+        """
+        if not self.enabled:
+            self._airtable().update_record_by_id(table_id, record_id, fields)
+            return None
+        return self._enqueue(table_id, OP_UPDATE, [(record_id, fields)])[0]
+
+    # ---------------------------------------------------------
+    # Vidage
+    # ---------------------------------------------------------
+    def _due(self) -> List[tuple]:
+        with self._lock:
+            return self._db().execute(
+                "SELECT id, table_id, op, key_json, fields_json, attempts FROM outbox "
+                "WHERE status = ? AND next_attempt_at <= ? ORDER BY id LIMIT ?",
+                (STATUS_PENDING, time.time(), self.batch_size),
+            ).fetchall()
+
+    def flush(self) -> int:
+        """
+        Envoie les lignes échues. Retourne le nb de lignes envoyées.
+        """
+        with self._flush_lock:
+            rows = self._due()
+            if not rows:
+                return 0
+
+            # (table, op, clés de fusion) → lignes, dans l'ordre d'arrivée
+            groups: Dict[Tuple[str, str, str], List[tuple]] = {}
+            for row in rows:
+                _, table_id, op, key_json, _, _ = row
+                group_key = key_json if op == OP_UPSERT else ""
+                groups.setdefault((table_id, op, group_key), []).append(row)
+
+            sent = 0
+            for (table_id, op, _), group in groups.items():
+                sent += self._send_group(table_id, op, group)
+
+            self.last_flush_at = time.time()
+            return sent
+
+    def _send_group(self, table_id: str, op: str, group: List[tuple]) -> int:
+        # Écritures successives d'un même record fusionnées (la dernière gagne)
+        merged: Dict[str, dict] = {}
+        for _, _, _, key_json, fields_json, _ in group:
+            fields = json.loads(fields_json)
+            if op == OP_UPSERT:
+                key_fields = json.loads(key_json)
+                record_key = json.dumps([fields.get(k) for k in key_fields])
+            else:
+                record_key = json.loads(key_json)
+            merged.setdefault(record_key, {}).update(fields)
+
+        ids = [row[0] for row in group]
+        airtable = self._airtable()
+        try:
+            if op == OP_UPSERT:
+                airtable.upsert_many(table_id, key_fields=json.loads(group[0][3]), rows=list(merged.values()))
+            else:
+                airtable.update_many(
+                    table_id,
+                    [{"id": record_id, "fields": fields} for record_id, fields in merged.items()],
+                )
+        except Exception as e:
+            self._retry(group, e)
+            return 0
+
+        with self._lock:
+            db = self._db()
+            db.executemany("DELETE FROM outbox WHERE id = ?", [(i,) for i in ids])
+            db.commit()
+        self.sent += len(ids)
+        self.calls += 1
+        log_info(
+            f"Outbox → {table_id} : {len(ids)} écriture(s), {len(merged)} record(s)",
+            module="AirtableOutbox",
+        )
+        for listener in self._sent_listeners:
+            try:
+                listener(table_id, op, list(merged.values()))
+            except Exception as e:
+                log_error(f"Outbox : abonné en échec après envoi : {e}", module="AirtableOutbox")
+        return len(ids)
+
+    def _retry(self, group: List[tuple], error: Exception) -> None:
+        now = time.time()
+        updates = []
+        for row_id, _, _, _, _, attempts in group:
+            attempts += 1
+            status = STATUS_DEAD if attempts >= self.max_attempts else STATUS_PENDING
+            delay = min(RETRY_BASE_S * 2 ** (attempts - 1), RETRY_MAX_S)
+            updates.append((attempts, now + delay, status, str(error)[:500], row_id))
+            if status == STATUS_DEAD:
+                self.dead += 1
+
+        with self._lock:
+            db = self._db()
+            db.executemany(
+                "UPDATE outbox SET attempts = ?, next_attempt_at = ?, status = ?, last_error = ? WHERE id = ?",
+                updates,
+            )
+            db.commit()
+
+        self.failures += 1
+        self.last_error = str(error)
+        log_error(
+            f"Outbox : échec d'envoi ({len(group)} ligne(s)), nouvel essai différé : {error}",
+            module="AirtableOutbox",
+        )
+
+    # ---------------------------------------------------------
+    # Tâche de fond
+    # ---------------------------------------------------------
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            try:
+                # Vide tant qu'il reste des lignes échues (lots de batch_size)
+                while self.flush() and not self._stop.is_set():
+                    pass
+            except Exception as e:
+                self.last_error = str(e)
+                log_error(f"Outbox : vidage interrompu : {e}", module="AirtableOutbox")
+
+    def start(self) -> None:
+        if not self.enabled or (self._thread and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="airtable-outbox", daemon=True)
+        self._thread.start()
+        log_info(f"Outbox Airtable démarrée ({self.path})", module="AirtableOutbox")
+
+    def stop(self, drain: bool = True) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        if drain and self.enabled:
+            # Dernier essai avant arrêt ; le reste repartira au prochain démarrage
+            try:
+                self.flush()
+            except Exception as e:
+                log_error(f"Outbox : vidage final impossible : {e}", module="AirtableOutbox")
+
+    # ---------------------------------------------------------
+    # Observabilité
+    # ---------------------------------------------------------
+    def stats(self) -> dict:
+        pending = dead = 0
+        oldest = None
+        if self.enabled:
+            with self._lock:
+                db = self._db()
+                pending, oldest = db.execute(
+                    "SELECT COUNT(*), MIN(created_at) FROM outbox WHERE status = ?",
+                    (STATUS_PENDING,),
+                ).fetchone()
+                dead = db.execute(
+                    "SELECT COUNT(*) FROM outbox WHERE status = ?", (STATUS_DEAD,)
+                ).fetchone()[0]
+
+        return {
+            "enabled": self.enabled,
+            "path": str(self.path),
+            "pending": pending,
+            "dead": dead,
+            "lag_s": round(time.time() - oldest, 1) if oldest else 0.0,
+            "enqueued": self.enqueued,
+            "sent": self.sent,
+            "calls": self.calls,
+            "failures": self.failures,
+            "last_flush_age_s": round(time.time() - self.last_flush_at, 1) if self.last_flush_at else None,
+            "last_error": self.last_error,
+        }
+
+
+# Instance unique pour tout le process
+airtable_outbox = AirtableOutbox(
+    path=config.airtable_outbox_path or BASE_DIR / "var" / f"airtable_outbox_{ATABLES.ENV.lower()}.sqlite3",
+    enabled=config.airtable_outbox_enabled,
+    flush_interval=config.airtable_outbox_flush_s,
+    max_attempts=config.airtable_outbox_max_attempts,
+)
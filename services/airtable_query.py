@@ -0,0 +1,395 @@
+# services/airtable_query.py
+# =====================================================
+# Mini-DSL de requêtes Airtable (filterByFormula)
+# - eq / ne / gt / gte / lt / lte / in_ / and_ / or_ / not_
+#   + comparaisons de dates (is_after / is_before / is_same)
+# - compilation en formule Airtable avec échappement des
+#   valeurs ('…', \) et des noms de champs ({…})
+# - 1 gabarit compilé par FORME de requête (champs + opérateurs),
+#   réutilisé quelles que soient les valeurs
+# - requêtes d'égalité pure évaluables en mémoire (KeyIndex),
+#   sur champs scalaires uniquement
+#
+#   q = and_(eq("Coureur_ID", coureur_id), eq("status", "planned"))
+#   airtable.list_records(ATABLES.SLOTS, filter_by_formula=q, …)
+# =====================================================
+
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+
+# ---------------------------------------------------------
+# Échappement
+# ---------------------------------------------------------
+@dataclass(frozen=True)
+class Raw:
+    """
+    Expression Airtable insérée telle quelle à la place d'un champ.
+    """
+    expression: str
+
+
+LAST_MODIFIED = Raw("LAST_MODIFIED_TIME()")
+CREATED = Raw("CREATED_TIME()")
+RECORD_ID = Raw("RECORD_ID()")
+
+
+def field_ref(name: Any) -> str:
+    if isinstance(name, Raw):
+        return name.expression
+    return "{" + str(name).replace("}", r"\}") + "}"
+
+
+def literal(value: Any) -> str:
+    """
+    Valeur Python → littéral de formule Airtable.
+    """
+    if value is None:
+        return "BLANK()"
+    if isinstance(value, bool):
+        return "TRUE()" if value else "FALSE()"
+    if isinstance(value, (int, float)):
+        return repr(value)
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        value = value.isoformat(timespec="milliseconds") + "Z"
+    elif isinstance(value, date):
+        value = value.isoformat()
+    text = str(value).replace("\\", "\\\\").replace("'", "\\'")
+    return f"'{text}'"
+
+
+# ---------------------------------------------------------
+# Arbre de requête
+# ---------------------------------------------------------
+class Query:
+    """
+    Nœud de requête immuable (hashable : utilisable dans query_key).
+    shape() = structure sans les valeurs ; values() = valeurs dans l'ordre.
+    """
+
+    def shape(self) -> tuple:
+        raise NotImplementedError
+
+    def values(self) -> tuple:
+        raise NotImplementedError
+
+    def equalities(self) -> Optional[Dict[str, Any]]:
+        """
+        {champ: valeur} si la requête n'est qu'un ET d'égalités, sinon None.
+        """
+        return None
+
+    def compile(self) -> str:
+        return _template(self.shape()) % tuple(literal(v) for v in self.values())
+
+    def __str__(self) -> str:
+        return self.compile()
+
+    def __and__(self, other: "Query") -> "Query":
+        return and_(self, other)
+
+    def __or__(self, other: "Query") -> "Query":
+        return or_(self, other)
+
+
+@dataclass(frozen=True)
+class Compare(Query):
+    field: Any
+    op: str
+    value: Any
+
+    def shape(self) -> tuple:
+        return ("cmp", self.field, self.op)
+
+    def values(self) -> tuple:
+        return (self.value,)
+
+    def equalities(self) -> Optional[Dict[str, Any]]:
+        if self.op == "=" and not isinstance(self.field, Raw):
+            return {self.field: self.value}
+        return None
+
+
+@dataclass(frozen=True)
+class DateCompare(Query):
+    field: Any
+    func: str
+    value: Any
+
+    def shape(self) -> tuple:
+        return ("date", self.field, self.func)
+
+    def values(self) -> tuple:
+        return (self.value,)
+
+
+@dataclass(frozen=True)
+class Group(Query):
+    func: str
+    parts: Tuple[Query, ...]
+
+    def shape(self) -> tuple:
+        return (self.func, tuple(p.shape() for p in self.parts))
+
+    def values(self) -> tuple:
+        return tuple(v for p in self.parts for v in p.values())
+
+    def equalities(self) -> Optional[Dict[str, Any]]:
+        if self.func != "AND":
+            return None
+        merged: Dict[str, Any] = {}
+        for part in self.parts:
+            eqs = part.equalities()
+            if eqs is None:
+                return None
+            for name, value in eqs.items():
+                if name in merged and merged[name] != value:
+                    return None
+                merged[name] = value
+        return merged
+
+
+def eq(field: Any, value: Any) -> Query:
+    return Compare(field, "=", value)
+
+
+def ne(field: Any, value: Any) -> Query:
+    return Compare(field, "!=", value)
+
+
+def gt(field: Any, value: Any) -> Query:
+    return Compare(field, ">", value)
+
+
+def gte(field: Any, value: Any) -> Query:
+    return Compare(field, ">=", value)
+
+
+def lt(field: Any, value: Any) -> Query:
+    return Compare(field, "<", value)
+
+
+def lte(field: Any, value: Any) -> Query:
+    return Compare(field, "<=", value)
+
+
+def and_(*parts: Query) -> Query:
+    return parts[0] if len(parts) == 1 else Group("AND", tuple(parts))
+
+
+def or_(*parts: Query) -> Query:
+    return parts[0] if len(parts) == 1 else Group("OR", tuple(parts))
+
+
+def not_(part: Query) -> Query:
+    return Group("NOT", (part,))
+
+
+def in_(field: Any, values: Iterable[Any]) -> Query:
+    """
+    OR({f}='a', {f}='b', …). Liste vide → FALSE().
+    """
+    values = tuple(values)
+    if not values:
+        return Group("FALSE", ())
+    return or_(*(eq(field, v) for v in values))
+
+
+def is_after(field: Any, when: Any) -> Query:
+    return DateCompare(field, "IS_AFTER", when)
+
+
+def is_before(field: Any, when: Any) -> Query:
+    return DateCompare(field, "IS_BEFORE", when)
+
+
+def is_same(field: Any, when: Any) -> Query:
+    return DateCompare(field, "IS_SAME", when)
+
+
+def to_formula(formula: Any) -> Optional[str]:
+    """
+    Query ou formule texte (compat) → formule texte.
+    """
+    if isinstance(formula, Query):
+        return formula.compile()
+    return formula
+
+
+# ---------------------------------------------------------
+# Gabarits compilés (1 par forme)
+# ---------------------------------------------------------
+@lru_cache(maxsize=512)
+def _template(shape: tuple) -> str:
+    kind = shape[0]
+    if kind == "cmp":
+        _, field, op = shape
+        return f"{_pct(field_ref(field))} {op} %s"
+    if kind == "date":
+        _, field, func = shape
+        return f"{func}({_pct(field_ref(field))}, %s)"
+    func, parts = shape
+    return f"{func}({', '.join(_template(p) for p in parts)})"
+
+
+def _pct(text: str) -> str:
+    return text.replace("%", "%%")
+
+
+def template_stats() -> dict:
+    info = _template.cache_info()
+    return {"shapes": info.currsize, "hits": info.hits, "misses": info.misses}
+
+
+# ---------------------------------------------------------
+# Évaluation locale (égalités uniquement)
+# ---------------------------------------------------------
+def _norm(value: Any) -> Any:
+    # Airtable compare '45' et 45 comme égaux
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            return value
+    return value
+
+
+def _scalar(value: Any) -> bool:
+    # Champ liste (multi-select, liens) : Airtable compare le texte affiché
+    # (noms des records liés joints), pas les ids → non évaluable en mémoire
+    return not isinstance(value, (list, tuple, dict))
+
+
+def scalar_fields(records: Iterable[dict], fields: Iterable[str]) -> bool:
+    """
+    True si les champs sont scalaires dans tous les records
+    (égalités évaluables en mémoire comme Airtable).
+    """
+    fields = tuple(fields)
+    return all(_scalar((r.get("fields") or {}).get(k)) for r in records for k in fields)
+
+
+def matches(record: dict, equalities: Dict[str, Any]) -> bool:
+    fields = record.get("fields") or {}
+    return all(_norm(fields.get(k)) == _norm(v) for k, v in equalities.items())
+
+
+def _copy(record: dict) -> dict:
+    return {**record, "fields": dict(record.get("fields") or {})}
+
+
+def apply_options(
+    records: List[dict],
+    fields: Optional[List[str]] = None,
+    sort: Optional[List[str]] = None,
+    max_records: Optional[int] = None,
+) -> List[dict]:
+    """
+    Projection / tri / limite appliqués localement, comme Airtable
+    (champs vides en dernier, tri stable multi-clés).
+    """
+    records = list(records)
+    for key in reversed(sort or []):
+        name = key.lstrip("-")
+        filled = [r for r in records if r["fields"].get(name) not in (None, "")]
+        empty = [r for r in records if r["fields"].get(name) in (None, "")]
+        filled.sort(key=lambda r: r["fields"][name], reverse=key.startswith("-"))
+        records = filled + empty
+    if max_records:
+        records = records[:max_records]
+    if fields:
+        records = [
+            {**r, "fields": {k: v for k, v in r["fields"].items() if k in fields}}
+            for r in records
+        ]
+    return records
+
+
+def _index(records: Iterable[dict], field: str) -> Optional[Dict[Any, List[dict]]]:
+    index: Dict[Any, List[dict]] = {}
+    for rec in records:
+        value = (rec.get("fields") or {}).get(field)
+        if not _scalar(value):
+            return None
+        index.setdefault(_norm(value), []).append(rec)
+    return index
+
+
+class KeyIndex:
+    """
+    Index mémoire par table, alimenté par les lectures complètes
+    (list_all sans filtre) : les requêtes d'égalité suivantes sur la
+    même table sont servies sans appel Airtable tant que la lecture
+    est plus récente que le TTL de la table. Invalidé à l'écriture.
+    Champ liste dans la table → requête laissée à Airtable.
+    """
+
+    def __init__(self, ttl_for: Callable[[str], float]):
+        self.ttl_for = ttl_for
+        self._lock = threading.Lock()
+        # table_id → (expires_at, records, {champ: {clé: [records]} | None si champ liste})
+        self._tables: Dict[str, Tuple[float, Tuple[dict, ...], Dict[str, Optional[Dict[Any, List[dict]]]]]] = {}
+
+        self.hits = 0
+        self.misses = 0
+
+    def store(self, table_id: str, records: Iterable[dict]) -> None:
+        ttl = self.ttl_for(table_id)
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._tables[table_id] = (time.monotonic() + ttl, tuple(records), {})
+
+    def invalidate(self, table_id: str) -> None:
+        with self._lock:
+            self._tables.pop(table_id, None)
+
+    def lookup(self, table_id: str, equalities: Dict[str, Any]) -> Optional[List[dict]]:
+        """
+        Copies des records satisfaisant les égalités, ou None si la table
+        n'est pas indexée ou qu'un champ comparé y est une liste.
+        """
+        with self._lock:
+            entry = self._tables.get(table_id)
+            if entry is None or entry[0] <= time.monotonic():
+                self._tables.pop(table_id, None)
+                self.misses += 1
+                return None
+
+            _, records, indexes = entry
+            if not equalities:
+                self.hits += 1
+                return [_copy(r) for r in records]
+
+            # Index construits à la demande, un par champ comparé
+            for field in equalities:
+                if field not in indexes:
+                    indexes[field] = _index(records, field)
+            if any(indexes[field] is None for field in equalities):
+                self.misses += 1
+                return None
+
+            # Le premier champ réduit les candidats
+            first, *rest = equalities.items()
+            self.hits += 1
+            candidates = indexes[first[0]].get(_norm(first[1]), [])
+            return [_copy(r) for r in candidates if matches(r, dict(rest))]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "tables": len(self._tables),
+                "hits": self.hits,
+                "misses": self.misses,
+                "templates": template_stats(),
+            }
@@ -0,0 +1,369 @@
+# services/airtable_scheduler.py
+# =====================================================
+# Ordonnanceur des appels sortants Airtable
+# - token bucket par base (5 req/s par défaut, limite Airtable)
+# - file d'attente équitable entre tables (round-robin)
+# - retry 429 / 5xx avec backoff exponentiel + jitter
+# - pénalité globale de la base après un 429 (30 s côté Airtable)
+# - métriques : profondeur de file, temps d'attente, retries
+#
+# Branché au niveau HTTP (adapter requests) : TOUT appel fait via
+# le registre de clients passe par ici, quel que soit l'appelant.
+# Le client asyncio (airtable_async) partage le même ordonnanceur
+# via acquire_async().
+# =====================================================
+
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+from requests.adapters import HTTPAdapter
+
+from core.utils.logger import log_info, log_error
+from services.airtable_breaker import CircuitBreaker
+from services.airtable_io import check_budget, operation_for, record_call
+
+
+RETRYABLE_5XX = (500, 502, 503, 504)
+
+# Méthodes rejouables sur 5xx (un POST de création pourrait être dupliqué)
+IDEMPOTENT_METHODS = ("GET", "HEAD", "PATCH", "PUT", "DELETE")
+
+# Intervalle de réexamen de la file pour les attentes asyncio
+ASYNC_POLL_S = 0.02
+
+
+def table_from_url(url: str) -> str:
+    """
+    /v0/<base_id>/<table>/... → <table> (clé d'équité de la file).
+    """
+    parts = [p for p in urlparse(url).path.split("/") if p]
+    if len(parts) >= 3 and parts[0] == "v0":
+        return parts[2]
+    return "_other"
+
+
+def has_record_segment(url: str) -> bool:
+    """
+    /v0/<base_id>/<table>/<record_id | listRecords> ?
+    """
+    parts = [p for p in urlparse(url).path.split("/") if p]
+    return len(parts) >= 4
+
+
+class AirtableScheduler:
+    """
+    Token bucket + file équitable par table pour UNE base Airtable.
+    """
+
+    def __init__(
+        self,
+        rate: float = 5.0,
+        burst: Optional[float] = None,
+        max_retries: int = 5,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+        penalty_s: float = 30.0,
+    ):
+        self.rate = rate
+        self.burst = burst if burst is not None else rate
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.penalty_s = penalty_s
+
+        self._cond = threading.Condition()
+        self._tokens = self.burst
+        self._last_refill = time.monotonic()
+        self._blocked_until = 0.0
+
+        # table → file de tickets en attente ; rotation = ordre de service
+        self._queues: Dict[str, deque] = {}
+        self._rotation: deque = deque()
+
+        # Métriques
+        self.requests = 0
+        self.retries = 0
+        self.throttled = 0
+        self.server_errors = 0
+        self.total_wait_s = 0.0
+        self.max_wait_s = 0.0
+        self.max_queue_depth = 0
+
+    # ---------------------------------------------------------
+    # Token bucket (appelé sous verrou)
+    # ---------------------------------------------------------
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._last_refill
+        if elapsed > 0:
+            self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+            self._last_refill = now
+
+    def _next_ready_in(self, now: float) -> float:
+        if now < self._blocked_until:
+            return self._blocked_until - now
+        if self._tokens >= 1:
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+    def _queue_depth(self) -> int:
+        return sum(len(q) for q in self._queues.values())
+
+    # ---------------------------------------------------------
+    # File équitable
+    # ---------------------------------------------------------
+    def _enqueue(self, table: str) -> deque:
+        queue = self._queues.setdefault(table, deque())
+        if table not in self._rotation:
+            self._rotation.append(table)
+        return queue
+
+    def _try_take(self, table: str, queue: deque, ticket: object) -> Tuple[bool, Optional[float]]:
+        """
+        Tente de servir `ticket` (sous verrou).
+        Retourne (servi, attente conseillée ; None = pas notre tour).
+        """
+        now = time.monotonic()
+        self._refill(now)
+        wait = self._next_ready_in(now)
+
+        my_turn = self._rotation[0] == table and queue[0] is ticket
+        if not my_turn:
+            return False, None
+        if wait > 0:
+            return False, wait
+
+        self._tokens -= 1
+        queue.popleft()
+        self._rotation.popleft()
+        if queue:
+            # Encore des requêtes sur cette table : retour en fin de tour
+            self._rotation.append(table)
+        else:
+            del self._queues[table]
+        self._cond.notify_all()
+        return True, 0.0
+
+    def _record_wait(self, start: float) -> float:
+        waited = time.monotonic() - start
+        self.requests += 1
+        self.total_wait_s += waited
+        self.max_wait_s = max(self.max_wait_s, waited)
+        return waited
+
+    def acquire(self, table: str) -> float:
+        """
+        Bloque jusqu'à obtenir un jeton pour `table`.
+        Les tables en attente sont servies à tour de rôle.
+        Retourne le temps d'attente (secondes).
+        """
+        ticket = object()
+        start = time.monotonic()
+
+        with self._cond:
+            queue = self._enqueue(table)
+            queue.append(ticket)
+            self.max_queue_depth = max(self.max_queue_depth, self._queue_depth())
+
+            while True:
+                taken, wait = self._try_take(table, queue, ticket)
+                if taken:
+                    return self._record_wait(start)
+                self._cond.wait(timeout=wait)
+
+    async def acquire_async(self, table: str) -> float:
+        """
+        Équivalent asyncio de acquire() : même bucket, même file équitable,
+        mais l'attente rend la main à la boucle d'événements.
+        """
+        ticket = object()
+        start = time.monotonic()
+
+        with self._cond:
+            queue = self._enqueue(table)
+            queue.append(ticket)
+            self.max_queue_depth = max(self.max_queue_depth, self._queue_depth())
+
+        try:
+            while True:
+                with self._cond:
+                    taken, wait = self._try_take(table, queue, ticket)
+                    if taken:
+                        return self._record_wait(start)
+                # Pas de notification côté asyncio : on repasse à intervalle court
+                await asyncio.sleep(min(wait, ASYNC_POLL_S) if wait is not None else ASYNC_POLL_S)
+        except BaseException:
+            # Requête annulée : on libère sa place dans la file
+            with self._cond:
+                if ticket in queue:
+                    queue.remove(ticket)
+                    if not queue:
+                        self._queues.pop(table, None)
+                        if table in self._rotation:
+                            self._rotation.remove(table)
+                    self._cond.notify_all()
+            raise
+
+    # ---------------------------------------------------------
+    # Retours Airtable
+    # ---------------------------------------------------------
+    def count(self, metric: str) -> None:
+        with self._cond:
+            setattr(self, metric, getattr(self, metric) + 1)
+
+    def penalize(self, seconds: Optional[float] = None) -> None:
+        """
+        429 reçu : la base entière est gelée (Airtable pénalise 30 s).
+        """
+        seconds = self.penalty_s if seconds is None else seconds
+        with self._cond:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+            self._tokens = 0
+            self.throttled += 1
+            self._cond.notify_all()
+
+    def backoff(self, attempt: int) -> float:
+        """
+        Backoff exponentiel avec jitter (« full jitter » borné).
+        """
+        ceiling = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return random.uniform(ceiling / 2, ceiling)
+
+    # ---------------------------------------------------------
+    # Observabilité
+    # ---------------------------------------------------------
+    def stats(self) -> dict:
+        with self._cond:
+            now = time.monotonic()
+            return {
+                "rate_per_s": self.rate,
+                "burst": self.burst,
+                "queue_depth": self._queue_depth(),
+                "queue_by_table": {t: len(q) for t, q in self._queues.items()},
+                "max_queue_depth": self.max_queue_depth,
+                "blocked_for_s": round(max(0.0, self._blocked_until - now), 3),
+                "requests": self.requests,
+                "retries": self.retries,
+                "throttled_429": self.throttled,
+                "server_errors_5xx": self.server_errors,
+                "total_wait_s": round(self.total_wait_s, 3),
+                "avg_wait_s": round(self.total_wait_s / self.requests, 4) if self.requests else 0.0,
+                "max_wait_s": round(self.max_wait_s, 3),
+            }
+
+
+class ScheduledHTTPAdapter(HTTPAdapter):
+    """
+    Adapter requests : chaque envoi attend son jeton, puis
+    rejoue les 429 / 5xx selon la politique du scheduler.
+    Le disjoncteur de la base refuse les envois quand Airtable est tombé.
+    """
+
+    def __init__(self, scheduler: AirtableScheduler, breaker: Optional[CircuitBreaker] = None, **kwargs):
+        self.scheduler = scheduler
+        self.breaker = breaker
+        super().__init__(**kwargs)
+
+    def _give_up(self) -> bool:
+        # Disjoncteur ouvert (ou sonde en cours) : pas de retry
+        return self.breaker is not None and self.breaker.is_open
+
+    def send(self, request, **kwargs):
+        scheduler = self.scheduler
+        table = table_from_url(request.url)
+        method = (request.method or "GET").upper()
+        body = request.body.encode() if isinstance(request.body, str) else (request.body or b"")
+        operation = operation_for(method, has_record_segment(request.url), b"performUpsert" in body)
+        attempt = 0
+        wait_s = 0.0
+        duration_s = 0.0
+
+        # Budget de la requête en cours (sans effet hors requête)
+        check_budget(table, operation)
+        if self.breaker is not None:
+            self.breaker.before_call()
+
+        while True:
+            wait_s += scheduler.acquire(table)
+
+            started = time.monotonic()
+            try:
+                response = super().send(request, **kwargs)
+            except Exception as e:
+                duration_s += time.monotonic() - started
+                if attempt >= scheduler.max_retries or method not in IDEMPOTENT_METHODS or self._give_up():
+                    if self.breaker is not None:
+                        self.breaker.record_failure(e)
+                    raise
+                attempt += 1
+                scheduler.count("retries")
+                time.sleep(scheduler.backoff(attempt))
+                continue
+
+            duration_s += time.monotonic() - started
+            status = response.status_code
+
+            if status == 429 and attempt < scheduler.max_retries:
+                retry_after = _retry_after(response)
+                scheduler.penalize(retry_after)
+                log_error(
+                    f"429 Airtable sur '{table}' → base gelée "
+                    f"{retry_after if retry_after is not None else scheduler.penalty_s}s",
+                    module="AirtableScheduler",
+                )
+                response.close()
+                attempt += 1
+                scheduler.count("retries")
+                # Le jitter évite que toutes les requêtes gelées repartent ensemble
+                time.sleep(scheduler.backoff(attempt) / 4)
+                continue
+
+            if (
+                status in RETRYABLE_5XX
+                and method in IDEMPOTENT_METHODS
+                and attempt < scheduler.max_retries
+                and not self._give_up()
+            ):
+                scheduler.count("server_errors")
+                response.close()
+                attempt += 1
+                scheduler.count("retries")
+                delay = scheduler.backoff(attempt)
+                log_info(
+                    f"{status} Airtable sur '{table}' → retry {attempt} dans {delay:.2f}s",
+                    module="AirtableScheduler",
+                )
+                time.sleep(delay)
+                continue
+
+            if self.breaker is not None:
+                # 429 encore présent après tous les retries : échec, pas un succès
+                if status >= 500 or status == 429:
+                    self.breaker.record_failure(f"HTTP {status}")
+                else:
+                    self.breaker.record_success()
+
+            record_call(
+                table,
+                operation,
+                bytes_out=len(body),
+                bytes_in=len(response.content),
+                wait_s=wait_s,
+                duration_s=duration_s,
+                retries=attempt,
+            )
+            return response
+
+
+def _retry_after(response) -> Optional[float]:
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
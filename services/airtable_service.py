@@ -1,16 +1,129 @@
 # services/airtable_service.py
 
+import contextvars
 import os
 import logging
 import requests
-from pyairtable import Table
+from concurrent.futures import ThreadPoolExecutor
 from core.utils.logger import log_info, log_warning, log_error
 from services.airtable_tables import ATABLES
+from services.airtable_client import registry
+from services.airtable_breaker import CircuitOpenError
+from services.airtable_cache import FRESH, REVALIDATE, key_index, last_known_good, record_cache
+from services.airtable_io import IOBudgetExceeded, fallback_allowed, record_fallback, record_hit
+from services.airtable_mirror import airtable_mirror
+from services.airtable_query import Query, apply_options, matches, scalar_fields, to_formula
+from services.airtable_singleflight import query_key, single_flight
+from services.reference_data import reference_store
 
 # 👉 On utilise UNIQUEMENT ce référentiel (IDs Airtable)
 from services.airtable_tables import ATABLES
 from core.config import config  # AJOUT
 
+# ---------------------------------------------------------
+# Dernière donnée connue (budget épuisé / Airtable indisponible)
+# ---------------------------------------------------------
+def _mark_stale(record: dict) -> dict:
+    return {**record, "stale": True}
+
+
+def stale_record(table_id: str, record_id: str):
+    """
+    Entrée de cache expirée, sinon réplique quel que soit son âge,
+    marquée "stale". None si la donnée n'a jamais été lue.
+    """
+    stale = record_cache.get_stale(table_id, record_id)
+    if stale is None:
+        stale = airtable_mirror.get(table_id, record_id, max_staleness=float("inf"))
+    if stale is None:
+        return None
+    record_fallback()
+    return _mark_stale(stale)
+
+
+def stale_query(table_id: str, key: tuple):
+    """
+    Dernier résultat connu d'une requête de liste (query_key), marqué "stale".
+    """
+    stale = last_known_good.get_stale(table_id, key)
+    if stale is None:
+        return None
+    record_fallback()
+    return [_mark_stale(r) for r in stale]
+
+
+# ---------------------------------------------------------
+# Requêtes d'égalité servies en mémoire (sans appel Airtable)
+# ---------------------------------------------------------
+def answer_locally(
+    table_id: str,
+    formula,
+    fields: list | None = None,
+    sort: list | None = None,
+    max_records: int | None = None,
+):
+    """
+    Query d'égalités pure (and_(eq(…), …)) sur une table déjà en
+    mémoire : index des lectures complètes, référentiel, réplique.
+    None si la requête doit partir chez Airtable (dont champ liste).
+    """
+    if not isinstance(formula, Query):
+        return None
+    equalities = formula.equalities()
+    if equalities is None:
+        return None
+
+    records = key_index.lookup(table_id, equalities)
+
+    if records is None:
+        reference = reference_store.loaded_table(table_id)
+        if reference is not None and scalar_fields(reference.records, equalities):
+            records = [
+                {"id": r["id"], "createdTime": r["createdTime"], "fields": dict(r["fields"])}
+                for r in reference.records
+                if matches(r, equalities)
+            ]
+
+    if records is None:
+        mirrored = airtable_mirror.all(table_id)
+        if mirrored is not None and scalar_fields(mirrored, equalities):
+            records = [r for r in mirrored if matches(r, equalities)]
+
+    if records is None:
+        return None
+
+    record_hit("index")
+    return apply_options(records, fields=fields, sort=sort, max_records=max_records)
+
+
+# Rafraîchissements stale-while-revalidate (hors requête : non comptés dans son budget)
+_REVALIDATE_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="airtable-swr")
+
+
+def _revalidate_record(base_id: str, table, table_id: str, record_id: str) -> None:
+    if not record_cache.begin_revalidate(table_id, record_id):
+        return
+
+    def _refresh():
+        try:
+            record = single_flight.do(
+                query_key("record", base_id, table_id, record_id=record_id),
+                lambda: table.get(record_id),
+            )
+            record_cache.set(table_id, record_id, record)
+        except CircuitOpenError:
+            pass
+        except Exception as e:
+            log_error(
+                f"Rafraîchissement en fond de {table_id}/{record_id} en échec : {e}",
+                module="AirtableService",
+            )
+        finally:
+            record_cache.end_revalidate(table_id, record_id)
+
+    _REVALIDATE_POOL.submit(_refresh)
+
+
 class AirtableService:
     def __init__(self):
         from core.config import config
@@ -35,32 +148,48 @@ class AirtableService:
     # Compatibilité SCN_1 + Cache local (FAST)
     # ----------------------------------------------------
 
-    # Cache simple en mémoire (clé = "record:<id>")
-    _RECORD_CACHE = {}
-
-    def iterate_records(self):
-        """Retourne tous les enregistrements de la table avec pagination."""
-        if not self.table_id:
-            raise ValueError("La table Airtable n'est pas définie. Appelle set_table() d'abord.")
-
-        all_records = []
-        params = {}
+    # Cache borné partagé (TTL par table, LRU, invalidé à l'écriture)
+    _RECORD_CACHE = record_cache
 
-        while True:
-            url = f"{self.API_URL}/{self.base_id}/{self.table_id}"
-            response = requests.get(url, headers=self.headers, params=params)
-            response.raise_for_status()
-            data = response.json()
+    # Limite Airtable : 10 records par requête d'écriture
+    BATCH_SIZE = 10
 
-            all_records.extend(data.get("records", []))
-
-            offset = data.get("offset")
-            if not offset:
-                break
-
-            params["offset"] = offset
+    def iterate_records(
+        self,
+        table_id: str | None = None,
+        formula: str | None = None,
+        fields: list | None = None,
+        sort: list | None = None,
+        page_size: int | None = None,
+        max_records: int | None = None,
+    ):
+        """
+        Générateur : records de la table, page par page (100 max par page).
+        Une seule page est en mémoire ; arrêter l'itération (break)
+        arrête les appels Airtable. Table active par défaut (set_table()).
+        """
+        for page in self.iterate_pages(
+            table_id,
+            formula=formula,
+            fields=fields,
+            sort=sort,
+            page_size=page_size,
+            max_records=max_records,
+        ):
+            yield from page
+
+    def iterate_pages(self, table_id: str | None = None, **options):
+        """
+        Générateur de pages brutes (listes de records), options pyairtable.
+        """
+        table_id = table_id or self.table_name
+        if not table_id:
+            raise ValueError("La table Airtable n'est pas définie. Appelle set_table() d'abord.")
 
-        return all_records
+        options = {k: v for k, v in options.items() if v is not None}
+        if "formula" in options:
+            options["formula"] = to_formula(options["formula"])
+        yield from self._table(table_id).iterate(**options)
 
     # -------------------------------
     # Lecture simple d’un record
@@ -74,6 +203,42 @@ class AirtableService:
                       module="AirtableService")
             return None
 
+    # ---------------------------------------------------------
+    # Handle Table partagé (registre process-wide, keep-alive)
+    # ---------------------------------------------------------
+    def _table(self, table_id: str):
+        return registry.table(table_id, base_id=self.base_id, api_key=self.api_key)
+
+    # ---------------------------------------------------------
+    # Lecture de liste dédupliquée (single-flight)
+    # ---------------------------------------------------------
+    def _all(self, table_id: str, **options) -> list:
+        """
+        table.all(**options) ; les appels concurrents identiques
+        (même table + mêmes options) partagent une seule requête.
+        """
+        options = {k: v for k, v in options.items() if v is not None}
+        table = self._table(table_id)
+        key = query_key("query", self.base_id, table_id, **options)
+
+        try:
+            records = single_flight.do(key, lambda: table.all(**options))
+        except IOBudgetExceeded:
+            raise
+        except Exception as e:
+            # Airtable lent / indisponible : dernier résultat connu
+            stale = stale_query(table_id, key)
+            if stale is None:
+                raise
+            log_error(
+                f"Airtable indisponible sur '{table_id}' → {len(stale)} records périmés servis : {e}",
+                module="AirtableService",
+            )
+            return stale
+
+        last_known_good.set(table_id, key, records)
+        return records
+
     # ---------------------------------------------------------
     # Changer de table dynamiquement
     # ---------------------------------------------------------
@@ -82,7 +247,7 @@ class AirtableService:
         Change dynamiquement la table active.
         """
         self.table_name = table_id
-        self.table = Table(self.api_key, self.base_id, self.table_name)
+        self.table = self._table(self.table_name)
         log_info(
             f"AirtableService → connecté à la table '{self.table_name}'",
             module="AirtableService"
@@ -91,20 +256,43 @@ class AirtableService:
     # ---------------------------------------------------------
     # Lecture de TOUS les records d’une table (pyairtable)
     # ---------------------------------------------------------
-    def list_all(self, table_id: str) -> list:
+    def list_all(
+        self,
+        table_id: str,
+        fields: list | None = None,
+        sort: list | None = None,
+        max_records: int | None = None,
+        page_size: int | None = None,
+    ) -> list:
         """
         Retourne tous les enregistrements d'une table Airtable.
         Compatible pyairtable, pagination interne automatique.
+        Options transmises à Airtable (voir list_records).
         """
-        temp_table = Table(self.api_key, self.base_id, table_id)
+        # Réplique locale si activée et assez fraîche
+        mirrored = airtable_mirror.all(table_id, fields=fields, sort=sort, max_records=max_records)
+        if mirrored is not None:
+            record_hit("mirror")
+            return mirrored
 
         try:
-            records = temp_table.all()
+            records = self._all(
+                table_id,
+                fields=fields,
+                sort=sort,
+                max_records=max_records,
+                page_size=page_size,
+            )
+            # Table complète : les requêtes d'égalité suivantes sont servies en mémoire
+            if not fields and not max_records and not (records and records[0].get("stale")):
+                key_index.store(table_id, records)
             log_info(
                 f"AirtableService → {len(records)} records lus depuis '{table_id}'",
                 module="AirtableService"
             )
             return records
+        except IOBudgetExceeded:
+            raise
         except Exception as e:
             log_error(
                 f"Erreur Airtable list_all() sur '{table_id}' : {e}",
@@ -115,19 +303,41 @@ class AirtableService:
     # ---------------------------------------------------------
     # Lecture avec filtre Formula
     # ---------------------------------------------------------
-    def find_all(self, table_id: str, formula: str) -> list:
+    def find_all(
+        self,
+        table_id: str,
+        formula: "str | Query",
+        fields: list | None = None,
+        sort: list | None = None,
+        max_records: int | None = None,
+        page_size: int | None = None,
+    ) -> list:
         """
-        Retourne tous les enregistrements correspondant à une formule Airtable.
+        Retourne tous les enregistrements correspondant à une formule Airtable
+        (texte, ou Query compilée et échappée : services/airtable_query.py).
+        Options transmises à Airtable (voir list_records).
+        Une Query d'égalités sur une table déjà en mémoire n'appelle pas Airtable.
         """
-        temp_table = Table(self.api_key, self.base_id, table_id)
+        local = answer_locally(table_id, formula, fields=fields, sort=sort, max_records=max_records)
+        if local is not None:
+            return local
 
         try:
-            records = temp_table.all(formula=formula)
+            records = self._all(
+                table_id,
+                formula=to_formula(formula),
+                fields=fields,
+                sort=sort,
+                max_records=max_records,
+                page_size=page_size,
+            )
             log_info(
                 f"AirtableService → {len(records)} records filtrés depuis '{table_id}'",
                 module="AirtableService"
             )
             return records
+        except IOBudgetExceeded:
+            raise
         except Exception as e:
             log_error(
                 f"Erreur Airtable find_all() sur '{table_id}' : {e}",
@@ -151,22 +361,38 @@ class AirtableService:
     def list_records(
         self,
         table_id: str,
-        filter_by_formula: str | None = None,
+        filter_by_formula: "str | Query | None" = None,
+        fields: list | None = None,
+        sort: list | None = None,
+        max_records: int | None = None,
+        page_size: int | None = None,
     ) -> list:
         """
         Façade standard pour lister des records Airtable.
         Compatible avec SCN_SLOT_RESOLVER et futurs scénarios.
+
+        Options exécutées côté Airtable :
+        - fields      : projection (seuls ces champs sont renvoyés)
+        - sort        : ["Date_slot"] croissant, ["-Date_slot"] décroissant
+        - max_records : nombre max de records (pagination arrêtée au-delà)
+        - page_size   : taille de page (100 max)
         """
+        options = {
+            "fields": fields,
+            "sort": sort,
+            "max_records": max_records,
+            "page_size": page_size,
+        }
         if filter_by_formula:
-            return self.find_all(table_id, filter_by_formula)
-        return self.list_all(table_id)
+            return self.find_all(table_id, filter_by_formula, **options)
+        return self.list_all(table_id, **options)
 
     def get_session_types(self):
         """
         Retourne tous les records de la table 📘 Séances Types
         """
-        self.set_table(ATABLES.SEANCES_TYPES)
-        return self.get_all_records()
+        from services.reference_data import reference_store
+        return list(reference_store.records("seances_types"))
     
     # ---------------------------------------------------------
     # UPSERT générique (create si non trouvé, update sinon)
@@ -174,36 +400,110 @@ class AirtableService:
     def upsert_record(self, table_id: str, key_field: str, key_value: str, fields: dict):
         """
         Upsert générique SmartCoach :
-        - Cherche un record où key_field == key_value
+        - Airtable cherche un record où key_field == key_value
         - Update si trouvé
         - Sinon Create
+        Un seul appel (performUpsert), sans fenêtre de course lookup → write.
         Retourne le record Airtable final.
         """
 
         from core.utils.logger import log_info, log_error
 
         try:
-            # 1) Lire table
-            temp_table = Table(self.api_key, self.base_id, table_id)
-
-            # 2) Chercher record existant
-            formula = f"{{{key_field}}} = '{key_value}'"
-            matches = temp_table.all(formula=formula)
+            row = {**fields, key_field: key_value}
+            result = self.upsert_many(table_id, [key_field], [row])
 
-            if matches:
-                record_id = matches[0]["id"]
-                log_info(f"[Airtable UPSERT] Update → {table_id}/{record_id} ({key_field}={key_value})")
-                return temp_table.update(record_id, fields)
-
-            # 3) Sinon créer
-            fields[key_field] = key_value
-            log_info(f"[Airtable UPSERT] Create → {table_id} ({key_field}={key_value})")
-            return temp_table.create(fields)
+            action = "Create" if result["createdRecords"] else "Update"
+            log_info(f"[Airtable UPSERT] {action} → {table_id} ({key_field}={key_value})")
+            return result["records"][0]
 
         except Exception as e:
             log_error(f"[Airtable UPSERT] Erreur sur {table_id} : {e}")
             raise
-    
+
+    # ---------------------------------------------------------
+    # UPSERT par lots (performUpsert, 10 records / appel)
+    # ---------------------------------------------------------
+    def upsert_many(self, table_id: str, key_fields: list, rows: list) -> dict:
+        """
+        Upsert natif Airtable de plusieurs lignes :
+        - découpage en lots de 10 (limite Airtable)
+        - fusion sur key_fields (fieldsToMergeOn)
+        - lots envoyés en parallèle (concurrence bornée)
+
+        rows : liste de dicts de champs (chaque ligne contient les key_fields).
+        Retourne {"records", "createdRecords", "updatedRecords"} dans l'ordre des rows.
+        """
+        result = {"records": [], "createdRecords": [], "updatedRecords": []}
+        if not rows:
+            return result
+
+        for row in rows:
+            missing = [k for k in key_fields if row.get(k) in (None, "")]
+            if missing:
+                raise ValueError(f"upsert_many : clé(s) {missing} manquante(s) dans {row}")
+
+        table = self._table(table_id)
+        chunks = [
+            rows[i:i + self.BATCH_SIZE]
+            for i in range(0, len(rows), self.BATCH_SIZE)
+        ]
+
+        def _send(chunk):
+            return table.batch_upsert(
+                [{"fields": row} for row in chunk],
+                key_fields=list(key_fields),
+            )
+
+        workers = max(1, min(len(chunks), config.airtable_batch_concurrency))
+        if workers == 1:
+            responses = [_send(chunk) for chunk in chunks]
+        else:
+            # 1 copie de contexte par lot : le registre I/O de la requête suit les threads
+            contexts = [contextvars.copy_context() for _ in chunks]
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                responses = list(pool.map(lambda ctx, chunk: ctx.run(_send, chunk), contexts, chunks))
+
+        for response in responses:
+            result["records"].extend(response["records"])
+            result["createdRecords"].extend(response["createdRecords"])
+            result["updatedRecords"].extend(response["updatedRecords"])
+
+        for record in result["records"]:
+            self._RECORD_CACHE.invalidate(table_id, record["id"])
+        airtable_mirror.apply(table_id, result["records"])
+        key_index.invalidate(table_id)
+
+        log_info(
+            f"[Airtable UPSERT_MANY] {table_id} → {len(rows)} lignes, {len(chunks)} appel(s) "
+            f"(created={len(result['createdRecords'])}, updated={len(result['updatedRecords'])})",
+            module="AirtableService",
+        )
+        return result
+
+    # ---------------------------------------------------------
+    # UPDATE par lots (PATCH par record_id, 10 records / appel)
+    # ---------------------------------------------------------
+    def update_many(self, table_id: str, records: list) -> list:
+        """
+        records : [{"id": record_id, "fields": {...}}, …]
+        """
+        if not records:
+            return []
+
+        updated = self._table(table_id).batch_update(records)
+
+        for record in updated:
+            self._RECORD_CACHE.invalidate(table_id, record["id"])
+        airtable_mirror.apply(table_id, updated)
+        key_index.invalidate(table_id)
+
+        log_info(
+            f"[Airtable UPDATE_MANY] {table_id} → {len(records)} records",
+            module="AirtableService",
+        )
+        return updated
+
     # ---------------------------------------------------------
     #   Lecture d’un record dans une table donnée.
     #    Compatible SCN_1 / RCTC v2025-12.
@@ -211,24 +511,57 @@ class AirtableService:
     # ---------------------------------------------------------
     def get_record(self, table_id: str, record_id: str):
 
-        cache_key = f"{table_id}:{record_id}"
-
-        # 1) Retour immédiat si déjà en cache
-        if cache_key in self._RECORD_CACHE:
-            return self._RECORD_CACHE[cache_key]
+        # 1) Retour immédiat si déjà en cache (et non expiré)
+        cached, state = self._RECORD_CACHE.lookup(table_id, record_id)
+        if state == FRESH:
+            record_hit("cache")
+            return cached
+
+        # 1bis) Réplique locale (si activée et assez fraîche)
+        mirrored = airtable_mirror.get(table_id, record_id)
+        if mirrored is not None:
+            record_hit("mirror")
+            return mirrored
+
+        # 1ter) Expiré depuis peu : servi tel quel, rafraîchi en fond
+        if state == REVALIDATE:
+            record_hit("swr")
+            _revalidate_record(self.base_id, self._table(table_id), table_id, record_id)
+            return cached
+
+        # 1quater) Budget de la requête épuisé → donnée périmée plutôt que rien
+        if fallback_allowed():
+            stale = stale_record(table_id, record_id)
+            if stale is not None:
+                return stale
 
         # 2) Sélection dynamique de la table
         self.set_table(table_id)
 
         try:
-            record = self.table.get(record_id)
+            # Lectures concurrentes du même record → un seul GET
+            table = self.table
+            record = single_flight.do(
+                query_key("record", self.base_id, table_id, record_id=record_id),
+                lambda: table.get(record_id),
+            )
 
             # 3) Mise en cache
-            self._RECORD_CACHE[cache_key] = record
+            self._RECORD_CACHE.set(table_id, record_id, record)
 
             return record
 
+        except IOBudgetExceeded:
+            raise
         except Exception as e:
+            # Airtable lent / indisponible : dernière donnée connue
+            stale = stale_record(table_id, record_id)
+            if stale is not None:
+                log_error(
+                    f"[AirtableService] Airtable indisponible → {table_id}/{record_id} périmé servi : {e}",
+                    module="AirtableService"
+                )
+                return stale
             log_error(
                 f"[AirtableService] Erreur get_record sur {table_id}/{record_id} : {e}",
                 module="AirtableService"
@@ -253,7 +586,14 @@ class AirtableService:
                 module="AirtableService"
             )
 
-            return self.table.update(record_id, fields)
+            record = self.table.update(record_id, fields)
+
+            # Invalidation après écriture : la prochaine lecture
+            # relit la version à jour (ex. 📅 Jours_final SCN_1)
+            self._RECORD_CACHE.invalidate(table_id, record_id)
+            airtable_mirror.apply(table_id, [record])
+            key_index.invalidate(table_id)
+            return record
 
         except Exception as e:
             log_error(
@@ -0,0 +1,136 @@
+# services/airtable_singleflight.py
+# =====================================================
+# Single-flight des lectures Airtable
+# - N lectures concurrentes identiques (même table + record,
+#   ou même table + formule + options) = 1 seul appel HTTP
+# - les appelants suivants attendent et partagent le résultat
+#   (ou l'exception) du premier
+# - asyncio : l'appel partagé tourne dans sa propre tâche ;
+#   l'annulation d'un appelant (meneur compris, ex. client
+#   déconnecté) ne l'annule pas pour les autres
+# - variantes threads (client sync) et asyncio (client httpx)
+# - compteurs : appels menés / appels coalescés
+# =====================================================
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from services.airtable_io import record_hit
+
+
+class _Call:
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Déduplication des appels concurrents par clé.
+    Rien n'est conservé une fois l'appel terminé (ce n'est pas un cache).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._futures: Dict[Hashable, asyncio.Task] = {}
+
+        self.leaders = 0
+        self.coalesced = 0
+
+    # ---------------------------------------------------------
+    # Threads (AirtableService)
+    # ---------------------------------------------------------
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+                self.leaders += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            record_hit("coalesced")
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+
+    # ---------------------------------------------------------
+    # asyncio (AsyncAirtableService)
+    # ---------------------------------------------------------
+    async def do_async(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        # Une tâche n'est attendable que depuis sa boucle
+        loop = asyncio.get_running_loop()
+        loop_key = (id(loop), key)
+
+        with self._lock:
+            task = self._futures.get(loop_key)
+            leader = task is None
+            if leader:
+                task = loop.create_task(fn())
+                task.add_done_callback(lambda t: self._task_done(loop_key, t))
+                self._futures[loop_key] = task
+                self.leaders += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            record_hit("coalesced")
+        # shield : l'annulation d'un appelant (meneur ou suiveur)
+        # n'annule pas l'appel partagé
+        return await asyncio.shield(task)
+
+    def _task_done(self, loop_key: Hashable, task: asyncio.Task) -> None:
+        with self._lock:
+            if self._futures.get(loop_key) is task:
+                del self._futures[loop_key]
+        # Évite l'avertissement « exception never retrieved » sans appelant
+        task.cancelled() or task.exception()
+
+    # ---------------------------------------------------------
+    # Observabilité
+    # ---------------------------------------------------------
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.leaders + self.coalesced
+            return {
+                "in_flight": len(self._calls) + len(self._futures),
+                "leaders": self.leaders,
+                "coalesced": self.coalesced,
+                "coalesced_ratio": round(self.coalesced / total, 3) if total else 0.0,
+            }
+
+
+def query_key(kind: str, base_id: str, table_id: str, **options) -> tuple:
+    """
+    Clé canonique d'une lecture : options triées, listes figées.
+    """
+    frozen = tuple(sorted(
+        (k, tuple(v) if isinstance(v, list) else v)
+        for k, v in options.items()
+        if v is not None
+    ))
+    return (kind, base_id, table_id, frozen)
+
+
+# Instance unique pour tout le process
+single_flight = SingleFlight()
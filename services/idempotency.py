@@ -0,0 +1,354 @@
+# services/idempotency.py
+# =====================================================
+# Idempotency-Key (relances Make sur timeout)
+# - clé de requête → réponse, persistée en SQLite (WAL) : partagée
+#   entre workers d'une même machine, survit à un redémarrage
+# - 1re requête : exécutée, réponse enregistrée (TTL)
+# - doublon en cours : attend la fin de l'original, puis rejoue ;
+#   au-delà de wait_timeout → 409 (l'original n'est jamais relancé
+#   tant qu'il n'est pas considéré abandonné : stale_after)
+# - doublon terminé : réponse rejouée sans ré-exécution
+#   (en-tête Idempotent-Replayed: true)
+# - même clé, corps différent : 422 (clé réutilisée)
+# - exception ou résultat en erreur (success False, status
+#   "error"…) : rien n'est enregistré, la relance ré-exécute
+#
+# Sans en-tête Idempotency-Key : aucun effet.
+# =====================================================
+
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from core.config import BASE_DIR, config
+from core.utils.logger import log_info
+
+PENDING = "pending"
+DONE = "done"
+
+# Résultat de begin()
+LEADER = "leader"
+REPLAY = "replay"
+WAIT = "wait"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS idempotency (
+    key          TEXT PRIMARY KEY,
+    fingerprint  TEXT NOT NULL,
+    status       TEXT NOT NULL,
+    status_code  INTEGER,
+    response     TEXT,
+    started_at   REAL NOT NULL,
+    expires_at   REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idempotency_expires ON idempotency (expires_at);
+"""
+
+
+class IdempotencyConflict(ValueError):
+    """
+    Clé déjà utilisée pour une requête différente.
+    """
+
+
+class IdempotencyInProgress(RuntimeError):
+    """
+    L'original n'a pas terminé dans le délai d'attente.
+    """
+
+
+def fingerprint(body: Any) -> str:
+    canonical = json.dumps(jsonable_encoder(body), sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class IdempotencyStore:
+    """
+    Registre clé → réponse (SQLite, 1 connexion, verrou).
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        ttl: float = 86400,
+        wait_timeout: float = 60,
+        poll_interval: float = 0.05,
+        stale_after: float = 900,
+    ):
+        self.path = Path(path)
+        self.ttl = ttl
+        # Attente max d'un doublon (puis 409)
+        self.wait_timeout = wait_timeout
+        # Au-delà, une entrée "pending" est considérée abandonnée (worker tombé)
+        self.stale_after = max(stale_after, wait_timeout)
+        self.poll_interval = poll_interval
+
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        # Réveil immédiat des doublons du même process
+        self._events: Dict[str, threading.Event] = {}
+
+        self.executed = 0
+        self.replayed = 0
+        self.waited = 0
+        self.conflicts = 0
+        self._last_purge = 0.0
+
+    # ---------------------------------------------------------
+    # Connexion
+    # ---------------------------------------------------------
+    def _db(self) -> sqlite3.Connection:
+        # Appelé sous verrou
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _purge(self, db: sqlite3.Connection, now: float) -> None:
+        if now - self._last_purge > 60:
+            db.execute("DELETE FROM idempotency WHERE expires_at < ?", (now,))
+            self._last_purge = now
+
+    # ---------------------------------------------------------
+    # Cycle d'une requête
+    # ---------------------------------------------------------
+    def begin(self, key: str, fp: str) -> Tuple[str, Optional[Tuple[int, Any]]]:
+        """
+        LEADER (à exécuter), REPLAY + (status_code, réponse), ou WAIT.
+        """
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            self._purge(db, now)
+            row = db.execute(
+                "SELECT fingerprint, status, status_code, response, started_at, expires_at "
+                "FROM idempotency WHERE key = ?",
+                (key,),
+            ).fetchone()
+
+            if row is not None:
+                fp_stored, status, status_code, response, started_at, expires_at = row
+                if fp_stored != fp and expires_at > now:
+                    self.conflicts += 1
+                    raise IdempotencyConflict(key)
+                if status == DONE and expires_at > now:
+                    self.replayed += 1
+                    return REPLAY, (status_code, json.loads(response))
+                # Original en cours dans ce process : jamais repris
+                if status == PENDING and (key in self._events or now - started_at < self.stale_after):
+                    return WAIT, None
+
+            # Nouvelle clé, entrée expirée ou original abandonné
+            db.execute(
+                "INSERT OR REPLACE INTO idempotency (key, fingerprint, status, started_at, expires_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, fp, PENDING, now, now + self.ttl),
+            )
+            db.commit()
+            self._events[key] = threading.Event()
+            self.executed += 1
+            return LEADER, None
+
+    def complete(self, key: str, status_code: int, response: Any) -> None:
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            db.execute(
+                "UPDATE idempotency SET status = ?, status_code = ?, response = ?, expires_at = ? WHERE key = ?",
+                (DONE, status_code, json.dumps(response, ensure_ascii=False), now + self.ttl, key),
+            )
+            db.commit()
+            event = self._events.pop(key, None)
+        if event is not None:
+            event.set()
+
+    def abort(self, key: str) -> None:
+        with self._lock:
+            db = self._db()
+            db.execute("DELETE FROM idempotency WHERE key = ? AND status = ?", (key, PENDING))
+            db.commit()
+            event = self._events.pop(key, None)
+        if event is not None:
+            event.set()
+
+    def _poll(self, key: str, fp: str, deadline: float) -> Tuple[str, Optional[Tuple[int, Any]]]:
+        if time.time() > deadline:
+            raise IdempotencyInProgress(key)
+        return self.begin(key, fp)
+
+    def wait(self, key: str, fp: str) -> Tuple[str, Optional[Tuple[int, Any]]]:
+        """
+        Attend l'original (threads) puis REPLAY, ou LEADER s'il a échoué.
+        """
+        self.waited += 1
+        deadline = time.time() + self.wait_timeout
+        while True:
+            with self._lock:
+                event = self._events.get(key)
+            if event is not None:
+                event.wait(self.poll_interval)
+            else:
+                time.sleep(self.poll_interval)
+            outcome = self._poll(key, fp, deadline)
+            if outcome[0] != WAIT:
+                return outcome
+
+    async def wait_async(self, key: str, fp: str) -> Tuple[str, Optional[Tuple[int, Any]]]:
+        self.waited += 1
+        deadline = time.time() + self.wait_timeout
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            outcome = self._poll(key, fp, deadline)
+            if outcome[0] != WAIT:
+                return outcome
+
+    def stats(self) -> dict:
+        with self._lock:
+            db = self._db()
+            pending, done = db.execute(
+                "SELECT COALESCE(SUM(status = ?), 0), COALESCE(SUM(status = ?), 0) FROM idempotency",
+                (PENDING, DONE),
+            ).fetchone()
+        return {
+            "path": str(self.path),
+            "ttl_s": self.ttl,
+            "pending": pending,
+            "stored": done,
+            "executed": self.executed,
+            "replayed": self.replayed,
+            "waited": self.waited,
+            "conflicts": self.conflicts,
+        }
+
+
+# Instance unique pour tout le process
+idempotency_store = IdempotencyStore(
+    path=config.idempotency_path or BASE_DIR / "var" / f"idempotency_{config.env}.sqlite3",
+    ttl=config.idempotency_ttl_s,
+    wait_timeout=config.idempotency_wait_s,
+    stale_after=config.idempotency_stale_s,
+)
+
+
+# ---------------------------------------------------------
+# Routes FastAPI
+# ---------------------------------------------------------
+def _replay(scope: str, outcome: Tuple[int, Any]) -> JSONResponse:
+    status_code, response = outcome
+    log_info(f"{scope} : réponse rejouée (Idempotency-Key)", module="Idempotency")
+    return JSONResponse(content=response, status_code=status_code, headers={"Idempotent-Replayed": "true"})
+
+
+def _key(scope: str, idempotency_key: str) -> str:
+    return f"{scope}:{idempotency_key}"
+
+
+def _succeeded(response: Any) -> bool:
+    """
+    Réponse à conserver : pas d'échec signalé (InternalResult.to_dict,
+    {"ok": …} de CORE_3, ou résultat brut sans statut).
+    """
+    if not isinstance(response, dict):
+        return True
+    if "success" in response:
+        return response["success"] is True
+    if "ok" in response:
+        return response["ok"] is True
+    if "status" in response:
+        return response["status"] == "ok"
+    return True
+
+
+def _finish(key: str, response: Any) -> Any:
+    # Erreur (Airtable indisponible…) : la relance Make doit pouvoir ré-exécuter
+    if _succeeded(response):
+        idempotency_store.complete(key, 200, response)
+    else:
+        idempotency_store.abort(key)
+    return response
+
+
+def _http_error(scope: str, error: Exception) -> HTTPException:
+    if isinstance(error, IdempotencyConflict):
+        return HTTPException(
+            status_code=422,
+            detail={"code": "IDEMPOTENCY_KEY_REUSED", "message": f"{scope} : clé déjà utilisée pour une autre requête"},
+        )
+    return HTTPException(
+        status_code=409,
+        detail={"code": "IDEMPOTENCY_IN_PROGRESS", "message": f"{scope} : requête d'origine toujours en cours"},
+    )
+
+
+def idempotent(scope: str, idempotency_key: Optional[str], body: Any, fn: Callable[[], Any]) -> Any:
+    """
+    Exécute fn() une seule fois par Idempotency-Key (routes sync).
+    """
+    if not idempotency_key:
+        return fn()
+
+    key, fp = _key(scope, idempotency_key), fingerprint(body)
+    try:
+        outcome, stored = idempotency_store.begin(key, fp)
+        if outcome == WAIT:
+            outcome, stored = idempotency_store.wait(key, fp)
+    except (IdempotencyConflict, IdempotencyInProgress) as e:
+        raise _http_error(scope, e)
+    if outcome == REPLAY:
+        return _replay(scope, stored)
+
+    try:
+        response = jsonable_encoder(fn())
+    except BaseException:
+        idempotency_store.abort(key)
+        raise
+    return _finish(key, response)
+
+
+async def idempotent_async(
+    scope: str,
+    idempotency_key: Optional[str],
+    body: Any,
+    fn: Callable[[], Awaitable[Any]],
+) -> Any:
+    """
+    Pendant asyncio de idempotent() (routes async).
+    """
+    if not idempotency_key:
+        return await fn()
+
+    key, fp = _key(scope, idempotency_key), fingerprint(body)
+    try:
+        outcome, stored = idempotency_store.begin(key, fp)
+        if outcome == WAIT:
+            outcome, stored = await idempotency_store.wait_async(key, fp)
+    except (IdempotencyConflict, IdempotencyInProgress) as e:
+        raise _http_error(scope, e)
+    if outcome == REPLAY:
+        return _replay(scope, stored)
+
+    try:
+        response = jsonable_encoder(await fn())
+    except BaseException:
+        idempotency_store.abort(key)
+        raise
+    return _finish(key, response)
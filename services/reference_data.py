@@ -0,0 +1,288 @@
+# services/reference_data.py
+# =====================================================
+# Snapshot mémoire des tables de RÉFÉRENCE Airtable
+# (Séances Types, Mapping Phase, Réf Jours, VDOT, Niveaux…)
+#
+# - chargé une fois au démarrage de l'API
+# - rafraîchi en tâche de fond (intervalle configurable)
+# - structures indexées immuables, remplacées d'un bloc (swap atomique)
+#
+# Les chemins chauds lisent le snapshot courant : aucun appel Airtable.
+# =====================================================
+
+import threading
+import time
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, Iterator, Mapping, Optional, Tuple
+
+from core.config import config
+from core.utils.logger import log_info, log_error
+from services.airtable_client import registry
+from services.airtable_tables import ATABLES
+
+
+# Nom logique → ID de table Airtable
+REFERENCE_TABLES = {
+    "seances_types": ATABLES.SEANCES_TYPES_ID,
+    "vdot": ATABLES.VDOT_TABLE_ID,
+    "ref_jours": ATABLES.REF_JOURS_ID,
+    "mapping_phases": ATABLES.MAPPING_PHASES_ID,
+    "ref_categories_seances": ATABLES.REF_CATEGORIES_SEANCES_ID,
+    "ref_niveaux": ATABLES.REF_NIVEAUX_ID,
+    "param_phases": ATABLES.REF_PARAM_PHASES_ID,
+}
+
+# Champs indexés par table (lookup O(1) sur égalité)
+INDEXED_FIELDS = {
+    "seances_types": ("Mode", "Catégorie_moteur", "Phase cible", "Clé séance"),
+    "mapping_phases": ("Distance",),
+    "ref_jours": ("Clé_niveau_reference",),
+    "ref_niveaux": ("Clé_niveau",),
+    "vdot": ("VDOT",),
+}
+
+
+def _freeze_record(record: dict) -> Mapping[str, Any]:
+    fields = record.get("fields") or {}
+    return MappingProxyType({
+        "id": record.get("id"),
+        "createdTime": record.get("createdTime"),
+        "fields": MappingProxyType(dict(fields)),
+    })
+
+
+def _index_key(value: Any) -> Tuple:
+    """
+    Un champ Airtable peut être scalaire ou liste (multi-select, liens).
+    Chaque valeur de la liste devient une clé d'index.
+    """
+    if isinstance(value, (list, tuple)):
+        return tuple(value)
+    return (value,)
+
+
+class ReferenceTable:
+    """
+    Table de référence immuable : records + index par champ.
+    """
+
+    def __init__(self, name: str, records: Iterable[dict]):
+        self.name = name
+        self.records: Tuple[Mapping[str, Any], ...] = tuple(_freeze_record(r) for r in records)
+        self.by_id = MappingProxyType({r["id"]: r for r in self.records})
+
+        indexes: Dict[str, Mapping[Any, Tuple]] = {}
+        for field in INDEXED_FIELDS.get(name, ()):
+            buckets: Dict[Any, list] = {}
+            for rec in self.records:
+                for key in _index_key(rec["fields"].get(field)):
+                    buckets.setdefault(key, []).append(rec)
+            indexes[field] = MappingProxyType({k: tuple(v) for k, v in buckets.items()})
+        self.indexes = MappingProxyType(indexes)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def lookup(self, field: str, value: Any) -> Tuple[Mapping[str, Any], ...]:
+        """
+        Records dont `field` == value (index si disponible, sinon scan).
+        """
+        index = self.indexes.get(field)
+        if index is not None:
+            return index.get(value, ())
+        return tuple(r for r in self.records if value in _index_key(r["fields"].get(field)))
+
+    def filter(self, filters: Dict[str, Any]) -> Tuple[Mapping[str, Any], ...]:
+        """
+        Équivalent mémoire de AND({k}='v', …) ; les valeurs None sont ignorées.
+        """
+        clauses = [(k, v) for k, v in filters.items() if v is not None]
+        if not clauses:
+            return self.records
+
+        # Le premier champ indexé réduit les candidats
+        clauses.sort(key=lambda kv: kv[0] not in self.indexes)
+        first_field, first_value = clauses[0]
+        candidates = self.lookup(first_field, first_value)
+
+        return tuple(
+            r for r in candidates
+            if all(v in _index_key(r["fields"].get(k)) for k, v in clauses[1:])
+        )
+
+
+class ReferenceSnapshot:
+    """
+    Version complète (toutes tables) du référentiel, jamais modifiée après création.
+    """
+
+    def __init__(self, version: int, tables: Dict[str, ReferenceTable]):
+        self.version = version
+        self.loaded_at = time.time()
+        self.tables = MappingProxyType(dict(tables))
+
+    def table(self, name: str) -> ReferenceTable:
+        table = self.tables.get(name)
+        if table is None:
+            return ReferenceTable(name, [])
+        return table
+
+
+class ReferenceDataStore:
+    """
+    Détient le snapshot courant et le rafraîchit en tâche de fond.
+    """
+
+    def __init__(self, tables: Dict[str, Optional[str]], refresh_interval: float = 900):
+        self.table_ids = {name: tid for name, tid in tables.items() if tid}
+        self.refresh_interval = refresh_interval
+
+        self._snapshot: Optional[ReferenceSnapshot] = None
+        self._load_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.refresh_count = 0
+        self.refresh_errors = 0
+        self.last_error: Optional[str] = None
+
+    # ---------------------------------------------------------
+    # Chargement
+    # ---------------------------------------------------------
+    def _fetch(self, table_id: str) -> Iterator[dict]:
+        # Streaming page par page : les pages JSON brutes sont libérées
+        # au fur et à mesure de la construction du snapshot figé
+        for page in registry.table(table_id).iterate():
+            yield from page
+
+    def refresh(self) -> ReferenceSnapshot:
+        """
+        Recharge toutes les tables puis publie la nouvelle version.
+        Une table en erreur conserve sa version précédente.
+        """
+        with self._load_lock:
+            return self._refresh_locked()
+
+    def _refresh_locked(self) -> ReferenceSnapshot:
+        previous = self._snapshot
+        tables: Dict[str, ReferenceTable] = {}
+
+        for name, table_id in self.table_ids.items():
+            try:
+                tables[name] = ReferenceTable(name, self._fetch(table_id))
+            except Exception as e:
+                self.refresh_errors += 1
+                self.last_error = f"{name}: {e}"
+                log_error(
+                    f"Référentiel '{name}' non rafraîchi : {e}",
+                    module="ReferenceData",
+                )
+                if previous is not None and name in previous.tables:
+                    tables[name] = previous.tables[name]
+
+        version = (previous.version + 1) if previous else 1
+        snapshot = ReferenceSnapshot(version, tables)
+
+        # Swap atomique : les lecteurs voient l'ancienne OU la nouvelle version
+        self._snapshot = snapshot
+        self.refresh_count += 1
+
+        log_info(
+            f"Référentiel v{snapshot.version} chargé → "
+            + ", ".join(f"{n}={len(t)}" for n, t in snapshot.tables.items()),
+            module="ReferenceData",
+        )
+        return snapshot
+
+    def snapshot(self) -> ReferenceSnapshot:
+        """
+        Snapshot courant. Hors API (scripts, tests), un premier chargement
+        synchrone est fait à la demande.
+        """
+        snapshot = self._snapshot
+        if snapshot is not None:
+            return snapshot
+
+        with self._load_lock:
+            if self._snapshot is None:
+                return self._refresh_locked()
+            return self._snapshot
+
+    # ---------------------------------------------------------
+    # Accès pratiques
+    # ---------------------------------------------------------
+    def table(self, name: str) -> ReferenceTable:
+        return self.snapshot().table(name)
+
+    def loaded_table(self, table_id: str) -> Optional[ReferenceTable]:
+        """
+        Table de référence déjà chargée (par ID Airtable), sinon None.
+        Ne déclenche jamais de chargement.
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            return None
+        for name, tid in self.table_ids.items():
+            if tid == table_id and name in snapshot.tables:
+                return snapshot.tables[name]
+        return None
+
+    def records(self, name: str) -> Tuple[Mapping[str, Any], ...]:
+        return self.table(name).records
+
+    def lookup(self, name: str, field: str, value: Any) -> Tuple[Mapping[str, Any], ...]:
+        return self.table(name).lookup(field, value)
+
+    def filter(self, name: str, filters: Dict[str, Any]) -> Tuple[Mapping[str, Any], ...]:
+        return self.table(name).filter(filters)
+
+    # ---------------------------------------------------------
+    # Rafraîchissement en tâche de fond
+    # ---------------------------------------------------------
+    def start(self) -> None:
+        """
+        Préchargement + démarrage du thread de rafraîchissement.
+        """
+        if self._thread is not None:
+            return
+
+        try:
+            self.refresh()
+        except Exception as e:
+            log_error(f"Préchargement du référentiel impossible : {e}", module="ReferenceData")
+
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="reference-data-refresh", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.refresh_interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                log_error(f"Rafraîchissement du référentiel en échec : {e}", module="ReferenceData")
+
+    def stats(self) -> dict:
+        snapshot = self._snapshot
+        return {
+            "version": snapshot.version if snapshot else None,
+            "loaded_at": snapshot.loaded_at if snapshot else None,
+            "tables": {n: len(t) for n, t in snapshot.tables.items()} if snapshot else {},
+            "refresh_interval_s": self.refresh_interval,
+            "refresh_count": self.refresh_count,
+            "refresh_errors": self.refresh_errors,
+            "last_error": self.last_error,
+        }
+
+
+# Instance unique pour tout le process
+reference_store = ReferenceDataStore(
+    REFERENCE_TABLES,
+    refresh_interval=config.reference_data_refresh_s,
+)
@@ -0,0 +1,187 @@
+# services/session_cache.py
+# =====================================================
+# Cache des séances générées (SCN_6 → SCN_2 / SCN_0g)
+# - la séance est une fonction pure d'un petit jeu d'entrées
+#   (niveau, VDOT, phase, type de séance, charge récente, état
+#   adaptatif, objectif_normalisé, engine_version…)
+# - clé = empreinte SHA-256 du JSON canonique de ces entrées,
+#   telles que le moteur les lit (niveau, mode, état ressenti :
+#   valeurs brutes, SCN_2 y est sensible à la casse) ; les champs d'identité du slot (slot_id, date,
+#   type, user_id…) n'en font PAS partie : ils sont réappliqués
+#   sur la séance servie depuis le cache
+# - TTL + plafonds entrées / octets (RecordCache, éviction LRU)
+# - dernier Type_cible écrit par slot (écriture directe réussie ou
+#   envoi confirmé par l'outbox) : l'écriture Airtable est évitée
+#   s'il n'a pas changé
+#
+# Désactivé par SESSION_CACHE=0.
+# =====================================================
+
+import copy
+import hashlib
+import json
+from typing import Any, Dict, Optional, Tuple
+
+from core.config import config
+from engine.vdot import valid_vdot
+from services.airtable_cache import RecordCache
+
+ENGINE_SCN_2 = "SCN_2"
+ENGINE_SCN_0G = "SCN_0g"
+
+
+def _norm_text(value: Any) -> Any:
+    if isinstance(value, str):
+        return value.strip().lower() or None
+    return value
+
+
+def _norm_number(value: Any) -> Any:
+    try:
+        return round(float(value), 4)
+    except (TypeError, ValueError):
+        return None
+
+
+def engine_inputs(engine: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Entrées qui déterminent la séance produite par le moteur
+    (context.payload tel que construit par SCN_6).
+    """
+    slot = payload.get("slot") or {}
+
+    if engine == ENGINE_SCN_0G:
+        # SCN_0g V1 : seul le type du slot compte (date réappliquée)
+        return {"engine": engine, "slot_type": (slot.get("type") or "EF").upper()}
+
+    run_context = payload.get("run_context") or {}
+    phase_context = payload.get("phase_context") or {}
+    run_slot = run_context.get("slot") or {}
+    profile = run_context.get("profile") or {}
+    adaptation = run_context.get("adaptive_context") or run_context.get("adaptation") or {}
+
+    return {
+        "engine": engine,
+        "level": profile.get("level"),
+        # Allure E → distance_km et decision_trace.inputs.vdot
+        "vdot": valid_vdot(profile.get("vdot")),
+        "mode": run_context.get("mode"),
+        "phase": _norm_text(run_slot.get("phase")),
+        "phase_context": phase_context,
+        "recent_load": _norm_number(run_context.get("recent_load")),
+        "perceived_state": adaptation.get("perceived_state"),
+        "fatigue_streak": adaptation.get("fatigue_streak"),
+        "adaptation_applied": bool(run_context.get("adaptation_applied")),
+        "objectif_normalisé": run_context.get("objectif_normalisé"),
+        "engine_version": run_context.get("engine_version"),
+    }
+
+
+def session_key(inputs: Dict[str, Any]) -> str:
+    canonical = json.dumps(inputs, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def restamp(engine: str, data: Dict[str, Any], payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Copie du résultat mis en cache avec les champs d'identité
+    du slot de la requête courante.
+    """
+    data = copy.deepcopy(data)
+    session = data.get("session") or {}
+    slot = payload.get("slot") or {}
+
+    if engine == ENGINE_SCN_0G:
+        session["date"] = slot.get("date")
+        return data
+
+    run_context = payload.get("run_context") or {}
+    run_slot = run_context.get("slot") or {}
+    session.update({
+        "session_id": run_context.get("session_id") or None,
+        "slot_id": run_slot.get("slot_id"),
+        "plan_id": run_context.get("plan_id"),
+        "user_id": run_context.get("user_id") or "unknown",
+        "date": run_slot.get("date"),
+        "type": run_slot.get("type") or "Séance",
+    })
+    return data
+
+
+class SessionCache:
+    """
+    Séances par empreinte d'entrées + dernier Type_cible écrit par slot.
+    """
+
+    def __init__(self, enabled: bool = True, ttl: float = 600, max_entries: int = 5000, max_bytes: int = 50_000_000):
+        self.enabled = enabled
+        self._sessions = RecordCache(max_entries=max_entries, max_bytes=max_bytes, default_ttl=ttl)
+        self._type_cible = RecordCache(max_entries=max_entries, max_bytes=max_bytes // 10, default_ttl=ttl)
+        self.writes_skipped = 0
+
+    # ---------------------------------------------------------
+    # Séances
+    # ---------------------------------------------------------
+    def lookup(self, engine: str, payload: Dict[str, Any]) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        """
+        (clé, résultat réestampillé ou None). La clé est calculée AVANT
+        l'exécution du moteur (SCN_2 modifie le run_context).
+        """
+        if not self.enabled:
+            return None, None
+        key = session_key(engine_inputs(engine, payload))
+        data = self._sessions.get(engine, key)
+        return key, (restamp(engine, data, payload) if data is not None else None)
+
+    def store(self, engine: str, key: Optional[str], data: Dict[str, Any]) -> None:
+        if not self.enabled or key is None:
+            return
+        cached = {k: v for k, v in data.items() if k != "war_room"}
+        self._sessions.set(engine, key, copy.deepcopy(cached))
+
+    # ---------------------------------------------------------
+    # Type_cible déjà écrit
+    # ---------------------------------------------------------
+    def type_cible_unchanged(self, slot_id: Optional[str], type_cible: Optional[str]) -> bool:
+        if not self.enabled or not slot_id:
+            return False
+        written = self._type_cible.get("Type_cible", slot_id)
+        unchanged = written is not None and written == type_cible
+        if unchanged:
+            self.writes_skipped += 1
+        return unchanged
+
+    def type_cible_written(self, slot_id: Optional[str], type_cible: Optional[str]) -> None:
+        if self.enabled and slot_id and type_cible is not None:
+            self._type_cible.set("Type_cible", slot_id, type_cible)
+
+    def type_cible_pending(self, slot_id: Optional[str]) -> None:
+        """
+        Nouvelle valeur en attente d'envoi : la dernière écrite ne fait
+        plus foi tant que l'outbox ne l'a pas confirmée.
+        """
+        if self.enabled and slot_id:
+            self._type_cible.invalidate("Type_cible", slot_id)
+
+    def clear(self) -> None:
+        self._sessions.clear()
+        self._type_cible.clear()
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "sessions": self._sessions.stats(),
+            "type_cible": {
+                "entries": self._type_cible.stats()["entries"],
+                "writes_skipped": self.writes_skipped,
+            },
+        }
+
+
+# Instance unique pour tout le process
+session_cache = SessionCache(
+    enabled=config.session_cache_enabled,
+    ttl=config.session_cache_ttl,
+    max_entries=config.session_cache_max_entries,
+    max_bytes=config.session_cache_max_bytes,
+)
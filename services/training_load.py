@@ -0,0 +1,339 @@
+# services/training_load.py
+# =====================================================
+# Charge d'entraînement par coureur (ATL / CTL / TSB)
+# - moyennes exponentielles : aiguë (ATL, 7 j) et chronique
+#   (CTL, 42 j) ; TSB = CTL - ATL ; ratio ATL/CTL → recent_load
+#   de SCN_2 (seuils 0,8 / 1,2 de _compute_volume_target_minutes)
+# - monotonie (moyenne / écart-type des 7 derniers jours) et
+#   strain (charge de la semaine × monotonie)
+# - mise à jour incrémentale en O(1) : décroissance sur les jours
+#   écoulés puis ajout de la charge ; une charge tardive (feedback
+#   d'un jour passé) est ajoutée avec sa décroissance, la moyenne
+#   étant linéaire en la charge
+# - lecture à une date antérieure au dernier jour connu (slots
+#   pré-générés) : les séances postérieures sont retirées et la
+#   décroissance inversée, sans relire l'historique
+# - état compact par coureur (SQLite, WAL) : quelques nombres,
+#   7 charges journalières et les séances des 42 derniers jours
+#   (pour corriger une charge planifiée au feedback) ; le coût ne
+#   dépend pas de la longueur de l'historique
+#
+# Désactivé par TRAINING_LOAD=0.
+# =====================================================
+
+import json
+import math
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from core.config import BASE_DIR, config
+
+ATL_DAYS = 7
+CTL_DAYS = 42
+K_ATL = 1 - math.exp(-1 / ATL_DAYS)
+K_CTL = 1 - math.exp(-1 / CTL_DAYS)
+
+WINDOW_DAYS = 7
+# Séances conservées pour le feedback, et historique minimum avant
+# d'exposer le ratio (sinon CTL ≈ 0 et le ratio explose au démarrage)
+SESSION_MEMORY_DAYS = CTL_DAYS
+MIN_HISTORY_DAYS = 28
+
+# Part de la charge planifiée réellement faite, selon feedback_status (CORE_3)
+COMPLETION_BY_FEEDBACK = {"OK": 1.0, "PARTIAL": 0.5, "NO": 0.0}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS training_load (
+    runner_id   TEXT PRIMARY KEY,
+    state       TEXT NOT NULL,
+    updated_at  REAL NOT NULL
+);
+"""
+
+DayLike = Union[date, str]
+
+
+def _day(value: Optional[DayLike]) -> Optional[int]:
+    """
+    Ordinal du jour, None si absent ou illisible.
+    """
+    if isinstance(value, str):
+        try:
+            value = date.fromisoformat(value[:10])
+        except ValueError:
+            return None
+    return value.toordinal() if isinstance(value, date) else None
+
+
+@dataclass
+class TrainingLoadState:
+    """
+    État d'un coureur, avancé jusqu'au jour `day` (ordinal).
+    """
+
+    atl: float = 0.0
+    ctl: float = 0.0
+    day: Optional[int] = None
+    first_day: Optional[int] = None
+    window: List[float] = field(default_factory=lambda: [0.0] * WINDOW_DAYS)
+    # clé séance (slot_id) → [jour, charge planifiée, charge appliquée]
+    sessions: Dict[str, List[float]] = field(default_factory=dict)
+
+    # ---------------------------------------------------------
+    # Mise à jour
+    # ---------------------------------------------------------
+    def advance(self, day: int) -> None:
+        if self.day is None:
+            self.day = day
+            return
+        gap = day - self.day
+        if gap <= 0:
+            return
+        self.atl *= (1 - K_ATL) ** gap
+        self.ctl *= (1 - K_CTL) ** gap
+        if gap >= WINDOW_DAYS:
+            self.window = [0.0] * WINDOW_DAYS
+        else:
+            self.window = self.window[gap:] + [0.0] * gap
+        self.day = day
+
+    def add(self, day: int, load: float) -> None:
+        self.advance(day)
+        age = self.day - day
+        self.atl += K_ATL * load * (1 - K_ATL) ** age
+        self.ctl += K_CTL * load * (1 - K_CTL) ** age
+        if age < WINDOW_DAYS:
+            self.window[WINDOW_DAYS - 1 - age] += load
+        if self.first_day is None or day < self.first_day:
+            self.first_day = day
+
+    def record(self, key: str, day: int, planned: float, applied: Optional[float] = None) -> None:
+        """
+        Séance générée (ou régénérée) : la charge précédente de la
+        même clé est retirée avant d'ajouter la nouvelle.
+        """
+        applied = planned if applied is None else applied
+        previous = self.sessions.get(key)
+        if previous is not None:
+            self.add(int(previous[0]), -previous[2])
+        self.add(day, applied)
+        self.sessions[key] = [day, planned, applied]
+        self._prune()
+
+    def feedback(self, key: str, completion: float) -> bool:
+        """
+        Charge réellement faite = planifiée × completion. False si la
+        séance n'est plus (ou pas) connue.
+        """
+        previous = self.sessions.get(key)
+        if previous is None:
+            return False
+        day, planned, _ = previous
+        self.record(key, int(day), planned, planned * completion)
+        return True
+
+    def _prune(self) -> None:
+        horizon = self.day - SESSION_MEMORY_DAYS
+        for key in [k for k, s in self.sessions.items() if s[0] < horizon]:
+            del self.sessions[key]
+
+    # ---------------------------------------------------------
+    # Lecture
+    # ---------------------------------------------------------
+    def at(self, day: int) -> "TrainingLoadState":
+        """
+        Copie au jour demandé, sans modifier l'état : avancée (slot
+        futur) ou ramenée en arrière (séances postérieures exclues).
+        """
+        state = TrainingLoadState(self.atl, self.ctl, self.day, self.first_day, list(self.window))
+        if self.day is not None and day < self.day:
+            state._rewind(day, self.sessions)
+        else:
+            state.advance(day)
+        return state
+
+    def _rewind(self, day: int, sessions: Dict[str, List[float]]) -> None:
+        """
+        Exact tant que `day` reste dans la mémoire des séances
+        (SESSION_MEMORY_DAYS) ; au-delà, les séances oubliées ne
+        peuvent plus être retirées.
+        """
+        for s_day, _, applied in sessions.values():
+            if s_day > day:
+                self.add(int(s_day), -applied)
+        gap = self.day - day
+        self.atl /= (1 - K_ATL) ** gap
+        self.ctl /= (1 - K_CTL) ** gap
+        self.window = [0.0] * WINDOW_DAYS
+        for s_day, _, applied in sessions.values():
+            age = day - int(s_day)
+            if 0 <= age < WINDOW_DAYS:
+                self.window[WINDOW_DAYS - 1 - age] += applied
+        self.day = day
+
+    def metrics(self) -> Dict[str, Any]:
+        n = len(self.window)
+        mean = sum(self.window) / n
+        std = math.sqrt(sum((x - mean) ** 2 for x in self.window) / n)
+        monotony = mean / std if std > 0 else None
+        history_days = max(0, self.day - self.first_day) if self.first_day is not None else 0
+        established = history_days >= MIN_HISTORY_DAYS
+        return {
+            "atl": round(self.atl, 2),
+            "ctl": round(self.ctl, 2),
+            "tsb": round(self.ctl - self.atl, 2),
+            "acwr": round(self.atl / self.ctl, 3) if established and self.ctl > 0 else None,
+            "weekly_load": round(sum(self.window), 1),
+            "monotony": round(monotony, 2) if monotony is not None else None,
+            "strain": round(sum(self.window) * monotony, 1) if monotony is not None else None,
+            "history_days": history_days,
+        }
+
+    # ---------------------------------------------------------
+    # Sérialisation compacte
+    # ---------------------------------------------------------
+    def dumps(self) -> str:
+        return json.dumps(
+            {
+                "a": round(self.atl, 4),
+                "c": round(self.ctl, 4),
+                "d": self.day,
+                "f": self.first_day,
+                "w": [round(x, 2) for x in self.window],
+                "s": self.sessions,
+            },
+            separators=(",", ":"),
+        )
+
+    @classmethod
+    def loads(cls, raw: str) -> "TrainingLoadState":
+        data = json.loads(raw)
+        return cls(data["a"], data["c"], data["d"], data["f"], data["w"], data["s"])
+
+
+class TrainingLoadStore:
+    """
+    États par coureur (SQLite, 1 connexion, verrou).
+    """
+
+    def __init__(self, path: Path, enabled: bool = True):
+        self.path = Path(path)
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+        self.updates = 0
+        self.feedbacks = 0
+        self.feedbacks_unknown = 0
+
+    def _db(self) -> sqlite3.Connection:
+        # Appelé sous verrou
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _load(self, db: sqlite3.Connection, runner_id: str) -> TrainingLoadState:
+        row = db.execute("SELECT state FROM training_load WHERE runner_id = ?", (runner_id,)).fetchone()
+        return TrainingLoadState.loads(row[0]) if row else TrainingLoadState()
+
+    def _save(self, db: sqlite3.Connection, runner_id: str, state: TrainingLoadState) -> None:
+        db.execute(
+            "INSERT OR REPLACE INTO training_load (runner_id, state, updated_at) VALUES (?, ?, ?)",
+            (runner_id, state.dumps(), time.time()),
+        )
+        db.commit()
+
+    # ---------------------------------------------------------
+    # API
+    # ---------------------------------------------------------
+    def record_session(self, runner_id: Optional[str], session_key: Optional[str], day: DayLike, load: Any) -> None:
+        """
+        Séance générée : charge planifiée au jour du slot.
+        """
+        day = _day(day)
+        if not self.enabled or not runner_id or not session_key or day is None or not isinstance(load, (int, float)):
+            return
+        with self._lock:
+            db = self._db()
+            state = self._load(db, runner_id)
+            state.record(session_key, day, float(load))
+            self._save(db, runner_id, state)
+            self.updates += 1
+
+    def record_feedback(self, runner_id: Optional[str], session_key: Optional[str], feedback_status: Optional[str]) -> bool:
+        """
+        Feedback OK / PARTIAL / NO : corrige la charge de la séance.
+        """
+        completion = COMPLETION_BY_FEEDBACK.get(feedback_status or "")
+        if not self.enabled or not runner_id or not session_key or completion is None:
+            return False
+        with self._lock:
+            db = self._db()
+            state = self._load(db, runner_id)
+            applied = state.feedback(session_key, completion)
+            if applied:
+                self._save(db, runner_id, state)
+                self.feedbacks += 1
+            else:
+                self.feedbacks_unknown += 1
+        return applied
+
+    def snapshot(self, runner_id: Optional[str], day: Optional[DayLike] = None) -> Optional[Dict[str, Any]]:
+        """
+        Indicateurs du coureur au jour donné (défaut : dernier jour connu).
+        """
+        if not self.enabled or not runner_id:
+            return None
+        with self._lock:
+            row = self._db().execute(
+                "SELECT state FROM training_load WHERE runner_id = ?", (runner_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        state = TrainingLoadState.loads(row[0])
+        day = _day(day)
+        if day is not None:
+            state = state.at(day)
+        return state.metrics()
+
+    def recent_load(self, runner_id: Optional[str], day: Optional[DayLike] = None) -> Optional[float]:
+        """
+        Ratio ATL/CTL pour SCN_2 (None : coureur inconnu ou historique trop court).
+        """
+        metrics = self.snapshot(runner_id, day)
+        return metrics["acwr"] if metrics else None
+
+    def stats(self) -> dict:
+        with self._lock:
+            (runners,) = self._db().execute("SELECT COUNT(*) FROM training_load").fetchone()
+        return {
+            "enabled": self.enabled,
+            "path": str(self.path),
+            "runners": runners,
+            "updates": self.updates,
+            "feedbacks": self.feedbacks,
+            "feedbacks_unknown": self.feedbacks_unknown,
+        }
+
+
+# Instance unique pour tout le process
+training_load_store = TrainingLoadStore(
+    path=config.training_load_path or BASE_DIR / "var" / f"training_load_{config.env}.sqlite3",
+    enabled=config.training_load_enabled,
+)
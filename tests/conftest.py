@@ -0,0 +1,13 @@
+import pytest
+
+from services.training_load import TrainingLoadStore
+
+
+@pytest.fixture(autouse=True)
+def _training_load_store(tmp_path, monkeypatch):
+    # SCN_6 / CORE_3 enregistrent les charges : jamais dans var/ pendant les tests
+    store = TrainingLoadStore(tmp_path / "training_load.sqlite3")
+    monkeypatch.setattr("scenarios.agregateur.scn_6.training_load_store", store)
+    monkeypatch.setattr("infra.slot_navigation.training_load_store", store)
+    yield store
+    store.close()
@@ -0,0 +1,82 @@
+import asyncio
+import json
+
+import httpx
+
+from core.config import config
+from services import airtable_async
+from services.airtable_async import AsyncAirtableService
+
+
+def test_async_upsert_many_batches_and_retries_429(monkeypatch):
+    monkeypatch.setattr(config, "api_key", "keyTest")
+    monkeypatch.setattr(config, "base_id", "appAsyncTest")
+
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        if len(calls) == 1:
+            return httpx.Response(429, headers={"Retry-After": "0"})
+
+        body = json.loads(request.content)
+        records = [
+            {"id": f"rec{row['fields']['Slot_ID']}", "fields": row["fields"]}
+            for row in body["records"]
+        ]
+        return httpx.Response(200, json={
+            "records": records,
+            "createdRecords": [r["id"] for r in records],
+            "updatedRecords": [],
+        })
+
+    async def scenario():
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        monkeypatch.setattr(airtable_async, "_client", lambda api_key: client)
+
+        rows = [{"Slot_ID": str(i), "Type_cible": "E"} for i in range(12)]
+        try:
+            return await AsyncAirtableService().upsert_many("tblSlots", ["Slot_ID"], rows)
+        finally:
+            await client.aclose()
+
+    result = asyncio.run(scenario())
+
+    # 12 lignes → 2 lots de 10 max, + 1 rejeu après le 429
+    assert len(calls) == 3
+    assert all(c.method == "PATCH" for c in calls)
+    assert json.loads(calls[-1].content)["performUpsert"] == {"fieldsToMergeOn": ["Slot_ID"]}
+    assert sorted(r["id"] for r in result["records"]) == sorted(f"rec{i}" for i in range(12))
+
+
+def test_async_list_records_passes_projection_sort_and_limit(monkeypatch):
+    monkeypatch.setattr(config, "api_key", "keyTest")
+    monkeypatch.setattr(config, "base_id", "appAsyncTest")
+
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request.url.params)
+        return httpx.Response(200, json={"records": [{"id": "rec1", "fields": {}}]})
+
+    async def scenario():
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        monkeypatch.setattr(airtable_async, "_client", lambda api_key: client)
+        try:
+            return await AsyncAirtableService().list_records(
+                "tblSlots",
+                filter_by_formula="{status} = 'planned'",
+                fields=["Date_slot", "week_index"],
+                sort=["-Date_slot"],
+                max_records=1,
+            )
+        finally:
+            await client.aclose()
+
+    assert asyncio.run(scenario()) == [{"id": "rec1", "fields": {}}]
+
+    params = seen[0]
+    assert params.get_list("fields[]") == ["Date_slot", "week_index"]
+    assert params["sort[0][field]"] == "Date_slot"
+    assert params["sort[0][direction]"] == "desc"
+    assert params["maxRecords"] == "1"
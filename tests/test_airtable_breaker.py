@@ -0,0 +1,108 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from core.config import config
+from services import airtable_async
+from services.airtable_async import AsyncAirtableService
+from services.airtable_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+from services.airtable_cache import RecordCache, record_cache
+from services.airtable_client import registry
+
+
+def test_breaker_opens_then_probes_and_closes():
+    breaker = CircuitBreaker("appTest", failure_threshold=2, reset_timeout=0.05)
+
+    breaker.record_failure("boom")
+    assert breaker.state == CLOSED
+    breaker.record_failure("boom")
+    assert breaker.state == OPEN
+
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    time.sleep(0.06)
+    breaker.before_call()                 # 1 seule sonde passe
+    assert breaker.state == HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.stats()["rejected"] == 2
+
+
+def test_record_cache_stale_while_revalidate_windows(monkeypatch):
+    cache = RecordCache(default_ttl=10, swr_ttl=5, stale_ttl=100)
+    cache.set("tblA", "rec1", {"id": "rec1"})
+
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now + 12)
+    assert cache.lookup("tblA", "rec1") == ({"id": "rec1"}, "revalidate")
+    assert cache.get("tblA", "rec1") is None
+
+    monkeypatch.setattr(time, "monotonic", lambda: now + 50)
+    assert cache.lookup("tblA", "rec1")[1] == "stale"
+    assert cache.get_stale("tblA", "rec1") == {"id": "rec1"}
+
+    monkeypatch.setattr(time, "monotonic", lambda: now + 200)
+    assert cache.get_stale("tblA", "rec1") is None
+
+
+def test_async_get_record_serves_last_known_good_when_airtable_is_down(monkeypatch):
+    monkeypatch.setattr(config, "api_key", "keyTest")
+    monkeypatch.setattr(config, "base_id", "appBreakerTest")
+    monkeypatch.setattr(config, "airtable_max_retries", 0)
+    monkeypatch.setattr(config, "airtable_breaker_failures", 1)
+
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return httpx.Response(503)
+
+    async def scenario():
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        monkeypatch.setattr(airtable_async, "_client", lambda api_key: client)
+        service = AsyncAirtableService()
+        try:
+            first = await service.get_record("tblBreaker", "recBreaker")   # 503 → disjoncteur ouvert
+            second = await service.get_record("tblBreaker", "recBreaker")  # refusé sans appel
+            return first, second
+        finally:
+            await client.aclose()
+            record_cache.invalidate("tblBreaker", "recBreaker")
+
+    # Dernière donnée connue, déjà expirée (TTL 0, pas de fenêtre SWR)
+    monkeypatch.setitem(record_cache.table_ttls, "tblBreaker", 0)
+    monkeypatch.setattr(record_cache, "swr_ttl", 0)
+    record_cache.set("tblBreaker", "recBreaker", {"id": "recBreaker", "fields": {"Nom": "A"}})
+
+    first, second = asyncio.run(scenario())
+
+    assert len(calls) == 1
+    assert first == {"id": "recBreaker", "fields": {"Nom": "A"}, "stale": True}
+    assert second == first
+
+
+def test_async_exhausted_429_counts_as_a_breaker_failure(monkeypatch):
+    monkeypatch.setattr(config, "api_key", "keyTest")
+    monkeypatch.setattr(config, "base_id", "appThrottledTest")
+    monkeypatch.setattr(config, "airtable_max_retries", 0)
+    monkeypatch.setattr(config, "airtable_breaker_failures", 1)
+
+    async def scenario():
+        client = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(429)))
+        monkeypatch.setattr(airtable_async, "_client", lambda api_key: client)
+        try:
+            return await AsyncAirtableService().get_record("tblThrottled", "recThrottled")
+        finally:
+            await client.aclose()
+
+    assert asyncio.run(scenario()) is None
+
+    breaker = registry.breaker(base_id="appThrottledTest", api_key="keyTest")
+    assert breaker.state == OPEN
+    assert breaker.last_error == "HTTP 429"
@@ -0,0 +1,29 @@
+from services.airtable_cache import RecordCache
+
+
+def test_record_cache_lru_eviction():
+    cache = RecordCache(max_entries=2, default_ttl=60)
+
+    cache.set("tblA", "rec1", {"id": "rec1"})
+    cache.set("tblA", "rec2", {"id": "rec2"})
+    cache.get("tblA", "rec1")                  # rec1 devient le plus récent
+    cache.set("tblA", "rec3", {"id": "rec3"})  # évince rec2
+
+    assert cache.get("tblA", "rec2") is None
+    assert cache.get("tblA", "rec1") == {"id": "rec1"}
+    assert cache.stats()["evictions"] == 1
+
+
+def test_record_cache_ttl_and_invalidation():
+    cache = RecordCache(default_ttl=60, table_ttls={"tblSlots": 0})
+
+    cache.set("tblSlots", "rec1", {"id": "rec1"})  # TTL 0 → jamais conservé
+    assert cache.get("tblSlots", "rec1") is None
+
+    cache.set("tblCou", "rec1", {"id": "rec1"})
+    assert cache.invalidate("tblCou", "rec1") == 1
+    assert cache.get("tblCou", "rec1") is None
+
+    stats = cache.stats()
+    assert stats["hits"] == 0
+    assert stats["misses"] == 2
@@ -0,0 +1,88 @@
+import asyncio
+
+import httpx
+import pytest
+
+from core.config import config
+from qa.fake_airtable import FakeAirtable, FakeAirtableServer
+from services import airtable_async
+from services.airtable_async import AsyncAirtableService
+from services.airtable_cache import record_cache
+from services.airtable_io import BUDGET_FAIL, IOBudgetExceeded, track_io
+from services.airtable_service import AirtableService
+
+
+def test_io_ledger_counts_calls_and_cache_hits(monkeypatch):
+    monkeypatch.setattr(config, "api_key", "keyTest")
+    monkeypatch.setattr(config, "base_id", "appIoTest")
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={"id": "recIo1", "fields": {"Nom": "A"}})
+
+    async def scenario():
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        monkeypatch.setattr(airtable_async, "_client", lambda api_key: client)
+        service = AsyncAirtableService()
+        try:
+            with track_io(max_calls=0) as io:
+                await service.get_record("tblIo", "recIo1")
+                await service.get_record("tblIo", "recIo1")
+            return io.summary()
+        finally:
+            await client.aclose()
+            record_cache.invalidate("tblIo", "recIo1")
+
+    summary = asyncio.run(scenario())
+
+    assert summary["calls"] == 1
+    assert summary["by_table"] == {"tblIo": {"get": 1}}
+    assert summary["bytes_in"] > 0
+    assert summary["hits"] == {"cache": 1}
+
+
+def test_io_budget_fails_fast_before_calling_airtable(monkeypatch):
+    monkeypatch.setattr(config, "api_key", "keyTest")
+    monkeypatch.setattr(config, "base_id", "appIoTest")
+
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return httpx.Response(200, json={"records": []})
+
+    async def scenario():
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        monkeypatch.setattr(airtable_async, "_client", lambda api_key: client)
+        service = AsyncAirtableService()
+        try:
+            with track_io(max_calls=1, mode=BUDGET_FAIL) as io:
+                await service.list_records("tblIo", filter_by_formula="{A} = '1'")
+                with pytest.raises(IOBudgetExceeded):
+                    await service.get_record("tblIo", "recIo2")
+            return io.summary()
+        finally:
+            await client.aclose()
+
+    summary = asyncio.run(scenario())
+
+    assert len(calls) == 1
+    assert summary["budget"]["exceeded"] is True
+
+
+def test_io_budget_propagates_through_sync_formula_reads(monkeypatch):
+    fake = FakeAirtable()
+    fake.insert("appIoSync", "tblIo", {"A": "1"})
+
+    with FakeAirtableServer(fake) as server:
+        monkeypatch.setattr(config, "api_key", "keyTest")
+        monkeypatch.setattr(config, "base_id", "appIoSync")
+        monkeypatch.setattr(config, "airtable_endpoint_url", server.url)
+        service = AirtableService()
+
+        with track_io(max_calls=1, mode=BUDGET_FAIL):
+            assert len(service.find_all("tblIo", "{A} = '1'")) == 1
+            # Budget épuisé : erreur, pas une liste vide (« aucun slot »)
+            with pytest.raises(IOBudgetExceeded):
+                service.find_all("tblIo", "{A} = '2'")
+
+    assert fake.stats()["requests"] == 1
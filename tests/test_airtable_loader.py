@@ -0,0 +1,65 @@
+import asyncio
+
+from core.config import config
+from qa.fake_airtable import FakeAirtable, FakeAirtableServer
+from services.airtable_async import AsyncAirtableService
+from services.airtable_loader import AsyncBatchLoader, BatchLoader, chunk_keys
+from services.airtable_query import eq
+from services.airtable_service import AirtableService
+
+
+def _seed(fake: FakeAirtable, nb_runners: int) -> None:
+    for i in range(nb_runners):
+        for day in ("2026-03-02", "2026-03-04"):
+            fake.insert("appLoaderTest", "tblSlots", {
+                "Coureur_ID": f"recRunner{i:04d}",
+                "Date_slot": day,
+                "status": "planned",
+            })
+
+
+def test_chunk_keys_respects_formula_length():
+    keys = [f"recRunner{i:04d}" for i in range(500)]
+    chunks = chunk_keys("Coureur_ID", keys, where=eq("status", "planned"), max_len=2000)
+
+    assert sum(len(c) for c in chunks) == 500
+    assert all(
+        len(f"AND({{status}} = 'planned', OR({', '.join(f'{{Coureur_ID}} = {k!r}' for k in c)}))") <= 2000
+        for c in chunks
+    )
+
+
+def test_loaders_read_250_runners_in_a_handful_of_calls(monkeypatch):
+    fake = FakeAirtable()
+    _seed(fake, 250)
+
+    with FakeAirtableServer(fake) as server:
+        monkeypatch.setattr(config, "api_key", "keyLoader")
+        monkeypatch.setattr(config, "base_id", "appLoaderTest")
+        monkeypatch.setattr(config, "airtable_endpoint_url", server.url)
+        monkeypatch.setattr(config, "airtable_rate_limit_rps", 100)
+        monkeypatch.setattr(config, "airtable_rate_burst", 100)
+        keys = [f"recRunner{i:04d}" for i in range(250)] + ["recUnknown"]
+
+        loader = BatchLoader("tblSlots", "Coureur_ID", where=eq("status", "planned"), service=AirtableService())
+        slots = loader.load_many(keys)
+        sync_calls = fake.stats()["requests"]
+
+        assert len(slots["recRunner0042"]) == 2
+        assert slots["recUnknown"] == []
+        # 500 slots = 5 pages de 100 au minimum ; 1 requête par lot au lieu de 250
+        assert loader.stats()["calls"] <= 3
+        assert sync_calls <= 8
+
+        loader_async = AsyncBatchLoader("tblSlots", "Coureur_ID", service=AsyncAirtableService())
+
+        async def scenario():
+            # 251 coroutines indépendantes, 1 seul envoi groupé
+            return await asyncio.gather(*(loader_async.load(k) for k in keys))
+
+        results = asyncio.run(scenario())
+
+    assert [len(r) for r in results[:3]] == [2, 2, 2]
+    assert results[-1] == []
+    assert loader_async.stats() == {"table_id": "tblSlots", "batches": 1, "calls": loader.stats()["calls"], "keys": 251}
+    assert fake.stats()["requests"] - sync_calls <= 8
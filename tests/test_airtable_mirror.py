@@ -0,0 +1,42 @@
+from services.airtable_mirror import AirtableMirror
+
+
+class FakeTable:
+    def __init__(self, pages):
+        self.pages = pages
+        self.formulas = []
+
+    def iterate(self, **options):
+        self.formulas.append(options.get("formula"))
+        return iter(self.pages)
+
+
+def test_mirror_sync_serves_reads_and_propagates_deletions(tmp_path, monkeypatch):
+    mirror = AirtableMirror(tmp_path / "mirror.sqlite3", {"slots": "tblSlots"}, enabled=True)
+    table = FakeTable([
+        [{"id": "rec1", "fields": {"Date_slot": "2026-01-07"}}],
+        [{"id": "rec2", "fields": {"Date_slot": "2026-01-05"}}],
+    ])
+    monkeypatch.setattr(mirror, "_fetch_pages", lambda table_id, formula: table.iterate(formula=formula))
+
+    assert mirror.get("tblSlots", "rec1") is None  # jamais synchronisée → Airtable
+
+    mirror.sync_table("tblSlots")
+    assert mirror.get("tblSlots", "rec1")["fields"] == {"Date_slot": "2026-01-07"}
+    assert [r["id"] for r in mirror.all("tblSlots", sort=["Date_slot"], max_records=1)] == ["rec2"]
+
+    # Incrémentale : formule LAST_MODIFIED_TIME sur le curseur
+    table.pages = [[{"id": "rec1", "fields": {"Date_slot": "2026-01-09"}}]]
+    mirror.sync_table("tblSlots")
+    assert table.formulas[-1].startswith("IS_AFTER(LAST_MODIFIED_TIME(), '")
+    assert mirror.get("tblSlots", "rec1")["fields"]["Date_slot"] == "2026-01-09"
+    assert mirror.get("tblSlots", "rec2") is not None
+
+    # Complète : rec2 supprimé côté Airtable disparaît
+    mirror.sync_table("tblSlots", full=True)
+    assert mirror.get("tblSlots", "rec2") is None
+
+    # Write-through + borne de fraîcheur
+    mirror.apply("tblSlots", [{"id": "rec3", "fields": {"Type_cible": "E"}}])
+    assert mirror.get("tblSlots", "rec3")["fields"] == {"Type_cible": "E"}
+    assert mirror.get("tblSlots", "rec3", max_staleness=-1) is None
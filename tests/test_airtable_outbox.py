@@ -0,0 +1,81 @@
+import json
+import time
+
+from services.airtable_outbox import AirtableOutbox
+
+
+class _RecordingService:
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.upserts = []
+        self.updates = []
+
+    def upsert_many(self, table_id, key_fields, rows):
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("Airtable 503")
+        self.upserts.append((table_id, key_fields, rows))
+
+    def update_many(self, table_id, records):
+        self.updates.append((table_id, records))
+
+
+def test_outbox_coalesces_writes_and_survives_restart(tmp_path):
+    path = tmp_path / "outbox.sqlite3"
+    outbox = AirtableOutbox(path, service=_RecordingService())
+
+    outbox.upsert("tblSlots", ["Slot_ID"], {"Slot_ID": "S1", "Type_cible": "E"})
+    outbox.upsert("tblSlots", ["Slot_ID"], {"Slot_ID": "S1", "Type_cible": "T"})
+    outbox.upsert("tblSlots", ["Slot_ID"], {"Slot_ID": "S2", "Type_cible": "E"})
+    outbox.update("tblSlots", "rec1", {"Statut": "generated"})
+    outbox.close()
+
+    # Redémarrage : les lignes en attente sont reprises
+    service = _RecordingService()
+    restarted = AirtableOutbox(path, service=service)
+    assert restarted.stats()["pending"] == 4
+
+    assert restarted.flush() == 4
+    assert service.upserts == [(
+        "tblSlots", ["Slot_ID"],
+        [{"Slot_ID": "S1", "Type_cible": "T"}, {"Slot_ID": "S2", "Type_cible": "E"}],
+    )]
+    assert service.updates == [("tblSlots", [{"id": "rec1", "fields": {"Statut": "generated"}}])]
+    assert restarted.stats()["pending"] == 0
+
+
+def test_outbox_retries_with_backoff_then_gives_up(tmp_path, monkeypatch):
+    service = _RecordingService(failures=10)
+    outbox = AirtableOutbox(tmp_path / "outbox.sqlite3", max_attempts=2, service=service)
+    outbox.upsert("tblSlots", ["Slot_ID"], {"Slot_ID": "S1", "Type_cible": "E"})
+
+    assert outbox.flush() == 0
+    assert outbox.flush() == 0            # pas encore échu (backoff)
+    assert outbox.stats()["pending"] == 1
+
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 60)
+    assert outbox.flush() == 0
+    stats = outbox.stats()
+    assert (stats["pending"], stats["dead"], stats["failures"]) == (0, 1, 2)
+
+
+def test_scn_6_generates_session_when_type_cible_cannot_be_queued(tmp_path, monkeypatch):
+    from scenarios.agregateur import scn_6
+    from services.airtable_tables import ATABLES
+    from services.session_cache import SessionCache
+    from services.training_load import TrainingLoadStore
+
+    with open("tests/data/scn_6/sc002_input.json", "r", encoding="utf-8") as f:
+        payload = json.load(f)["payload"]
+    # Table Slots non configurée : la mise en file échoue
+    monkeypatch.setattr(ATABLES, "SLOTS", None)
+    monkeypatch.setattr(scn_6, "airtable_outbox", AirtableOutbox(tmp_path / "outbox.sqlite3"))
+    monkeypatch.setattr(scn_6, "session_cache", SessionCache(ttl=60))
+    monkeypatch.setattr(scn_6, "training_load_store", TrainingLoadStore(tmp_path / "load.sqlite3"))
+
+    result = scn_6.run_scn_6(payload)
+
+    assert result.success
+    assert result.data["session"]
+    assert result.data["war_room"]["airtable_update"].startswith("Type_cible not persisted")
@@ -0,0 +1,83 @@
+from core.config import config
+from qa.airtable_formula import compile_formula
+from services import airtable_service
+from services.airtable_cache import key_index
+from services.airtable_query import LAST_MODIFIED, and_, eq, in_, is_after, ne, template_stats
+from services.airtable_service import AirtableService
+
+
+def test_query_compiles_with_escaping_and_reuses_shape():
+    q = and_(eq("Coureur_ID", "rec'1\\"), ne("Date_slot", ""))
+    assert q.compile() == "AND({Coureur_ID} = 'rec\\'1\\\\', {Date_slot} != '')"
+    assert is_after(LAST_MODIFIED, "2026-01-01").compile() == "IS_AFTER(LAST_MODIFIED_TIME(), '2026-01-01')"
+    assert in_("Mode", []).compile() == "FALSE()"
+
+    # L'évaluateur du faux serveur relit la valeur échappée à l'identique
+    predicate = compile_formula(eq("Nom", "O'Brien").compile())
+    assert predicate({"id": "rec1", "fields": {"Nom": "O'Brien"}})
+
+    shapes = template_stats()["shapes"]
+    and_(eq("Coureur_ID", "autre"), ne("Date_slot", "")).compile()
+    assert template_stats()["shapes"] == shapes
+
+
+def test_equality_query_served_from_key_index(monkeypatch):
+    monkeypatch.setattr(config, "api_key", "keyTest")
+    monkeypatch.setattr(config, "base_id", "appQueryTest")
+
+    calls = []
+    records = [
+        {"id": "rec1", "fields": {"Mode": "Run", "Ordre": 2}},
+        {"id": "rec2", "fields": {"Mode": "Run", "Ordre": 1}},
+        {"id": "rec3", "fields": {"Mode": "Bike", "Ordre": 3}},
+    ]
+
+    class StubTable:
+        def all(self, **options):
+            calls.append(options)
+            return records
+
+    monkeypatch.setattr(airtable_service.registry, "table", lambda *a, **k: StubTable())
+    monkeypatch.setitem(airtable_service.record_cache.table_ttls, "tblKeyIndex", 60)
+
+    service = AirtableService()
+    try:
+        assert len(service.list_all("tblKeyIndex")) == 3
+
+        found = service.list_records(
+            "tblKeyIndex",
+            filter_by_formula=eq("Mode", "Run"),
+            sort=["Ordre"],
+            fields=["Ordre"],
+        )
+        assert found == [
+            {"id": "rec2", "fields": {"Ordre": 1}},
+            {"id": "rec1", "fields": {"Ordre": 2}},
+        ]
+        assert len(calls) == 1
+
+        # Formule non réductible à des égalités → Airtable
+        service.list_records("tblKeyIndex", filter_by_formula=ne("Mode", "Run"))
+        assert calls[-1]["formula"] == "{Mode} != 'Run'"
+    finally:
+        key_index.invalidate("tblKeyIndex")
+
+
+def test_key_index_leaves_list_fields_to_airtable_and_returns_copies(monkeypatch):
+    monkeypatch.setitem(airtable_service.record_cache.table_ttls, "tblLinked", 60)
+    records = [
+        {"id": "rec1", "fields": {"Coureur": ["recC1"], "Mode": "Run"}},
+        {"id": "rec2", "fields": {"Coureur": ["recC2"], "Mode": "Bike"}},
+    ]
+    key_index.store("tblLinked", records)
+    try:
+        # Airtable compare le nom affiché du coureur lié, pas son id
+        assert key_index.lookup("tblLinked", {"Coureur": "recC1"}) is None
+        assert key_index.lookup("tblLinked", {"Mode": "Run", "Coureur": "recC1"}) is None
+
+        found = key_index.lookup("tblLinked", {"Mode": "Run"})
+        assert [r["id"] for r in found] == ["rec1"]
+        found[0]["fields"]["Mode"] = "Swim"
+        assert key_index.lookup("tblLinked", {"Mode": "Run"})[0]["fields"]["Mode"] == "Run"
+    finally:
+        key_index.invalidate("tblLinked")
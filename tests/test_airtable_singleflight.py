@@ -0,0 +1,80 @@
+import asyncio
+import threading
+import time
+
+from services.airtable_singleflight import SingleFlight, query_key
+
+
+def test_single_flight_coalesces_concurrent_threads():
+    flight = SingleFlight()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        time.sleep(0.1)
+        return {"id": "rec1"}
+
+    results = []
+    key = query_key("record", "appX", "tblCou", record_id="rec1")
+    threads = [
+        threading.Thread(target=lambda: results.append(flight.do(key, fetch)))
+        for _ in range(5)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert results == [{"id": "rec1"}] * 5
+    assert flight.stats()["coalesced"] == 4
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_single_flight_async_shares_errors():
+    flight = SingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        raise RuntimeError("boom")
+
+    async def scenario():
+        key = query_key("query", "appX", "tblSlots", formula="{status}='planned'")
+        return await asyncio.gather(
+            *(flight.do_async(key, fetch) for _ in range(3)),
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(scenario())
+
+    assert len(calls) == 1
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+def test_single_flight_async_leader_cancellation_keeps_followers():
+    flight = SingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"id": "rec1"}
+
+    async def scenario():
+        key = query_key("record", "appX", "tblCou", record_id="rec1")
+        leader = asyncio.ensure_future(flight.do_async(key, fetch))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flight.do_async(key, fetch))
+        await asyncio.sleep(0.01)
+        # Client du meneur déconnecté
+        leader.cancel()
+        return leader, await follower
+
+    leader, result = asyncio.run(scenario())
+
+    assert leader.cancelled()
+    assert result == {"id": "rec1"}
+    assert len(calls) == 1
+    assert flight.stats()["in_flight"] == 0
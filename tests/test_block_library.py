@@ -0,0 +1,45 @@
+import json
+
+import pytest
+
+from engine.block_library import DEFAULT_PATH, BlockLibrary, BlockLibraryError
+from scenarios.agregateur.scn_2 import compose_running_session
+
+
+def test_interval_types_come_from_the_library():
+    run_context = {"profile": {"level": "intermediaire"}, "slot": {"phase": "Specifique"}, "recent_load": 1.0}
+    session = compose_running_session(run_context, {"seance_type": "I"}, verbose=False)
+
+    assert session["block_id"] == "BF_RUN_I_SPECIFIQUE_INTERMEDIAIRE_MEDIUM"
+    main = session["session_spec"]["blocks"][1]
+    assert main["duration_min"] == 60 - 15 - 10
+    assert main["description"].startswith("7 × 3 min allure I")
+    assert sum(b["duration_min"] for b in session["session_spec"]["blocks"]) == session["duration_min"]
+    assert session["load"] == round(60 * 1.5)
+
+
+def test_library_rejects_invalid_templates():
+    with open(DEFAULT_PATH, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    data["templates"]["I_INTERVALS"]["blocks"][1]["duration"] = {"share": 1.5}
+    with pytest.raises(BlockLibraryError, match="I_INTERVALS.blocks"):
+        BlockLibrary(data)
+
+    data["templates"]["I_INTERVALS"]["blocks"][1]["duration"] = "main"
+    data["rules"].append({"types": ["X"], "template": "MISSING"})
+    with pytest.raises(BlockLibraryError, match="gabarit inconnu"):
+        BlockLibrary(data)
+
+
+def test_types_without_rule_use_the_fallback_and_short_sessions_fit():
+    library = BlockLibrary.from_file(DEFAULT_PATH)
+    steps, blocks, tags = library.build("BF_RUN_SL", "SL", "Specifique", "intermediaire", 90)
+    assert [b["duration_min"] for b in blocks] == [90]
+    assert blocks[0]["intensity"]["value"] == "SL" and tags == ["SL"]
+    assert steps[0]["label"] == "Séance SL"
+
+    # Échauffement / retour au calme réduits : la somme reste la durée
+    for total in (5, 20, 30):
+        _, blocks, _ = library.build("BF_RUN_I", "I", "Specifique", "intermediaire", total)
+        assert sum(b["duration_min"] for b in blocks) == total
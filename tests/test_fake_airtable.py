@@ -0,0 +1,65 @@
+import asyncio
+
+import pytest
+
+from core.config import config
+from qa.airtable_formula import compile_formula
+from qa.fake_airtable import FakeAirtable, FakeAirtableServer
+from services.airtable_async import AsyncAirtableService
+from services.airtable_cache import record_cache
+from services.airtable_service import AirtableService
+
+
+@pytest.fixture
+def fake_airtable(monkeypatch):
+    fake = FakeAirtable()
+    fake.seed_from_scn6_fixtures(
+        "appFakeTest", "tests/data/scn_6",
+        coureurs_table="tblCoureurs", slots_table="tblSlots",
+    )
+    with FakeAirtableServer(fake) as server:
+        monkeypatch.setattr(config, "api_key", "keyFake")
+        monkeypatch.setattr(config, "base_id", "appFakeTest")
+        monkeypatch.setattr(config, "airtable_endpoint_url", server.url)
+        record_cache.clear()
+        yield fake
+
+
+def test_formula_subset():
+    record = {"id": "rec1", "fields": {"Coureur_ID": "recA", "status": "planned", "Tags": ["a", "b"]}}
+
+    assert compile_formula("AND({Coureur_ID} = 'recA', {status} = 'planned')")(record)
+    assert not compile_formula("OR({status} = 'done', {Date_slot} != '')")(record)
+    assert compile_formula("FIND('b', ARRAYJOIN({Tags}))")(record)
+    assert compile_formula("RECORD_ID() = 'rec1'")(record)
+
+
+def test_services_against_fake_airtable(fake_airtable):
+    service = AirtableService()
+
+    slots = service.list_records(
+        "tblSlots",
+        filter_by_formula="AND({Coureur_ID} = 'recxMARATHON001', {status} = 'planned')",
+        fields=["Slot_ID", "Date_slot"],
+        max_records=1,
+    )
+    assert [s["fields"]["Slot_ID"] for s in slots] == ["recxMARATHON001__S1__Dimanche"]
+    assert set(slots[0]["fields"]) == {"Slot_ID", "Date_slot"}
+
+    result = service.upsert_many(
+        "tblSlots",
+        key_fields=["Slot_ID"],
+        rows=[
+            {"Slot_ID": "recxMARATHON001__S1__Dimanche", "Type_cible": "T"},
+            {"Slot_ID": "NEW__S1__Lundi", "Type_cible": "E"},
+        ],
+    )
+    assert len(result["updatedRecords"]) == 1
+    assert len(result["createdRecords"]) == 1
+
+    async def read_back():
+        return await AsyncAirtableService().get_record("tblSlots", result["records"][0]["id"])
+
+    record = asyncio.run(read_back())
+    assert record["fields"]["Type_cible"] == "T"
+    assert fake_airtable.stats()["requests"] == 3
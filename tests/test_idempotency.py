@@ -0,0 +1,103 @@
+import threading
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from services import idempotency
+from services.idempotency import IdempotencyStore, idempotent
+
+
+def test_in_flight_duplicate_waits_then_replays(tmp_path, monkeypatch):
+    store = IdempotencyStore(tmp_path / "idem.sqlite3", wait_timeout=5, poll_interval=0.01)
+    monkeypatch.setattr(idempotency, "idempotency_store", store)
+
+    runs = []
+
+    def slow_generation():
+        runs.append(1)
+        time.sleep(0.2)
+        return {"slot_id": "recA", "n": len(runs)}
+
+    body = {"record_id": "recA"}
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(idempotent("gen", "key-1", body, slow_generation)))
+        for _ in range(3)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(runs) == 1
+    originals = [r for r in results if isinstance(r, dict)]
+    replays = [r for r in results if not isinstance(r, dict)]
+    assert originals == [{"slot_id": "recA", "n": 1}]
+    assert [r.headers["Idempotent-Replayed"] for r in replays] == ["true", "true"]
+    assert store.stats()["replayed"] == 2
+
+    # Même clé, autre corps → 422
+    with pytest.raises(HTTPException) as err:
+        idempotent("gen", "key-1", {"record_id": "recB"}, slow_generation)
+    assert err.value.status_code == 422
+
+
+def test_failed_original_is_not_stored(tmp_path, monkeypatch):
+    store = IdempotencyStore(tmp_path / "idem.sqlite3")
+    monkeypatch.setattr(idempotency, "idempotency_store", store)
+
+    def boom():
+        raise RuntimeError("Airtable 503")
+
+    with pytest.raises(RuntimeError):
+        idempotent("gen", "key-2", {}, boom)
+
+    assert idempotent("gen", "key-2", {}, lambda: {"ok": True}) == {"ok": True}
+    assert store.stats()["executed"] == 2
+
+
+def test_error_results_are_not_replayed(tmp_path, monkeypatch):
+    store = IdempotencyStore(tmp_path / "idem.sqlite3")
+    monkeypatch.setattr(idempotency, "idempotency_store", store)
+
+    outage = {"success": False, "status": "error", "message": "Erreur Airtable SCN_6 : 503"}
+    assert idempotent("gen", "key-3", {}, lambda: outage) == outage
+    # Relance Make : ré-exécutée, puis la réussite est rejouée
+    assert idempotent("gen", "key-3", {}, lambda: {"success": True, "status": "ok"}) == {"success": True, "status": "ok"}
+    assert idempotent("gen", "key-3", {}, lambda: {"success": False}).headers["Idempotent-Replayed"] == "true"
+    assert store.stats()["executed"] == 2
+
+
+def test_long_original_is_not_reexecuted_after_wait_timeout(tmp_path, monkeypatch):
+    store = IdempotencyStore(tmp_path / "idem.sqlite3", wait_timeout=0.1, poll_interval=0.01)
+    monkeypatch.setattr(idempotency, "idempotency_store", store)
+
+    runs = []
+    started = threading.Event()
+
+    def slow_generation():
+        runs.append(1)
+        started.set()
+        time.sleep(0.4)
+        return {"n": len(runs)}
+
+    original = threading.Thread(target=lambda: idempotent("gen", "key-4", {}, slow_generation))
+    original.start()
+    started.wait()
+    time.sleep(0.15)
+
+    # Original plus long que wait_timeout : 409, pas de seconde exécution
+    with pytest.raises(HTTPException) as err:
+        idempotent("gen", "key-4", {}, slow_generation)
+    assert err.value.status_code == 409
+    original.join()
+    assert len(runs) == 1
+
+    # Worker tombé (aucun original vivant) : clé reprise après stale_after
+    other = IdempotencyStore(tmp_path / "idem.sqlite3", wait_timeout=0.1, stale_after=0.1)
+    assert other.begin("gen:key-5", "fp")[0] == idempotency.LEADER
+    time.sleep(0.15)
+    assert other.begin("gen:key-5", "fp")[0] == idempotency.WAIT
+    fresh = IdempotencyStore(tmp_path / "idem.sqlite3", wait_timeout=0.1, stale_after=0.1)
+    assert fresh.begin("gen:key-5", "fp")[0] == idempotency.LEADER
@@ -0,0 +1,59 @@
+import copy
+import itertools
+
+from scenarios.agregateur import scn_2_catalogue
+from scenarios.agregateur.scn_2 import compose_running_session, generate_running_session
+from scenarios.agregateur.scn_2_catalogue import SessionCatalogue
+
+
+def _contexts(level, phase, seance_type, recent_load, adaptation, n):
+    run_context = {
+        "profile": {"level": level},
+        "slot": {"slot_id": f"rec{n}", "date": f"2025-05-{n % 28 + 1:02d}", "phase": phase, "type": "Sortie"},
+        "recent_load": recent_load,
+        "user_id": f"user_{n}",
+        "plan_id": f"plan_{n % 3}",
+        "objectif_normalisé": "10K",
+        "engine_version": "C",
+    }
+    run_context.update(adaptation)
+    return run_context, {"seance_type": seance_type}
+
+
+def test_catalogue_matches_live_composition(monkeypatch):
+    catalogue = SessionCatalogue()
+    catalogue.load()
+    monkeypatch.setattr(scn_2_catalogue, "session_catalogue", catalogue)
+
+    adaptations = [
+        {},
+        {"adaptation": {"perceived_state": "fatigued", "fatigue_streak": 2}},
+        {"adaptive_context": {"perceived_state": "good"}},
+        {"adaptation": {"perceived_state": "neutral"}},
+        {"adaptation_applied": True, "adaptation": {"perceived_state": "fatigued"}},
+        {"adaptation": {"perceived_state": "exhausted"}},      # hors catalogue
+    ]
+    space = itertools.product(
+        ["debutant", "intermediaire", "avance", "N2"],
+        ["General", "spécifique", "affutage"],
+        ["EF", "E", "I"],
+        [None, 0.5, 1.0, 1.3],
+        adaptations,
+    )
+    compared = 0
+    for n, combo in enumerate(space):
+        live_ctx, phase_ctx = _contexts(*combo, n)
+        cat_ctx = copy.deepcopy(live_ctx)
+        try:
+            expected = compose_running_session(live_ctx, phase_ctx, verbose=False)
+        except Exception:
+            # Combinaison non générable : jamais servie par le catalogue
+            assert catalogue.lookup(cat_ctx, phase_ctx) is None
+            continue
+        assert generate_running_session(cat_ctx, phase_ctx) == expected
+        assert cat_ctx == live_ctx
+        compared += 1
+
+    assert compared > 0
+    assert catalogue.stats()["hits"] > 0
+    assert catalogue.stats()["misses"] > 0
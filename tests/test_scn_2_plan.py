@@ -0,0 +1,49 @@
+import pytest
+
+from scenarios.agregateur.scn_2 import compose_running_session
+from scenarios.agregateur.scn_2_plan import generate_plan_sessions
+
+
+def _weeks():
+    phases = [("General", 3), ("Specifique", 3), ("Affutage", 2)]
+    weeks, n = [], 1
+    for nom, count in phases:
+        for _ in range(count):
+            slots = [{"jour": "Mardi", "jour_relatif": 1}, {"jour": "Jeudi", "jour_relatif": 2, "seance_type": "ef"}]
+            slots.append({"jour": "Dimanche", "jour_relatif": 3, "slot_id": f"rec{n}", "date": "2025-05-11"})
+            weeks.append({"semaine": n, "phase": nom, "phase_index": 1, "charge_pct": 0.5, "slots": slots})
+            n += 1
+    return weeks
+
+
+@pytest.mark.parametrize("level, recent_load", [("debutant", None), ("intermediaire", 1.0), ("avance", 1.5), ("N2", 0.5)])
+def test_plan_sessions_match_scn_2_per_slot(level, recent_load):
+    run_context = {
+        "profile": {"level": level},
+        "recent_load": recent_load,
+        "user_id": "user_1",
+        "plan_id": "plan_1",
+        "objectif_normalisé": "10K",
+        "engine_version": "C",
+    }
+    plan = generate_plan_sessions(run_context, _weeks(), {"seance_type": "E"})
+
+    assert len(plan) == 24
+    for i in range(len(plan)):
+        expected = compose_running_session({**run_context, "slot": plan.slot(i)}, plan.slot_phase_context(i), verbose=False)
+        assert plan[i] == expected
+
+    totals = plan.weekly_totals()
+    assert [t["semaine"] for t in totals] == list(range(1, 9))
+    assert totals[0]["duration_min"] == sum(s["duration_min"] for s in plan[0:3])
+
+
+def test_plan_sessions_are_lazy_and_empty_plan_is_valid():
+    plan = generate_plan_sessions({"profile": {"level": "avance"}}, _weeks())
+    assert plan._sessions == {}
+    assert plan[-1] is plan[23]
+    assert list(plan._sessions) == [23]
+
+    empty = generate_plan_sessions({}, [{"semaine": 1, "phase": "General", "slots": []}])
+    assert len(empty) == 0
+    assert empty.weekly_totals() == [{"semaine": 1, "duration_min": 0, "distance_km": 0.0, "load": 0}]
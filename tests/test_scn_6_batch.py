@@ -0,0 +1,40 @@
+import copy
+import json
+
+from scenarios.agregateur import scn_6
+from services.airtable_outbox import AirtableOutbox
+from services.airtable_tables import ATABLES
+
+
+class _RecordingService:
+    def __init__(self):
+        self.upserts = []
+
+    def upsert_many(self, table_id, key_fields, rows):
+        self.upserts.append((table_id, key_fields, rows))
+
+
+def test_scn_6_batch_streams_items_and_coalesces_type_cible(tmp_path, monkeypatch):
+    service = _RecordingService()
+    monkeypatch.setattr(ATABLES, "SLOTS", "tblSlots")
+    monkeypatch.setattr(scn_6, "airtable_outbox", AirtableOutbox(tmp_path / "outbox.sqlite3", enabled=False, service=service))
+
+    with open("tests/data/scn_6/sc001_input.json", "r", encoding="utf-8") as f:
+        base = json.load(f)["payload"]
+
+    items = []
+    for i in range(25):
+        payload = copy.deepcopy(base)
+        payload["run_context"]["slot"]["slot_id"] = f"recSlot{i}"
+        items.append(payload)
+    items.append({"run_context": {}})     # item invalide : erreur isolée
+
+    lines = list(scn_6.iter_scn_6_batch(items, workers=4))
+
+    assert sorted(line["index"] for line in lines[:-1]) == list(range(26))
+    summary = lines[-1]["summary"]
+    assert (summary["ok"], summary["errors"], summary["writes"]) == (25, 1, 25)
+
+    # 1 seul upsert groupé pour tout le lot
+    assert len(service.upserts) == 1
+    assert {row["Slot_ID"] for row in service.upserts[0][2]} == {f"recSlot{i}" for i in range(25)}
@@ -0,0 +1,105 @@
+import copy
+import json
+
+from scenarios.agregateur import scn_6
+from services.airtable_outbox import AirtableOutbox
+from services.airtable_tables import ATABLES
+from services.session_cache import ENGINE_SCN_2, SessionCache, engine_inputs, session_key
+
+
+class _RecordingService:
+    def __init__(self):
+        self.rows = []
+
+    def upsert_many(self, table_id, key_fields, rows):
+        self.rows.extend(rows)
+
+
+def _payload(slot_id, date):
+    with open("tests/data/scn_6/sc001_input.json", "r", encoding="utf-8") as f:
+        payload = json.load(f)["payload"]
+    run_ctx = payload["run_context"]
+    run_ctx["engine_version"] = "C"
+    run_ctx["profile"]["level"] = "intermediaire"
+    run_ctx["slot"] = {"slot_id": slot_id, "date": date}
+    run_ctx["user_id"] = f"user_{slot_id}"
+    return copy.deepcopy(payload)
+
+
+def test_scn_6_serves_restamped_session_and_skips_unchanged_type_cible(tmp_path, monkeypatch):
+    service = _RecordingService()
+    cache = SessionCache(ttl=60)
+    monkeypatch.setattr(ATABLES, "SLOTS", "tblSlots")
+    monkeypatch.setattr(scn_6, "session_cache", cache)
+    monkeypatch.setattr(scn_6, "airtable_outbox", AirtableOutbox(tmp_path / "outbox.sqlite3", enabled=False, service=service))
+
+    first = scn_6.run_scn_6(_payload("recA", "2025-04-13"))
+    second = scn_6.run_scn_6(_payload("recB", "2025-04-20"))
+    retry = scn_6.run_scn_6(_payload("recB", "2025-04-20"))
+
+    assert first.data["war_room"]["session_cache"] == "miss"
+    assert second.data["war_room"]["session_cache"] == "hit"
+
+    session_a, session_b = first.data["session"], second.data["session"]
+    assert (session_b["slot_id"], session_b["date"], session_b["user_id"]) == ("recB", "2025-04-20", "user_recB")
+    assert session_b["steps"] == session_a["steps"]
+    assert session_b["block_id"] == session_a["block_id"]
+
+    # Relance Make du même slot : Type_cible identique → pas de réécriture
+    assert retry.data["war_room"]["airtable_update"] == "Type_cible unchanged (skipped)"
+    assert [row["Slot_ID"] for row in service.rows] == ["recA", "recB"]
+    assert cache.stats()["sessions"]["hits"] == 2
+
+
+def test_scn_2_key_depends_on_profile_vdot():
+    fast, slow = _payload("recA", "2025-04-13"), _payload("recA", "2025-04-13")
+    fast["run_context"]["profile"]["vdot"] = 55
+    slow["run_context"]["profile"]["vdot"] = 40
+
+    assert session_key(engine_inputs(ENGINE_SCN_2, fast)) != session_key(engine_inputs(ENGINE_SCN_2, slow))
+
+
+class _FlakyService(_RecordingService):
+    def __init__(self):
+        super().__init__()
+        self.down = True
+
+    def upsert_many(self, table_id, key_fields, rows):
+        if self.down:
+            raise RuntimeError("Airtable indisponible")
+        super().upsert_many(table_id, key_fields, rows)
+
+
+def test_queued_type_cible_is_skipped_only_once_sent(tmp_path, monkeypatch):
+    service = _FlakyService()
+    cache = SessionCache(ttl=60)
+    outbox = AirtableOutbox(tmp_path / "outbox.sqlite3", service=service)
+    outbox.add_sent_listener(scn_6._type_cible_sent)
+    monkeypatch.setattr(ATABLES, "SLOTS", "tblSlots")
+    monkeypatch.setattr(scn_6, "session_cache", cache)
+    monkeypatch.setattr(scn_6, "airtable_outbox", outbox)
+
+    first = scn_6.run_scn_6(_payload("recA", "2025-04-13"))
+    assert first.data["war_room"]["airtable_update"].startswith("Type_cible queued")
+
+    # Envoi en échec (nouvel essai différé) : la relance réécrit
+    assert outbox.flush() == 0
+    retry = scn_6.run_scn_6(_payload("recA", "2025-04-13"))
+    assert retry.data["war_room"]["airtable_update"].startswith("Type_cible queued")
+
+    # Envoi confirmé par Airtable : la relance suivante est évitée
+    service.down = False
+    monkeypatch.setattr("services.airtable_outbox.time.time", lambda: 1e12)
+    assert outbox.flush() == 2
+    again = scn_6.run_scn_6(_payload("recA", "2025-04-13"))
+    assert again.data["war_room"]["airtable_update"] == "Type_cible unchanged (skipped)"
+    assert [row["Slot_ID"] for row in service.rows] == ["recA"]
+    outbox.close()
+
+
+def test_scn_2_key_keeps_level_case_seen_by_the_engine():
+    # SCN_2 : "Intermediaire" n'est pas un niveau connu (volume par défaut)
+    upper, lower = _payload("recA", "2025-04-13"), _payload("recA", "2025-04-13")
+    upper["run_context"]["profile"]["level"] = "Intermediaire"
+
+    assert session_key(engine_inputs(ENGINE_SCN_2, upper)) != session_key(engine_inputs(ENGINE_SCN_2, lower))
@@ -0,0 +1,36 @@
+import json
+
+from core.utils.timings import span, stage_histograms, track_timings
+from scenarios.agregateur import scn_6
+
+
+def test_spans_nest_and_feed_stage_histograms():
+    stage_histograms.reset()
+
+    with track_timings() as timings:
+        with span("outer"):
+            with span("inner"):
+                pass
+    with span("inner"):                   # hors relevé : histogramme seulement
+        pass
+
+    spans = timings.summary()["spans"]
+    assert [(s["stage"], s["depth"]) for s in spans] == [("outer", 0), ("inner", 1)]
+    assert all(s["ms"] is not None for s in spans)
+
+    stages = stage_histograms.stats()["stages"]
+    assert stages["inner"]["count"] == 2
+    assert stages["outer"]["count"] == 1
+    assert stages["inner"]["p95_ms"] is not None
+
+
+def test_scn_6_attaches_timings_to_war_room_on_request():
+    with open("tests/data/scn_6/sc001_input.json", "r", encoding="utf-8") as f:
+        payload = json.load(f)["payload"]
+    payload["timings"] = True
+
+    result = scn_6._run_scn_6_tracked(payload, writes=[])
+
+    stages = [s["stage"] for s in result.data["war_room"]["timings"]["spans"]]
+    for stage in ("scn_6", "scn_6.prepare", "scn_6.rg00", "scn_6.persist", "scn_6.generate"):
+        assert stage in stages
@@ -0,0 +1,103 @@
+import copy
+import json
+import random
+from datetime import date, timedelta
+
+from scenarios.agregateur import scn_6
+from services.training_load import K_ATL, K_CTL, TrainingLoadState, TrainingLoadStore
+
+
+def test_incremental_state_matches_full_recompute_and_stays_compact():
+    rng = random.Random(7)
+    start = date(2023, 1, 2)
+    daily = [rng.choice([0, 0, 40, 55, 70, 90]) for _ in range(730)]
+
+    state = TrainingLoadState()
+    for i, load in enumerate(daily):
+        if load:
+            state.record(f"slot{i}", (start + timedelta(days=i)).toordinal(), load)
+
+    atl = ctl = 0.0
+    for load in daily:
+        atl += K_ATL * (load - atl)
+        ctl += K_CTL * (load - ctl)
+
+    assert abs(state.atl - atl) < 1e-6
+    assert abs(state.ctl - ctl) < 1e-6
+    assert state.window == [float(x) for x in daily[-7:]]
+    assert len(state.sessions) <= 43
+    assert len(state.dumps()) < 2000
+
+
+def test_feedback_corrects_planned_load(tmp_path):
+    store = TrainingLoadStore(tmp_path / "load.sqlite3")
+    start = date(2025, 3, 3)
+    for i in range(0, 35, 2):
+        store.record_session("runner1", f"slot{i}", start + timedelta(days=i), 60)
+
+    before = store.snapshot("runner1")
+    assert before["acwr"] is not None
+    assert store.record_feedback("runner1", "slot34", "NO") is True
+    after = store.snapshot("runner1")
+    assert after["weekly_load"] == before["weekly_load"] - 60
+    assert after["atl"] < before["atl"]
+
+    assert store.record_feedback("runner1", "unknown", "OK") is False
+    assert store.snapshot("runner2") is None
+    # Trop peu d'historique : pas de ratio exposé à SCN_2
+    store.record_session("runner2", "s1", "2025-04-01", 60)
+    assert store.recent_load("runner2") is None
+
+
+def test_scn_6_feeds_training_load_into_scn_2(tmp_path, monkeypatch):
+    store = TrainingLoadStore(tmp_path / "load.sqlite3")
+    monkeypatch.setattr(scn_6, "training_load_store", store)
+
+    # Charge chronique modérée puis semaine très chargée
+    start = date(2025, 3, 1)
+    for i in range(42):
+        store.record_session("runner_tl", f"old{i}", start + timedelta(days=i), 40 if i < 35 else 120)
+
+    with open("tests/data/scn_6/sc001_input.json", "r", encoding="utf-8") as f:
+        payload = json.load(f)["payload"]
+    run_ctx = payload["run_context"]
+    run_ctx.update({"engine_version": "C", "user_id": "runner_tl"})
+    run_ctx["profile"]["level"] = "intermediaire"
+    run_ctx["slot"] = {"slot_id": "recTL", "date": (start + timedelta(days=42)).isoformat()}
+
+    result = scn_6._run_scn_6_tracked(copy.deepcopy(payload), writes=[])
+
+    training_load = result.data["war_room"]["training_load"]
+    session = result.data["session"]
+    assert training_load["acwr"] > 1.2
+    assert session["decision_trace"]["context"]["recent_load"] == training_load["acwr"]
+    # Séance générée ajoutée à l'état du coureur
+    assert store.snapshot("runner_tl")["weekly_load"] == 6 * 120 + session["load"]
+
+
+def test_snapshot_before_latest_day_excludes_pregenerated_sessions(tmp_path):
+    store = TrainingLoadStore(tmp_path / "load.sqlite3")
+    start = date(2025, 3, 3)
+    for i in range(0, 35, 2):
+        store.record_session("runner1", f"slot{i}", start + timedelta(days=i), 60)
+    before = store.snapshot("runner1", start + timedelta(days=34))
+
+    # Slots pré-générés (semaines suivantes) : sans effet sur le passé
+    for i in range(36, 50, 2):
+        store.record_session("runner1", f"slot{i}", start + timedelta(days=i), 150)
+    after = store.snapshot("runner1", start + timedelta(days=34))
+
+    for metric in ("atl", "ctl", "weekly_load", "acwr"):
+        assert abs(after[metric] - before[metric]) < 0.05
+
+
+def test_core_3_feedback_matches_scn_6_session_key(_training_load_store):
+    from infra.slot_navigation import record_training_feedback
+
+    store = _training_load_store
+    slot_key = "recRunner1__S3__Dimanche"
+    store.record_session("recRunner1", slot_key, "2025-05-11", 60)
+
+    assert record_training_feedback("recRunner1", {"Slot_ID": slot_key}, "recSlotAirtable", "NO") is True
+    assert store.snapshot("recRunner1")["weekly_load"] == 0
+    assert store.stats()["feedbacks_unknown"] == 0
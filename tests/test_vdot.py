@@ -0,0 +1,69 @@
+import numpy as np
+
+from engine.vdot import VdotTables, race_vdot_formula, vdot_engine
+from scenarios.agregateur.scn_2 import compose_running_session
+from scenarios.agregateur.scn_2_catalogue import SessionCatalogue
+from scenarios.agregateur.scn_2_plan import generate_plan_sessions
+from scenarios.socle.helpers import estimate_vdot
+
+
+def test_race_tables_match_daniels_and_batch_matches_scalar():
+    tables = vdot_engine.tables
+    # Table de Daniels, VDOT 50
+    for race, seconds in [("5K", 1197), ("10K", 2481), ("HM", 5495), ("Marathon", 11449)]:
+        assert tables.vdot_from_race(race, seconds) == 50.0
+    assert tables.vdot_from_race("M", tables.race_time("M", 50)) == 50.0
+    assert estimate_vdot("10K", 2400) == round(float(race_vdot_formula(10000.0, np.array([2400.0]))[0]), 1)
+    assert estimate_vdot("Trail", 2400) is None
+
+    seconds = np.linspace(1500, 3600, 50)
+    batch = tables.vdots_from_race("10K", seconds)
+    assert batch.tolist() == [tables.vdot_from_race("10K", s) for s in seconds]
+    assert np.all(np.diff(batch) <= 0)
+
+    vdots = np.linspace(20, 85, 200)
+    for zone in ("E", "M", "T", "I", "R"):
+        assert np.allclose(tables.paces(vdots, zone), [tables.pace(v, zone) for v in vdots])
+    paces = tables.pace_table(50)
+    assert paces["E"] > paces["M"] > paces["T"] > paces["I"] > paces["R"]
+    # Bornes : valeurs de la grille, pas d'extrapolation
+    assert tables.pace(10, "E") == tables.pace(20, "E")
+
+
+def test_seeded_paces_follow_airtable_rows_within_their_range():
+    base = VdotTables.build()
+    records = [
+        {"fields": {"VDOT": 40, "Allure_E (min/km)": "6:00", "Allure_T (min/km)": 5.0}},
+        {"fields": {"VDOT": 50, "Allure_E (min/km)": "5:00", "Allure_T (min/km)": 4.5}},
+        {"fields": {"VDOT": "?"}},
+    ]
+    seeded = base.seeded(records)
+
+    assert seeded.source == "airtable" and seeded.seeded_rows == 2
+    assert abs(seeded.pace(45, "E") - 5.5) < 1e-9
+    assert abs(seeded.pace(45, "T") - 4.75) < 1e-9
+    # Hors plage / zone non fournie : formule
+    assert seeded.pace(60, "E") == base.pace(60, "E")
+    assert seeded.pace(45, "I") == base.pace(45, "I")
+
+
+def test_scn_2_distance_uses_profile_vdot_in_all_paths():
+    run_context = {"profile": {"level": "intermediaire", "vdot": 55}, "slot": {"phase": "Specifique"}, "recent_load": 1.0}
+    phase_context = {"seance_type": "T"}
+
+    session = compose_running_session(run_context, phase_context, verbose=False)
+    pace = vdot_engine.tables.pace(55, "E")
+    assert session["distance_km"] == round(session["duration_min"] / pace, 1)
+    assert session["decision_trace"]["inputs"]["vdot"] == 55.0
+
+    catalogue = SessionCatalogue()
+    catalogue.load()
+    assert catalogue.lookup(dict(run_context), phase_context) == session
+
+    weeks = [{"semaine": 1, "phase": "Specifique", "slots": [{"jour": "Mardi"}]}]
+    plan = generate_plan_sessions(run_context, weeks, phase_context)
+    assert plan[0]["distance_km"] == session["distance_km"]
+
+    # VDOT hors tables : allure par niveau
+    fallback = compose_running_session({**run_context, "profile": {"level": "intermediaire", "vdot": 150}}, phase_context, verbose=False)
+    assert fallback["distance_km"] == round(fallback["duration_min"] / 6.0, 1)